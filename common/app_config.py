@@ -1,5 +1,5 @@
 import os
-from typing import Type
+from typing import Type, List
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -41,6 +41,40 @@ class Config(BaseConfig):
     RABBITMQ_VIRTUAL_HOST: str = Field(default='/')
     RABBITMQ_USER: str
     RABBITMQ_PASSWORD: str
+    RABBITMQ_PUBLISH_BUFFER_SIZE: int = Field(default=10000)
+    RABBITMQ_PUBLISH_BATCH_SIZE: int = Field(default=100)
+    RABBITMQ_PUBLISH_FLUSH_INTERVAL: float = Field(default=0.5)  # seconds
+    RABBITMQ_PUBLISH_CONNECT_RETRIES: int = Field(default=3)
+
+    CONSUMER_PREFETCH_COUNT: int = Field(default=16)
+    CONSUMER_MAX_WORKERS: int = Field(default=4)
+    CONSUMER_MAX_PER_ORGANIZATION: int = Field(default=2)
+    CONSUMER_MAX_HELD_MESSAGES: int = Field(default=1000)
+    CONSUMER_BATCH_SIZE: int = Field(default=100)
+    CONSUMER_BATCH_WINDOW: float = Field(default=2.0)  # seconds
+
+    OUTBOX_RELAY_BATCH_SIZE: int = Field(default=500)
+    OUTBOX_RETENTION_DAYS: int = Field(default=7)
+    S3_EVENT_LEDGER_TTL_HOURS: int = Field(default=72)
+    OIG_SWEEP_VERIFY_BATCH_SIZE: int = Field(default=10)
+    MATCHES_MAX_PAGE_SIZE: int = Field(default=500)
+    EXCLUSION_DASHBOARD_CACHE_TTL_SECONDS: int = Field(default=60)
+    EXCLUSION_INDEX_REFRESH_SECONDS: int = Field(default=60)
+    EXCLUSION_LOOKUP_MAX_BATCH_SIZE: int = Field(default=5000)
+    # How far ahead open-ended slot series are expanded when no window end is given
+    SLOT_SERIES_EXPANSION_HORIZON_WEEKS: int = Field(default=26)
+    # Longest start_date/end_date window of the employee and patient slot views
+    SLOT_VIEW_MAX_RANGE_DAYS: int = Field(default=93)
+    # Page sizes of the windowed organization schedule listings
+    SCHEDULE_DEFAULT_PAGE_SIZE: int = Field(default=500)
+    SCHEDULE_MAX_PAGE_SIZE: int = Field(default=2000)
+    # Scheduling index snapshots cover this many weeks from the week of the requested date
+    SCHEDULING_INDEX_WINDOW_WEEKS: int = Field(default=2)
+    SCHEDULING_INDEX_TTL_SECONDS: int = Field(default=30)
+    # Longest date window the auto-scheduler proposes visits for in one request
+    AUTO_SCHEDULER_MAX_WINDOW_DAYS: int = Field(default=31)
+    # Each missed visit sweep also looks this far behind its watermark, for visits entered late
+    MISSED_VISIT_SWEEP_LOOKBACK_HOURS: int = Field(default=24)
 
     AUTH_JWT_SECRET: str
 
@@ -73,6 +107,10 @@ class Config(BaseConfig):
 
     OIG_WEBPAGE_URL: str = Field(default="")
     OIG_CSV_DOWNLOAD_URL: str = Field(default="")
+    SAM_EXCLUSIONS_DOWNLOAD_URL: str = Field(default="")
+    OIG_IMPORT_COPY_BATCH_SIZE: int = Field(default=10000)
+    # JSON list of {"state", "url", "format" (csv, pipe or xlsx), "columns": {field: header}}
+    STATE_MEDICAID_EXCLUSION_SOURCES: List[dict] = Field(default=[])
 
     GOOGLE_CLIENT_ID: str = Field(default="")
     GOOGLE_CLIENT_SECRET: str = Field(default="")
@@ -85,6 +123,9 @@ class Config(BaseConfig):
     PUSHER_KEY: str = Field(default="")
     PUSHER_SECRET: str = Field(default="")
     PUSHER_CLUSTER: str = Field(default="us2")
+    PUSHER_BATCH_MAX_SIZE: int = Field(default=20)
+    PUSHER_BATCH_FLUSH_INTERVAL: float = Field(default=1.0)  # seconds
+    PUSHER_BATCH_QUEUE_SIZE: int = Field(default=10000)
 
     @property
     def DEFAULT_USER_PASSWORD(self):
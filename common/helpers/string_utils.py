@@ -1,8 +1,11 @@
+import json
 import base64
 from binascii import Error as BinasciiError
 from datetime import datetime, date, time
 from decimal import Decimal
 
+from common.helpers.exceptions import InputValidationError
+
 _PROTECTED_TYPES = (
     type(None), int, float, Decimal, datetime, date, time,
 )
@@ -67,3 +70,19 @@ def force_bytes(s, encoding='utf-8', strings_only=False, errors='strict'):
     if isinstance(s, memoryview):
         return bytes(s)
     return str(s).encode(encoding, errors)
+
+
+def encode_cursor(sort_key: tuple) -> str:
+    """Opaque keyset pagination cursor of a sort key of strings"""
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode()).decode()
+
+
+def decode_cursor(cursor: str, length: int) -> tuple:
+    """The sort key of a cursor made by `encode_cursor`; raises InputValidationError if it is malformed"""
+    try:
+        sort_key = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise InputValidationError("Invalid cursor.")
+    if not isinstance(sort_key, list) or len(sort_key) != length or not all(isinstance(part, str) for part in sort_key):
+        raise InputValidationError("Invalid cursor.")
+    return tuple(sort_key)
@@ -25,3 +25,8 @@ from .alert import Alert
 from .alert import AlertLevelEnum
 from .alert import AlertStatusEnum
 from .alert_person import AlertPerson
+from .outbox import OutboxMessage
+from .processed_s3_event import ProcessedS3Event
+from .oig_match_sweep_item import OigMatchSweepItem
+from .exclusion_dashboard_counters import ExclusionDashboardCounters
+from .slot_series import SlotSeries
@@ -16,6 +16,9 @@ class AvailabilitySlot(VersionedModel):
     series_id: Optional[str] = None
     start_date: Optional[date] = None
     end_date: Optional[date] = None
+    # Set on rows that override one occurrence of a SlotSeries
+    recurrence_date: Optional[date] = None
+    recurrence_start_time: Optional[time] = None
 
     def validate_start_day_of_week(self):
         if not isinstance(self.start_day_of_week, int) or self.start_day_of_week < 0 or self.start_day_of_week > 6:
@@ -25,3 +25,5 @@ class EmployeeExclusionMatch(VersionedModel):
     organization_id: Optional[str] = None
     s3_key: Optional[str] = None
     verification_result: Optional[str] = None
+    # Exclusion list the match was found on, e.g. 'leie', 'sam' or 'medicaid_ny'
+    source: str = 'leie'
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime
+
+@dataclass(kw_only=True)
+class ExclusionDashboardCounters:
+    """
+    Counters shown on the exclusion match dashboard for one organization.
+    Cached in exclusion_dashboard_counters and recomputed once invalidated or expired.
+    """
+    organization_id: Optional[str] = None
+    current_employee_count: int = 0
+    matches_count: int = 0
+    files_count: int = 0
+    computed_on: Optional[datetime] = None
+
+    def as_dict(self):
+        return {field.name: getattr(self, field.name) for field in self.__dataclass_fields__.values() if getattr(self, field.name) is not None}
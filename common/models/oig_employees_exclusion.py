@@ -5,10 +5,12 @@ from datetime import date, datetime
 @dataclass(kw_only=True)
 class OigEmployeesExclusion:
     """
-    Represents a single record from the OIG LEIE database CSV.
-    This table is designed to be truncated and re-populated on each import.
+    Represents a single record of an exclusion list: the OIG LEIE, SAM.gov or a state Medicaid list.
+    The rows of a source are deleted and re-populated on each import of that source.
     """
     id: int = None
+    # Exclusion list the record comes from, e.g. 'leie', 'sam' or 'medicaid_ny'
+    source: str = 'leie'
     last_name: Optional[str] = None
     first_name: Optional[str] = None
     middle_name: Optional[str] = None
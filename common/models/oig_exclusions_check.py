@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from typing import Optional
-from datetime import date
+from datetime import date, datetime
 from rococo.models.versioned_model import VersionedModel
 
 @dataclass(kw_only=True)
@@ -15,3 +15,22 @@ class OigExclusionsCheck(VersionedModel):
 
     # The 'Last Update' date found on the OIG webpage during the check.
     last_update_on_webpage: Optional[date] = None
+
+    # Exclusion list that was checked, e.g. 'leie', 'sam' or 'medicaid_ny'
+    source: str = 'leie'
+    # SHA-256 of the downloaded list, for sources without a 'Last Update' date
+    content_hash: Optional[str] = None
+
+    # HTTP validators (ETag, Last-Modified, Content-Length) of the list file at the time of the check
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: Optional[int] = None
+
+    # Progress of the per-organization rematch started after an import. Possible values:
+    # 'in_progress', 'completed', 'completed_with_errors'
+    match_sweep_status: Optional[str] = None
+    match_sweep_total: Optional[int] = None
+    match_sweep_completed_on: Optional[datetime] = None
+    # The check that carries the progress of the sweep this import is rematched in, shared by
+    # every source imported in the same run
+    match_sweep_check_id: Optional[str] = None
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime
+
+@dataclass(kw_only=True)
+class OigMatchSweepItem:
+    """
+    Rematch of one organization's roster after an OIG LEIE import.
+    `check_id` is the entity_id of the 'imported' OigExclusionsCheck that started the sweep.
+    """
+    check_id: Optional[str] = None
+    organization_id: Optional[str] = None
+
+    # Possible values: 'pending', 'done', 'failed'
+    status: str = 'pending'
+    match_count: Optional[int] = None
+    created_on: Optional[datetime] = None
+    completed_on: Optional[datetime] = None
+
+    def as_dict(self):
+        return {field.name: getattr(self, field.name) for field in self.__dataclass_fields__.values() if getattr(self, field.name) is not None}
@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+@dataclass(kw_only=True)
+class OutboxMessage:
+    """
+    A message waiting to be relayed to RabbitMQ.
+    Rows are written in the same transaction as the entity change that produced them.
+    """
+    id: int = None
+    queue_name: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    created_on: Optional[datetime] = None
+    published_on: Optional[datetime] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
+
+    def as_dict(self):
+        return {field.name: getattr(self, field.name) for field in self.__dataclass_fields__.values() if getattr(self, field.name) is not None}
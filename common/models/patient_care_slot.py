@@ -16,5 +16,9 @@ class PatientCareSlot(VersionedModel):
     end_time: time = None
     start_date: Optional[date] = None
     end_date: Optional[date] = None
+    # Set on rows that override one occurrence of a SlotSeries
+    recurrence_date: Optional[date] = None
+    recurrence_start_time: Optional[time] = None
+
 
    
\ No newline at end of file
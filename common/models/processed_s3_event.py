@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime
+
+@dataclass(kw_only=True)
+class ProcessedS3Event:
+    """
+    An S3 event notification claimed by an import service.
+    Identified by bucket, key, ETag and sequencer, and kept until `expires_on`.
+    """
+    processor: Optional[str] = None
+    event_key: Optional[str] = None
+    bucket_name: Optional[str] = None
+    object_key: Optional[str] = None
+    etag: Optional[str] = None
+    sequencer: Optional[str] = None
+    claim_token: Optional[str] = None
+    duplicate_count: int = 0
+    first_seen_on: Optional[datetime] = None
+    expires_on: Optional[datetime] = None
+
+    def as_dict(self):
+        return {field.name: getattr(self, field.name) for field in self.__dataclass_fields__.values() if getattr(self, field.name) is not None}
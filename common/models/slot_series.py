@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+from datetime import date, time, datetime
+from typing import ClassVar, List, Optional, Tuple
+from rococo.models import VersionedModel
+
+
+@dataclass
+class SlotSeries(VersionedModel):
+    """
+    A recurring patient care or availability pattern, stored once per series.
+
+    Like an iCalendar RRULE, it recurs every `interval_weeks` weeks on each of
+    `days_of_week` (0=Monday), with one slot per shift, from `start_date` to
+    `end_date` (inclusive; open-ended when None). Occurrences are expanded on read.
+    An occurrence only gets its own slot row once it is edited, cancelled or
+    booked; that row keeps the series_id and the occurrence's recurrence_date and
+    recurrence_start_time, and replaces the rule for that occurrence.
+    """
+    use_type_checking: ClassVar[bool] = True
+
+    patient_id: Optional[str] = None
+    employee_id: Optional[str] = None
+    days_of_week: list = field(default_factory=list)
+    # [{"start_time": "HH:MM", "end_time": "HH:MM"}, ...]
+    shifts: list = field(default_factory=list)
+    interval_weeks: int = 1
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @property
+    def entity_type(self) -> str:
+        return "patient" if self.patient_id else "employee"
+
+    @property
+    def owner_id(self) -> str:
+        return self.patient_id or self.employee_id
+
+    def get_shift_times(self) -> List[Tuple[time, time]]:
+        """The (start_time, end_time) of each shift, in start time order"""
+        shift_times = []
+        for shift in self.shifts or []:
+            start_time, end_time = shift["start_time"], shift["end_time"]
+            if isinstance(start_time, str):
+                start_time = datetime.strptime(start_time[:5], "%H:%M").time()
+            if isinstance(end_time, str):
+                end_time = datetime.strptime(end_time[:5], "%H:%M").time()
+            shift_times.append((start_time, end_time))
+        return sorted(shift_times)
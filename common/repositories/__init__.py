@@ -22,3 +22,8 @@ from .fax_template import FaxTemplateRepository
 from .phone_number import PhoneNumberRepository
 from .alert import AlertRepository
 from .alert_person import AlertPersonRepository
+from .outbox import OutboxRepository
+from .processed_s3_event import ProcessedS3EventRepository
+from .oig_match_sweep_item import OigMatchSweepItemRepository
+from .exclusion_dashboard_counters import ExclusionDashboardCountersRepository
+from .slot_series import SlotSeriesRepository
@@ -1,7 +1,7 @@
 
 from common.repositories.base import BaseRepository
 from common.models import AvailabilitySlot
-from datetime import time, date, datetime
+from datetime import date, timedelta
 
 
 class AvailabilitySlotRepository(BaseRepository):
@@ -19,110 +19,51 @@ class AvailabilitySlotRepository(BaseRepository):
     def update_availability_slot(self, availability_slot: AvailabilitySlot) -> AvailabilitySlot:
         return self.save(availability_slot)
 
-    def get_eligible_availability_slots_by_patient_care_slot(self, start_time: time, end_time: time, visit_date: date, patient_id: str, organization_ids: list[str]) -> list:
-        """
-        Get patients eligible for a care slot based on availability slot criteria.
-        
-        Args:
-            start_time: Start time of the availability slot
-            end_time: End time of the availability slot
-           start_day_of_week: Day of the week (0=Monday, 6=Sunday)
-            organization_ids: The organization IDs to filter by
-
-        Returns:
-            List of Patient instances that match the criteria
+    def get_employee_slots_in_range(self, employee_id: str, start_date: date, end_date: date) -> list[AvailabilitySlot]:
+        """Active availability slots of an employee starting between start_date and end_date, inclusive"""
+        query = """
+            SELECT *
+            FROM availability_slot
+            WHERE employee_id = %s
+              AND active = true
+              AND start_date BETWEEN %s AND %s
+            ORDER BY start_date, start_time
         """
 
-        start_dt = datetime.combine(visit_date, start_time)
-        end_dt = datetime.combine(visit_date, end_time)
+        with self.adapter:
+            rows = self.adapter.execute_query(query, (employee_id, start_date, end_date)) or []
+        return [self.MODEL.from_dict(row) for row in rows]
 
+    def get_organization_slots_in_window(self, organization_id: str, window_start: date, window_end: date) -> list:
+        """
+        Active availability slots of the organization's active employees overlapping the
+        window, and weekly template slots without a start_date, with the employee's details.
+        """
         query = """
-            SELECT 
-                slot.employee_id AS employee_id,
+            SELECT
+                slot.*,
                 e.employee_id AS employee_display_id,
                 e.social_security_number AS employee_social_security_number,
                 e.date_of_birth AS employee_date_of_birth,
-                ps.first_name || ' ' || ps.last_name AS employee_name,
-                -- derive the visible window for this selection
-                GREATEST(
-                    slot.start_time,
-                    COALESCE((
-                        SELECT MAX(cv.scheduled_end_time::time)
-                        FROM care_visit cv
-                        WHERE cv.employee_id = slot.employee_id
-                        AND cv.visit_date = %s                 -- visit_date
-                        AND cv.active = TRUE
-                        -- only bookings that actually end before the target starts
-                        AND cv.scheduled_end_time <= %s  -- target_start_time
-                    ), slot.start_time)
-                ) AS available_from,
-
-                LEAST(
-                    slot.end_time,
-                    COALESCE((
-                        SELECT MIN(cv.scheduled_start_time::time)
-                        FROM care_visit cv
-                        WHERE cv.employee_id = slot.employee_id
-                        AND cv.visit_date = %s                 -- visit_date
-                        AND cv.active = TRUE
-                        -- next booking that begins after (or at) the target start
-                        AND cv.scheduled_start_time >= %s -- target_start_time
-                    ), slot.end_time)
-                ) AS available_to,
-
-                slot.*
+                ps.first_name || ' ' || ps.last_name AS employee_name
             FROM availability_slot AS slot
             JOIN employee e ON slot.employee_id = e.entity_id
             JOIN person ps ON e.person_id = ps.entity_id
-            WHERE (slot.start_day_of_week <= %s AND slot.end_day_of_week >= %s)
-            -- any overlap between employee slot and patient slot
-            AND slot.start_time < %s   -- patient_end_time
-            AND slot.end_time   > %s   -- patient_start_time
-            AND e.organization_id IN %s
-            AND e.active = true
-            AND slot.active = true
-            AND slot.entity_id NOT IN (
-                SELECT availability_slot_id
-                FROM care_visit
-                WHERE visit_date = %s
-                    -- any overlap between booking and patient slot
-                    AND scheduled_start_time < %s  -- patient_end_dt
-                    AND scheduled_end_time   > %s  -- patient_start_dt
-                    AND active = true
-            )
-            AND NOT EXISTS (
-                SELECT 1
-                    FROM care_visit cv
-                WHERE cv.visit_date = %s
-                AND cv.patient_id = %s
-                AND cv.active = true
-                AND cv.scheduled_start_time < %s
-                AND cv.scheduled_end_time > %s
-            )
+            WHERE e.organization_id = %s
+              AND e.active = true
+              AND slot.active = true
+              AND (
+                  slot.start_date IS NULL
+                  OR slot.slot_range && tsrange(%s::timestamp, %s::timestamp)
+              )
         """
-        params = (
-            visit_date,
-            start_dt,
-            visit_date,
-            start_dt,
-
-            visit_date.weekday(), 
-            end_time,       # for slot.start_time < patient_end
-            start_time,     # for slot.end_time > patient_start
-            tuple(organization_ids), 
-            visit_date, 
-            end_dt,         # for scheduled_start_time < patient_end_dt
-            start_dt,       # for scheduled_end_time > patient_start_dt
-            visit_date, 
-            patient_id,
-            end_dt,
-            start_dt
-        )
-        
-        with self.adapter:
-            result = self.adapter.execute_query(query, params)
+        params = (organization_id, window_start, window_end + timedelta(days=1))
 
-        return result
+        with self.adapter:
+            rows = self.adapter.execute_query(query, params) or []
+        for row in rows:
+            row.pop('slot_range', None)
+        return rows
 
     def get_employee_availability_slots(self, organization_ids: list[str], employee_type: str = None):
         """
@@ -204,6 +145,65 @@ class AvailabilitySlotRepository(BaseRepository):
 
         return list(slots_map.values())
 
+    def get_organization_slots_page(self, organization_ids: list[str], start_date: date, end_date: date,
+                                    limit: int, after: tuple = None, employee_type: str = None) -> list:
+        """
+        A keyset page of the active availability slots of employees in the given organizations
+        starting between start_date and end_date, ordered by (employee_id, start_date, slot_id),
+        each with its care visits. `after` is the sort key of the last slot of the previous page,
+        as returned by `get_schedule_sort_key`.
+        """
+        query = """
+            SELECT
+                s.employee_id,
+                s.entity_id AS slot_id,
+                s.series_id,
+                s.start_date,
+                s.end_date,
+                s.start_time,
+                s.end_time,
+                s.start_day_of_week,
+                s.end_day_of_week,
+                e.first_name,
+                e.last_name,
+                COALESCE(visits.care_visits, '[]') AS care_visits
+            FROM availability_slot s
+            JOIN employee e ON s.employee_id = e.entity_id
+            LEFT JOIN LATERAL (
+                SELECT json_agg(json_build_object(
+                    'visit_date', cv.visit_date,
+                    'patient_id', cv.patient_id,
+                    'patient_first_name', per.first_name,
+                    'patient_last_name', per.last_name,
+                    'availability_slot_id', cv.availability_slot_id,
+                    'status', cv.status
+                ) ORDER BY cv.visit_date) AS care_visits
+                FROM care_visit cv
+                LEFT JOIN patient p ON cv.patient_id = p.entity_id
+                LEFT JOIN person per ON p.person_id = per.entity_id
+                WHERE cv.availability_slot_id = s.entity_id
+                  AND cv.active = true
+            ) visits ON true
+            WHERE e.organization_id IN %s
+              AND s.active = true
+              AND s.start_date BETWEEN %s AND %s
+        """
+        params = [tuple(organization_ids), start_date, end_date]
+
+        if employee_type:
+            query += " AND e.employee_type = %s"
+            params.append(employee_type)
+        if after:
+            # Occurrence ids of slot series are compared with slot ids, so byte order is used
+            query += " AND (s.employee_id, s.start_date, s.entity_id COLLATE \"C\") > (%s, %s, %s)"
+            params += list(after)
+
+        query += " ORDER BY s.employee_id, s.start_date, s.entity_id COLLATE \"C\" LIMIT %s"
+        params.append(limit)
+
+        with self.adapter:
+            return self.adapter.execute_query(query, tuple(params)) or []
+
     def delete_future_availability_slots(self, employee_id: str, series_id: str, from_date: str) -> int:
         """
         Soft delete all employee slots from this date forward within the same series.
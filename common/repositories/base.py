@@ -1,7 +1,29 @@
 from rococo.repositories.postgresql import PostgreSQLRepository
 from rococo.data.postgresql import PostgreSQLAdapter
 from rococo.messaging.base import MessageAdapter
-from typing import Optional
+from contextlib import contextmanager
+from typing import Optional, List, Tuple, Iterator
+
+
+class Transaction:
+    """
+    Statements run on the connection of an open `BaseRepository.transaction()` block. Unlike
+    `execute_query`, nothing is committed until the block exits.
+    """
+
+    def __init__(self, adapter: PostgreSQLAdapter):
+        self._adapter = adapter
+
+    def execute(self, query: str, params: tuple = ()) -> Optional[List[tuple]]:
+        """Run one statement; returns its rows as tuples, or None if it returns none"""
+        self._adapter._call_cursor('execute', query, params)
+        if self._adapter._cursor.description is None:
+            return None
+        return self._adapter._call_cursor('fetchall')
+
+    def copy(self, query: str, file) -> None:
+        """Run a `COPY ... FROM STDIN` query with the rows read from `file`"""
+        self._adapter._call_cursor('copy_expert', query, file)
 
 
 class BaseRepository(PostgreSQLRepository):
@@ -28,7 +50,97 @@ class BaseRepository(PostgreSQLRepository):
         # Pass MODEL as the model to the BaseRepository
         super().__init__(db_adapter, self.MODEL, message_adapter, queue_name, user_id=user_id)
 
-    def save(self, entity):
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """
+        Run statements in one transaction that the adapter has no method for: data-modifying
+        queries whose rows are needed, statements that depend on the results of earlier ones,
+        or COPY. Commits when the block exits, and rolls back if it raises, so that a pooled
+        connection is not returned in an aborted transaction.
+
+            with self.transaction() as transaction:
+                rows = transaction.execute(query, params)
+        """
+        with self.adapter:
+            try:
+                yield Transaction(self.adapter)
+                self.adapter._connection.commit()
+            except BaseException:
+                self.adapter._connection.rollback()
+                raise
+
+    def save(self, entity, outbox_messages: Optional[List[Tuple[str, dict]]] = None):
+        """
+        Save the entity. Any `(queue_name, data)` pairs in `outbox_messages` are written
+        to the outbox in the same transaction, to be relayed to RabbitMQ afterwards.
+        """
         if self.user_id:
             entity.changed_by_id = self.user_id
-        return super().save(entity)
+        if not outbox_messages:
+            return super().save(entity)
+
+        from common.repositories.outbox import OutboxRepository
+
+        data = self._process_data_before_save(entity)
+        with self.adapter:
+            queries = [
+                self.adapter.get_move_entity_to_audit_table_query(self.table_name, entity.entity_id),
+                self.adapter.get_save_query(self.table_name, data),
+            ]
+            queries += [OutboxRepository.get_insert_query(queue_name, message) for queue_name, message in outbox_messages]
+            self.adapter.run_transaction(queries)
+        return entity
+
+    def get_save_many_queries(self, entities: list, chunk_size: int = 500,
+                              on_conflict: Optional[str] = None) -> List[Tuple[str, tuple]]:
+        """
+        Queries that save `entities` the way `save` saves each one (current rows copied to
+        the audit table, then upserted), with one multi-row statement per `chunk_size` entities.
+        `on_conflict` replaces the upsert by entity_id, e.g. to skip rows that violate
+        another unique index.
+        """
+        if not entities:
+            return []
+
+        rows = []
+        for entity in entities:
+            if self.user_id:
+                entity.changed_by_id = self.user_id
+            rows.append(self._process_data_before_save(entity))
+
+        columns = list(rows[0].keys())
+        entity_ids = tuple(row['entity_id'] for row in rows)
+        queries = [(
+            f"INSERT INTO {self.table_name}_audit (SELECT * FROM {self.table_name} WHERE entity_id IN %s)",
+            (entity_ids,)
+        )]
+
+        row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        update_columns = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns if column != 'entity_id')
+        on_conflict = on_conflict or f"ON CONFLICT (entity_id) DO UPDATE SET {update_columns}"
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            query = (
+                f"INSERT INTO {self.table_name} ({', '.join(columns)}) "
+                f"VALUES {', '.join([row_placeholder] * len(chunk))} " + on_conflict
+            )
+            queries.append((query, tuple(row[column] for row in chunk for column in columns)))
+
+        return queries
+
+    def save_many(self, entities: list, outbox_messages: Optional[List[Tuple[str, dict]]] = None) -> list:
+        """
+        Save many entities of this repository's model in one transaction, using multi-row
+        statements instead of a transaction per entity.
+        """
+        if not entities:
+            return []
+
+        queries = self.get_save_many_queries(entities)
+        if outbox_messages:
+            from common.repositories.outbox import OutboxRepository
+            queries += [OutboxRepository.get_insert_query(queue_name, message) for queue_name, message in outbox_messages]
+
+        with self.adapter:
+            self.adapter.run_transaction(queries)
+        return entities
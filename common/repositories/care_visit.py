@@ -1,10 +1,216 @@
-from common.models.care_visit import CareVisit
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Optional, List, Tuple
+
+import psycopg2.errors
+
+from common.models.care_visit import CareVisit, CareVisitStatusEnum
 from common.repositories.base import BaseRepository
+from common.helpers.exceptions import InputValidationError
+
+# Exclusion and check constraints on care_visit.scheduled_range, see migration 0000000071
+VISIT_CONSTRAINT_MESSAGES = {
+    "care_visit_employee_no_overlap": "The employee already has a visit scheduled at this time.",
+    "care_visit_patient_no_overlap": "The patient already has a visit scheduled at this time.",
+    "care_visit_scheduled_range_valid": "scheduled_end_time must be after scheduled_start_time.",
+}
+
+# Reasons a visit of a bulk schedule is not saved, see CareVisitRepository.schedule_care_visits
+SCHEDULE_CONFLICT_MESSAGES = {
+    "employee_overlap": VISIT_CONSTRAINT_MESSAGES["care_visit_employee_no_overlap"],
+    "patient_overlap": VISIT_CONSTRAINT_MESSAGES["care_visit_patient_no_overlap"],
+    "invalid_time_range": VISIT_CONSTRAINT_MESSAGES["care_visit_scheduled_range_valid"],
+    "batch_overlap": "The visit overlaps an earlier visit of the request for the same employee or patient.",
+    "availability_slot": "The availability slot does not exist or belongs to another employee.",
+    "patient_care_slot": "The patient care slot does not exist or belongs to another patient.",
+}
 
 
 class CareVisitRepository(BaseRepository):
     MODEL = CareVisit
 
+    def save(self, entity, outbox_messages: Optional[List[Tuple[str, dict]]] = None):
+        if self.user_id:
+            entity.changed_by_id = self.user_id
+
+        data = self._process_data_before_save(entity)
+        queries = [
+            self.adapter.get_move_entity_to_audit_table_query(self.table_name, entity.entity_id),
+            self.adapter.get_save_query(self.table_name, data),
+        ]
+        if outbox_messages:
+            from common.repositories.outbox import OutboxRepository
+            queries += [OutboxRepository.get_insert_query(queue_name, message) for queue_name, message in outbox_messages]
+
+        self.run_transaction(queries)
+        return entity
+
+    def save_many(self, entities: list, outbox_messages: Optional[List[Tuple[str, dict]]] = None) -> list:
+        if not entities:
+            return []
+
+        queries = self.get_save_many_queries(entities)
+        if outbox_messages:
+            from common.repositories.outbox import OutboxRepository
+            queries += [OutboxRepository.get_insert_query(queue_name, message) for queue_name, message in outbox_messages]
+
+        self.run_transaction(queries)
+        return entities
+
+    def run_transaction(self, queries: List[Tuple[str, tuple]]) -> None:
+        """
+        Run queries that save care visits in one transaction. A visit that overlaps another
+        active visit of the same employee or patient, or that does not end after it starts, is
+        rejected by the database, and the whole transaction is rolled back with an
+        InputValidationError.
+        """
+        try:
+            with self.transaction():
+                self.adapter.run_transaction(queries)
+        except (psycopg2.errors.ExclusionViolation, psycopg2.errors.CheckViolation) as e:
+            message = VISIT_CONSTRAINT_MESSAGES.get(e.diag.constraint_name)
+            if message is None:
+                raise
+            raise InputValidationError(message) from e
+
+    def schedule_care_visits(self, care_visits: List[CareVisit],
+                             all_or_nothing: bool = False) -> Tuple[List[CareVisit], List[dict]]:
+        """
+        Insert new visits in one statement, except those that end before they start, overlap
+        an active visit of their employee or patient, name a slot that is not their employee's
+        or patient's, or overlap a visit of the batch that is inserted before them for either
+        of them (earlier visits of the batch win). The batch is checked and inserted in one
+        round trip. Returns the inserted visits and one conflict per rejected visit and reason:
+        {"index", "reason", "message", "care_visit_id", "conflicting_index"}, where the indexes
+        are positions in `care_visits`. With `all_or_nothing`, no visit is inserted if any is
+        rejected.
+        """
+        if not care_visits:
+            return [], []
+
+        rows = []
+        for care_visit in care_visits:
+            if self.user_id:
+                care_visit.changed_by_id = self.user_id
+            rows.append(self._process_data_before_save(care_visit))
+        columns = ', '.join(rows[0].keys())
+
+        # The batch is typed by care_visit's row type; ordinality is the 1-based position
+        query = f"""
+            WITH RECURSIVE batch AS (
+                SELECT b.*,
+                    CASE WHEN b.scheduled_end_time > b.scheduled_start_time
+                        THEN tsrange(b.scheduled_start_time, b.scheduled_end_time)
+                    END AS visit_range
+                FROM json_populate_recordset(NULL::care_visit, %s::json) WITH ORDINALITY AS b
+            ),
+            item_conflicts AS (
+                SELECT b.ordinality AS position, 'invalid_time_range' AS reason,
+                    NULL::varchar AS care_visit_id, NULL::bigint AS conflicting_position
+                FROM batch b
+                WHERE b.visit_range IS NULL
+                UNION ALL
+                SELECT b.ordinality, 'employee_overlap', cv.entity_id, NULL
+                FROM batch b
+                JOIN care_visit cv ON cv.employee_id = b.employee_id AND cv.scheduled_range && b.visit_range
+                WHERE cv.active = true AND cv.status <> %s
+                UNION ALL
+                SELECT b.ordinality, 'patient_overlap', cv.entity_id, NULL
+                FROM batch b
+                JOIN care_visit cv ON cv.patient_id = b.patient_id AND cv.scheduled_range && b.visit_range
+                WHERE cv.active = true AND cv.status <> %s
+                UNION ALL
+                SELECT b.ordinality, 'availability_slot', NULL, NULL
+                FROM batch b
+                WHERE b.availability_slot_id <> '' AND NOT EXISTS (
+                    SELECT 1 FROM availability_slot a
+                    WHERE a.entity_id = b.availability_slot_id AND a.employee_id = b.employee_id AND a.active = true
+                )
+                UNION ALL
+                SELECT b.ordinality, 'patient_care_slot', NULL, NULL
+                FROM batch b
+                WHERE b.patient_care_slot_id <> '' AND NOT EXISTS (
+                    SELECT 1 FROM patient_care_slot pcs
+                    WHERE pcs.entity_id = b.patient_care_slot_id AND pcs.patient_id = b.patient_id AND pcs.active = true
+                )
+            ),
+            candidates AS (
+                SELECT * FROM batch WHERE ordinality NOT IN (SELECT position FROM item_conflicts)
+            ),
+            -- Walk the batch in order, accepting each candidate that overlaps no accepted one
+            walk AS (
+                SELECT 0::bigint AS position, ARRAY[]::bigint[] AS accepted
+                UNION ALL
+                SELECT walk.position + 1,
+                    CASE WHEN EXISTS (SELECT 1 FROM candidates c WHERE c.ordinality = walk.position + 1)
+                        AND NOT EXISTS (
+                            SELECT 1
+                            FROM candidates later
+                            JOIN candidates earlier ON earlier.ordinality = ANY(walk.accepted)
+                                AND (earlier.employee_id = later.employee_id OR earlier.patient_id = later.patient_id)
+                                AND earlier.visit_range && later.visit_range
+                            WHERE later.ordinality = walk.position + 1
+                        )
+                        THEN walk.accepted || (walk.position + 1)
+                        ELSE walk.accepted
+                    END
+                FROM walk
+                WHERE walk.position < (SELECT count(*) FROM batch)
+            ),
+            accepted_positions AS (
+                SELECT unnest(last_step.accepted) AS position
+                FROM (SELECT accepted FROM walk ORDER BY position DESC LIMIT 1) last_step
+            ),
+            conflicts AS (
+                SELECT * FROM item_conflicts
+                UNION ALL
+                SELECT later.ordinality, 'batch_overlap', NULL, min(earlier.ordinality)
+                FROM candidates later
+                JOIN candidates earlier ON earlier.ordinality < later.ordinality
+                    AND earlier.ordinality IN (SELECT position FROM accepted_positions)
+                    AND (earlier.employee_id = later.employee_id OR earlier.patient_id = later.patient_id)
+                    AND earlier.visit_range && later.visit_range
+                WHERE later.ordinality NOT IN (SELECT position FROM accepted_positions)
+                GROUP BY later.ordinality
+            ),
+            inserted AS (
+                INSERT INTO care_visit ({columns})
+                SELECT {columns} FROM batch
+                WHERE ordinality IN (SELECT position FROM accepted_positions)
+                    AND NOT (%s AND EXISTS (SELECT 1 FROM conflicts))
+            )
+            SELECT position, reason, care_visit_id, conflicting_position
+            FROM conflicts
+            ORDER BY position, reason
+        """
+        cancelled = CareVisitStatusEnum.CANCELLED.value
+        params = (json.dumps(rows, default=str), cancelled, cancelled, all_or_nothing)
+
+        try:
+            # execute_query does not fetch the results of a data-modifying WITH query
+            with self.transaction() as transaction:
+                results = transaction.execute(query, params)
+        except (psycopg2.errors.ExclusionViolation, psycopg2.errors.CheckViolation) as e:
+            # A visit saved since the batch was checked; nothing of the batch is saved
+            message = VISIT_CONSTRAINT_MESSAGES.get(e.diag.constraint_name)
+            if message is None:
+                raise
+            raise InputValidationError(message) from e
+
+        conflicts = [{
+            "index": position - 1,
+            "reason": reason,
+            "message": SCHEDULE_CONFLICT_MESSAGES[reason],
+            "care_visit_id": care_visit_id,
+            "conflicting_index": conflicting_position - 1 if conflicting_position else None,
+        } for position, reason, care_visit_id, conflicting_position in results]
+
+        if all_or_nothing and conflicts:
+            return [], conflicts
+
+        rejected = {conflict['index'] for conflict in conflicts}
+        return [care_visit for index, care_visit in enumerate(care_visits) if index not in rejected], conflicts
+
     def get_care_visits(self, start_date = None, end_date = None, employee_id = None, patient_id = None):
         conditions = ["cv.active = true"]
         params = ()
@@ -42,10 +248,121 @@ class CareVisitRepository(BaseRepository):
             for result in results:
                 patient_name = result.pop('patient_name', None)
                 employee_name = result.pop('employee_name', None)
-                care_visit = self.MODEL(**result)
+                care_visit = self.MODEL.from_dict(result)
                 care_visit_dict = care_visit.as_dict()
                 care_visit_dict['patient_name'] = patient_name
                 care_visit_dict['employee_name'] = employee_name
                 output.append(care_visit_dict)
 
             return output
+
+    def get_participant_organization_ids(self, employee_ids: List[str], patient_ids: List[str]) -> set:
+        """The organizations of the employees and the patients"""
+        query = """
+            SELECT organization_id FROM employee WHERE entity_id = ANY(%s::varchar[])
+            UNION
+            SELECT organization_id FROM patient WHERE entity_id = ANY(%s::varchar[])
+        """
+
+        with self.adapter:
+            rows = self.adapter.execute_query(query, (list(employee_ids), list(patient_ids))) or []
+        return {row['organization_id'] for row in rows if row['organization_id']}
+
+    def get_organization_visits_in_window(self, organization_id: str, window_start, window_end) -> list:
+        """
+        Active visits overlapping the window that were scheduled by the organization or
+        involve one of its employees or patients, which may have been scheduled by a partner.
+        """
+        query = """
+            SELECT entity_id, employee_id, patient_id, availability_slot_id, patient_care_slot_id,
+                scheduled_start_time, scheduled_end_time
+            FROM care_visit
+            WHERE active = true
+              AND scheduled_range && tsrange(%s::timestamp, %s::timestamp)
+              AND (
+                  organization_id = %s
+                  OR employee_id IN (SELECT entity_id FROM employee WHERE organization_id = %s)
+                  OR patient_id IN (SELECT entity_id FROM patient WHERE organization_id = %s)
+              )
+        """
+        params = (window_start, window_end + timedelta(days=1), organization_id, organization_id, organization_id)
+
+        with self.adapter:
+            return self.adapter.execute_query(query, params) or []
+
+    def _get_mark_missed_query(self, cutoff: datetime, since: Optional[datetime] = None,
+                               employee_id: Optional[str] = None) -> Tuple[str, tuple]:
+        """
+        One statement that marks the active scheduled visits that ended after `since` and at or
+        before `cutoff` as missed, the way `save` versions each of them (the current rows are
+        copied to the audit table first), and returns the number of visits marked per organization.
+        """
+        conditions = ["active = true", "status = %s", "scheduled_end_time <= %s"]
+        params = [CareVisitStatusEnum.SCHEDULED.value, cutoff]
+        if since:
+            conditions.append("scheduled_end_time > %s")
+            params.append(since)
+        if employee_id:
+            conditions.append("employee_id = %s")
+            params.append(employee_id)
+
+        query = f"""
+            WITH due AS (
+                SELECT entity_id
+                FROM care_visit
+                WHERE {' AND '.join(conditions)}
+                FOR UPDATE SKIP LOCKED
+            ),
+            audit AS (
+                INSERT INTO care_visit_audit
+                SELECT cv.* FROM care_visit cv JOIN due ON cv.entity_id = due.entity_id
+            ),
+            marked AS (
+                UPDATE care_visit cv
+                SET status = %s,
+                    previous_version = cv.version,
+                    version = replace(gen_random_uuid()::text, '-', ''),
+                    changed_on = now() AT TIME ZONE 'utc',
+                    changed_by_id = %s
+                FROM due
+                WHERE cv.entity_id = due.entity_id
+                RETURNING cv.organization_id
+            )
+            SELECT organization_id, count(*) AS missed_count
+            FROM marked
+            GROUP BY organization_id
+        """
+        params += [CareVisitStatusEnum.MISSED.value, self.user_id]
+        return query, tuple(params)
+
+    def mark_missed_visits(self, cutoff: datetime, employee_id: Optional[str] = None) -> Dict[str, int]:
+        """Mark the scheduled visits that ended by `cutoff` as missed; returns the counts per organization"""
+        query, params = self._get_mark_missed_query(cutoff, employee_id=employee_id)
+        # execute_query does not fetch the results of a data-modifying WITH query
+        with self.transaction() as transaction:
+            rows = transaction.execute(query, params)
+        return {organization_id: missed_count for organization_id, missed_count in rows}
+
+    def sweep_missed_visits(self, job_name: str, cutoff: datetime, lookback: timedelta) -> Dict[str, int]:
+        """
+        Mark the scheduled visits that ended since the job's watermark, less `lookback` for
+        visits that were entered late, and by `cutoff` as missed, and move the watermark to
+        `cutoff`, in one transaction. The watermark row stays locked until it commits, so
+        overlapping runs wait for each other. Returns the counts per organization.
+        """
+        with self.transaction() as transaction:
+            transaction.execute(
+                "INSERT INTO job_watermark (job_name) VALUES (%s) ON CONFLICT (job_name) DO NOTHING", (job_name,)
+            )
+            watermark = transaction.execute(
+                "SELECT watermark FROM job_watermark WHERE job_name = %s FOR UPDATE", (job_name,)
+            )[0][0]
+
+            query, params = self._get_mark_missed_query(cutoff, since=watermark - lookback if watermark else None)
+            rows = transaction.execute(query, params)
+
+            transaction.execute(
+                "UPDATE job_watermark SET watermark = %s, updated_on = CURRENT_TIMESTAMP WHERE job_name = %s",
+                (cutoff, job_name)
+            )
+        return {organization_id: missed_count for organization_id, missed_count in rows}
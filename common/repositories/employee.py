@@ -149,125 +149,92 @@ class EmployeeRepository(BaseRepository):
             return {"status": "inserted", "employee_id": record.employee_id, "person_id":record.person_id}
 
 
-    def get_employees_with_matches(self, organization_id: str):
+    def get_employees_with_matches(self, organization_id: str, limit: int = None, offset: int = 0):
         """
-        Get all employees and physicians with their exclusion match counts.
+        Get employees and physicians with their exclusion match summary, read from the
+        exclusion_match_summary table maintained by the match repository.
 
         Args:
             organization_id: The organization ID to filter by
+            limit: Optional page size; all entities are returned if not set
+            offset: Number of entities to skip
 
         Returns:
-            List[dict]: List of entity dictionaries with match details
-                    Each dictionary has an 'entity_type' field that is either 'employee' or 'physician'
+            Tuple[List[dict], int]: The page of entity dictionaries with match details and the
+                    total number of matched entities. Each dictionary has an 'entity_type' field
+                    that is either 'employee' or 'physician'
         """
-        # First, get the employee matches
-        employee_query = """
-            SELECT e.*,
-                   CASE 
-                       WHEN COUNT(CASE WHEN eem.match_type = 'name_and_dob' THEN 1 END) > 0 
-                       THEN 'name_and_dob'
-                       ELSE 'name_only'
-                   END as match_type,
-                   COUNT(eem.entity_id) as match_count,
-                   CASE 
-                       WHEN COUNT(CASE WHEN eem.status = 'pending' THEN 1 END) > 0 
-                       THEN 'pending'
-                       ELSE 'handled'
-                   END as status,
-                   MAX(eem.verification_result) as verification_result,
-                   MAX(eem.s3_key) as s3_key
-            FROM employee e
-                INNER JOIN employee_exclusion_match eem ON e.entity_id = eem.matched_entity_id
-                WHERE e.organization_id = %s AND eem.matched_entity_type = 'employee'
-                GROUP BY e.entity_id
-        """
-        with self.adapter:
-            employee_results = self.adapter.execute_query(employee_query, (organization_id,))
-
-        # Now, get the physician matches - we'll use a direct SQL query
-        physician_query = """
-            SELECT p.*,
-                per.first_name,
-                per.last_name,
-                CASE
-                    WHEN COUNT(CASE WHEN eem.match_type = 'name_and_dob' THEN 1 END) > 0
-                    THEN 'name_and_dob'
-                    ELSE 'name_only'
-                END AS match_type,
-                COUNT(eem.entity_id) AS match_count,
-                CASE
-                    WHEN COUNT(CASE WHEN eem.status = 'pending' THEN 1 END) > 0
-                    THEN 'pending'
-                    ELSE 'handled'
-                END AS status,
-                MAX(eem.verification_result) as verification_result,
-                MAX(eem.s3_key) as s3_key
-            FROM physician p
-            INNER JOIN person per ON p.person_id = per.entity_id
-            INNER JOIN employee_exclusion_match eem ON p.entity_id = eem.matched_entity_id
-            WHERE p.organization_id = %s
-            AND eem.matched_entity_type = 'physician'
-            GROUP BY p.entity_id, per.first_name, per.last_name
+        summary_query = """
+            SELECT entity_type, entity_id, match_type, match_count, status, verification_result, s3_key,
+                   COUNT(*) OVER () AS total_count
+            FROM exclusion_match_summary
+            WHERE organization_id = %s
+            ORDER BY entity_type, entity_id
         """
+        params = [organization_id]
+        if limit:
+            summary_query += " LIMIT %s OFFSET %s"
+            params.extend([limit, offset or 0])
 
         with self.adapter:
-            physician_results = self.adapter.execute_query(physician_query, (organization_id,))
+            summaries = self.adapter.execute_query(summary_query, tuple(params))
 
-        results = []
-        # Process employee results
-        if employee_results:
-            for row in employee_results:
-                # Extract match_type, match_count, verification_result, and s3_key from the row
-                match_type = row.pop('match_type')
-                match_count = row.pop('match_count')
-                match_status = row.pop('status')
-                verification_result = row.pop('verification_result')
-                s3_key = row.pop('s3_key')
+        if not summaries:
+            # Past the last page the window count is not available
+            return [], self._count_matched_entities(organization_id) if offset else 0
 
-                # Create Employee instance
-                employee = Employee(**row)
+        with self.adapter:
+            employee_ids = tuple(row['entity_id'] for row in summaries if row['entity_type'] == 'employee')
+            physician_ids = tuple(row['entity_id'] for row in summaries if row['entity_type'] == 'physician')
+
+            employees = {}
+            if employee_ids:
+                employee_query = "SELECT * FROM employee WHERE entity_id IN %s AND organization_id = %s"
+                for row in self.adapter.execute_query(employee_query, (employee_ids, organization_id)) or []:
+                    employees[row['entity_id']] = row
+
+            physicians = {}
+            if physician_ids:
+                physician_query = """
+                    SELECT p.*, per.first_name, per.last_name
+                    FROM physician p
+                    INNER JOIN person per ON p.person_id = per.entity_id
+                    WHERE p.entity_id IN %s AND p.organization_id = %s
+                """
+                for row in self.adapter.execute_query(physician_query, (physician_ids, organization_id)) or []:
+                    physicians[row['entity_id']] = row
 
-                # Add match_type, match_count, verification_result, and s3_key as attributes
-                employee_dict = employee.as_dict()
-                employee_dict['match_type'] = match_type
-                employee_dict['match_count'] = match_count
-                employee_dict['status'] = match_status
-                employee_dict['verification_result'] = verification_result
-                employee_dict['s3_key'] = s3_key
-                employee_dict['entity_type'] = 'employee'
-
-                results.append(employee_dict)
-
-        # Process physician results
-        if physician_results:
-            for row in physician_results:
-                # Extract match_type, match_count, verification_result, s3_key, and names from the row
-                match_type = row.pop('match_type')
-                match_count = row.pop('match_count')
-                match_status = row.pop('status')
-                verification_result = row.pop('verification_result')
-                s3_key = row.pop('s3_key')
-                first_name = row.pop('first_name', None)
-                last_name = row.pop('last_name', None)
-
-                # Create a dictionary from the row
-                physician_dict = dict(row)
-                physician_dict['match_type'] = match_type
-                physician_dict['match_count'] = match_count
-                physician_dict['status'] = match_status
-                physician_dict['verification_result'] = verification_result
-                physician_dict['s3_key'] = s3_key
-                physician_dict['entity_type'] = 'physician'
-                
-                # Add names from person record if available
-                if first_name:
-                    physician_dict['first_name'] = first_name
-                if last_name:
-                    physician_dict['last_name'] = last_name
-
-                results.append(physician_dict)
-
-        return results
+        results = []
+        for summary in summaries:
+            if summary['entity_type'] == 'employee':
+                entity = employees.get(summary['entity_id'])
+            else:
+                entity = physicians.get(summary['entity_id'])
+            if entity is None:
+                continue
+
+            entity_dict = dict(entity)
+            if summary['entity_type'] == 'physician':
+                # Names come from the person record; drop them if it has none
+                for name_field in ('first_name', 'last_name'):
+                    if not entity_dict.get(name_field):
+                        entity_dict.pop(name_field, None)
+
+            entity_dict['match_type'] = summary['match_type']
+            entity_dict['match_count'] = summary['match_count']
+            entity_dict['status'] = summary['status']
+            entity_dict['verification_result'] = summary['verification_result']
+            entity_dict['s3_key'] = summary['s3_key']
+            entity_dict['entity_type'] = summary['entity_type']
+            results.append(entity_dict)
+
+        return results, summaries[0]['total_count']
+
+    def _count_matched_entities(self, organization_id: str) -> int:
+        query = "SELECT COUNT(*) FROM exclusion_match_summary WHERE organization_id = %s"
+        with self.adapter:
+            result = self.adapter.execute_query(query, (organization_id,))
+        return result[0]['count'] if result else 0
 
     def get_employees_with_invitation_status(self, organization_ids: list[str], employee_type: str = None):
         """
@@ -14,11 +14,70 @@ class EmployeeExclusionMatchRepository(BaseRepository):
         # Truncate the table first
         with self.adapter:
             self.adapter.execute_query("DELETE FROM employee_exclusion_match")
+            self.adapter.execute_query("DELETE FROM exclusion_match_summary")
+            self.adapter.execute_query("DELETE FROM exclusion_dashboard_counters")
 
         # Insert all the new matches
         for match in matches:
             self.save(match)
 
+        self.refresh_match_summaries((match.matched_entity_type, match.matched_entity_id) for match in matches)
+
+    def refresh_match_summaries(self, entities) -> None:
+        """
+        Recompute the exclusion_match_summary rows of the given (entity_type, entity_id)
+        pairs from their active matches. Entities left without active matches lose their row,
+        and the cached dashboard counters of their organizations are invalidated.
+        """
+        entities = tuple({(entity_type, entity_id) for entity_type, entity_id in entities if entity_id})
+        if not entities:
+            return
+
+        delete_query = """
+            DELETE FROM exclusion_match_summary
+            WHERE (entity_type, entity_id) IN %s
+        """
+        insert_query = """
+            INSERT INTO exclusion_match_summary
+                (entity_type, entity_id, organization_id, match_type, match_count, status, verification_result, s3_key)
+            SELECT
+                matched_entity_type,
+                matched_entity_id,
+                MAX(organization_id),
+                CASE
+                    WHEN COUNT(CASE WHEN match_type = 'name_and_dob' THEN 1 END) > 0
+                    THEN 'name_and_dob'
+                    ELSE 'name_only'
+                END,
+                COUNT(entity_id),
+                CASE
+                    WHEN COUNT(CASE WHEN status = 'pending' THEN 1 END) > 0
+                    THEN 'pending'
+                    ELSE 'handled'
+                END,
+                MAX(verification_result),
+                MAX(s3_key)
+            FROM employee_exclusion_match
+            WHERE active = true
+                AND organization_id IS NOT NULL
+                AND (matched_entity_type, matched_entity_id) IN %s
+            GROUP BY matched_entity_type, matched_entity_id
+        """
+        # The dashboard counters of the affected organizations are recomputed on next read
+        invalidate_counters_query = """
+            DELETE FROM exclusion_dashboard_counters
+            WHERE organization_id IN (
+                SELECT organization_id FROM employee_exclusion_match
+                WHERE (matched_entity_type, matched_entity_id) IN %s
+            )
+        """
+        with self.adapter:
+            self.adapter.run_transaction([
+                (delete_query, (entities,)),
+                (insert_query, (entities,)),
+                (invalidate_counters_query, (entities,)),
+            ])
+
     def get_all(self, organization_id=None) -> List[EmployeeExclusionMatch]:
         """
         Returns all records from the employee_exclusion_match table.
@@ -34,10 +93,10 @@ class EmployeeExclusionMatchRepository(BaseRepository):
         Returns:
             int: The number of employee exclusion matches
         """
-        query = "SELECT COUNT(*) FROM employee_exclusion_match;"
+        query = "SELECT COUNT(*) FROM employee_exclusion_match WHERE active = true;"
 
         if organization_id:
-            query = "SELECT COUNT(*) FROM employee_exclusion_match WHERE organization_id = %s;"
+            query = "SELECT COUNT(*) FROM employee_exclusion_match WHERE active = true AND organization_id = %s;"
             params = (organization_id,)
         else:
             params = None
@@ -51,7 +110,95 @@ class EmployeeExclusionMatchRepository(BaseRepository):
         return None
 
 
+    # Columns that can be filtered on with an exact value when listing matches
+    LISTING_FILTER_COLUMNS = {
+        'status': 'status',
+        'match_type': 'match_type',
+        'verification_result': 'verification_result',
+        'entity_type': 'matched_entity_type',
+    }
+
+    def _build_listing_conditions(self, organization_id: str, filters: dict = None, name_prefix: str = None):
+        conditions = ["organization_id = %s", "active = true"]
+        params = [organization_id]
+
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            conditions.append(f"{self.LISTING_FILTER_COLUMNS[key]} = %s")
+            params.append(value)
+
+        if name_prefix:
+            escaped = name_prefix.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions.append(
+                "(lower(COALESCE(last_name, '')) LIKE %s OR lower(COALESCE(first_name, '')) LIKE %s)"
+            )
+            params.extend([escaped + '%', escaped + '%'])
+
+        return conditions, params
+
+    def get_matches_page(self, organization_id: str, filters: dict = None, name_prefix: str = None,
+                         limit: int = None, after: tuple = None) -> List[EmployeeExclusionMatch]:
+        """
+        Returns the organization's active matches in (last name, first name, entity_id) order.
+
+        Args:
+            filters: Exact-value filters keyed by status, match_type, verification_result or entity_type.
+            name_prefix: Case-insensitive prefix of the first or last name.
+            limit: Maximum number of rows to return; all rows if None.
+            after: (last name, first name, entity_id) sort key of the last row of the previous page,
+                as returned by `get_listing_sort_key`.
+        """
+        conditions, params = self._build_listing_conditions(organization_id, filters, name_prefix)
+
+        if after:
+            conditions.append(
+                "(lower(COALESCE(last_name, '')), lower(COALESCE(first_name, '')), entity_id) > (%s, %s, %s)"
+            )
+            params.extend(after)
+
+        query = f"""
+            SELECT * FROM employee_exclusion_match
+            WHERE {' AND '.join(conditions)}
+            ORDER BY lower(COALESCE(last_name, '')), lower(COALESCE(first_name, '')), entity_id
+        """
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit)
+
+        with self.adapter:
+            results = self.adapter.execute_query(query, tuple(params))
+
+        return [EmployeeExclusionMatch.from_dict(row) for row in results] if results else []
+
+    def count_matches(self, organization_id: str, filters: dict = None, name_prefix: str = None) -> int:
+        """
+        Counts the organization's active matches with the same filters as `get_matches_page`.
+        """
+        conditions, params = self._build_listing_conditions(organization_id, filters, name_prefix)
+        query = f"SELECT COUNT(*) FROM employee_exclusion_match WHERE {' AND '.join(conditions)}"
+
+        with self.adapter:
+            result = self.adapter.execute_query(query, tuple(params))
+
+        return result[0]['count'] if result else 0
+
+    @staticmethod
+    def get_listing_sort_key(match: EmployeeExclusionMatch) -> tuple:
+        """Returns the keyset sort key of a match, as compared by `get_matches_page`."""
+        return ((match.last_name or '').lower(), (match.first_name or '').lower(), match.entity_id)
+
     def find_exclusion_matches_for_employee(self, employee_id: str) -> List[EmployeeExclusionMatch]:
+        return self.find_exclusion_matches_for_employees([employee_id])
+
+
+    def find_exclusion_matches_for_employees(self, employee_ids: List[str]) -> List[EmployeeExclusionMatch]:
+        """
+        Finds OIG exclusion matches for a set of employees with a single query.
+        """
+        if not employee_ids:
+            return []
+
         query = """
             SELECT 
                 COALESCE(p.first_name, ec.first_name) AS first_name,
@@ -62,6 +209,7 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                 'employee' AS matched_entity_type,
                 ec.entity_id AS matched_entity_id,
                 oig.id AS oig_exclusion_id,
+                oig.source,
                 ec.organization_id,
                 CASE 
                     WHEN ec.date_of_birth = oig.date_of_birth THEN 'name_and_dob'
@@ -72,9 +220,9 @@ class EmployeeExclusionMatchRepository(BaseRepository):
             JOIN oig_employees_exclusion oig ON 
                 LOWER(COALESCE(p.first_name, ec.first_name)) = LOWER(oig.first_name) AND
                 LOWER(COALESCE(p.last_name, ec.last_name)) = LOWER(oig.last_name)
-            WHERE ec.entity_id = %s
+            WHERE ec.entity_id IN %s
         """
-        params = (employee_id,)
+        params = (tuple(employee_ids),)
 
         with self.adapter:
             results = self.adapter.execute_query(query, params)
@@ -82,6 +230,119 @@ class EmployeeExclusionMatchRepository(BaseRepository):
         return [EmployeeExclusionMatch(**row) for row in results] if results else []
 
 
+    def find_exclusion_matches_for_physicians(self, physician_ids: List[str]) -> List[EmployeeExclusionMatch]:
+        """
+        Finds OIG exclusion matches for a set of physicians with a single query.
+        """
+        if not physician_ids:
+            return []
+
+        query = """
+            SELECT
+                per.first_name,
+                per.last_name,
+                p.date_of_birth,
+                oig.exclusion_type,
+                oig.exclusion_date,
+                'physician' AS matched_entity_type,
+                p.entity_id     AS matched_entity_id,
+                oig.id          AS oig_exclusion_id,
+                oig.source,
+                p.organization_id,
+                CASE
+                    WHEN p.date_of_birth IS NOT NULL
+                        AND p.date_of_birth::date = oig.date_of_birth
+                    THEN 'name_and_dob'
+                    ELSE 'name_only'
+                END AS match_type
+            FROM
+                physician p
+            INNER JOIN
+                person per     ON p.person_id = per.entity_id
+            INNER JOIN
+                oig_employees_exclusion oig
+                    ON  LOWER(per.first_name) = LOWER(oig.first_name)
+                    AND LOWER(per.last_name)  = LOWER(oig.last_name)
+            WHERE p.entity_id IN %s
+        """
+        params = (tuple(physician_ids),)
+
+        with self.adapter:
+            results = self.adapter.execute_query(query, params)
+
+        return [EmployeeExclusionMatch(**row) for row in results] if results else []
+
+
+    def get_match_fingerprints(self, organization_id: str) -> dict:
+        """
+        Returns the fields exclusion matching depends on (normalized name and date of birth)
+        for every employee and physician of an organization, keyed by (entity_type, entity_id).
+        Comparing two snapshots tells which entities need to be rematched.
+        """
+        query = """
+            SELECT 'employee' AS entity_type, ec.entity_id,
+                   LOWER(COALESCE(p.first_name, ec.first_name)) AS first_name,
+                   LOWER(COALESCE(p.last_name, ec.last_name)) AS last_name,
+                   ec.date_of_birth::text AS date_of_birth
+            FROM employee ec
+            LEFT JOIN person p ON ec.person_id IS NOT NULL AND p.entity_id = ec.person_id
+            WHERE ec.organization_id = %s AND ec.active = true
+            UNION ALL
+            SELECT 'physician' AS entity_type, ph.entity_id,
+                   LOWER(per.first_name), LOWER(per.last_name),
+                   ph.date_of_birth::text
+            FROM physician ph
+            INNER JOIN person per ON ph.person_id = per.entity_id
+            WHERE ph.organization_id = %s AND ph.active = true
+        """
+        with self.adapter:
+            results = self.adapter.execute_query(query, (organization_id, organization_id))
+
+        return {
+            (row['entity_type'], row['entity_id']): (row['first_name'], row['last_name'], row['date_of_birth'])
+            for row in results
+        } if results else {}
+
+
+    def retire_stale_matches(self, entity_type: str, entity_ids: List[str], current_matches: List[EmployeeExclusionMatch]) -> List[EmployeeExclusionMatch]:
+        """
+        Deactivate the active matches of the given entities that are not in `current_matches`,
+        i.e. that no longer apply after a name or date of birth change.
+
+        Returns:
+            List[EmployeeExclusionMatch]: The retired matches
+        """
+        if not entity_ids:
+            return []
+
+        current_keys = {
+            (match.matched_entity_id, match.first_name, match.last_name, match.exclusion_type, match.exclusion_date, match.source)
+            for match in current_matches
+            if match.matched_entity_type == entity_type
+        }
+
+        query = """
+            SELECT *
+            FROM employee_exclusion_match
+            WHERE matched_entity_type = %s AND matched_entity_id IN %s AND active = true
+        """
+        with self.adapter:
+            results = self.adapter.execute_query(query, (entity_type, tuple(entity_ids)))
+
+        retired = []
+        for row in results or []:
+            match = EmployeeExclusionMatch.from_dict(row)
+            key = (match.matched_entity_id, match.first_name, match.last_name, match.exclusion_type, match.exclusion_date, match.source)
+            if key not in current_keys:
+                self.delete(match)
+                retired.append(match)
+
+        if retired:
+            self.refresh_match_summaries((entity_type, match.matched_entity_id) for match in retired)
+            logger.info(f"Retired {len(retired)} {entity_type} exclusion matches that no longer apply")
+        return retired
+
+
     def find_exclusion_matches(self, organization_id: str = None) -> List[EmployeeExclusionMatch]:
         """
         Finds matches between employees/caregivers/physicians and OIG exclusion list.
@@ -105,6 +366,7 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                 'employee' AS matched_entity_type,
                 ec.entity_id AS matched_entity_id,
                 oig.id AS oig_exclusion_id,
+                oig.source,
                 ec.organization_id,
                 CASE 
                     WHEN ec.date_of_birth = oig.date_of_birth THEN 'name_and_dob'
@@ -137,6 +399,7 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                 matched_entity_type=row['matched_entity_type'],
                 matched_entity_id=row['matched_entity_id'],
                 oig_exclusion_id=row['oig_exclusion_id'],
+                source=row['source'],
                 match_type=row['match_type'],
                 status='pending',
                 reviewer_notes=None,
@@ -156,6 +419,7 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                 'physician' AS matched_entity_type,
                 p.entity_id     AS matched_entity_id,
                 oig.id          AS oig_exclusion_id,
+                oig.source,
                 p.organization_id,
                 CASE
                     WHEN p.date_of_birth IS NOT NULL
@@ -192,6 +456,7 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                 matched_entity_type=row['matched_entity_type'],
                 matched_entity_id=row['matched_entity_id'],
                 oig_exclusion_id=row['oig_exclusion_id'],
+                source=row['source'],
                 match_type=row['match_type'],
                 status='pending',
                 reviewer_notes=None,
@@ -240,7 +505,8 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                 record.exclusion_date,
                 record.matched_entity_type,
                 record.matched_entity_id,
-                record.organization_id
+                record.organization_id,
+                record.source
             )
             
             if key in existing_matches:
@@ -252,7 +518,7 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                     entity_id=existing_data['entity_id'],
                     version=existing_data['version'],
                     previous_version=existing_data['previous_version'],
-                    active=existing_data['active'],
+                    active=True,  # A retired match that applies again is reactivated
                     changed_by_id=existing_data['changed_by_id'],
                     changed_on=existing_data['changed_on'],
                     first_name=record.first_name,
@@ -263,9 +529,15 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                     matched_entity_type=record.matched_entity_type,
                     matched_entity_id=record.matched_entity_id,
                     oig_exclusion_id=record.oig_exclusion_id,
+                    source=record.source,
                     match_type=record.match_type,
                     status=existing_data['status'],  # Preserve existing status
                     reviewer_notes=existing_data['reviewer_notes'],  # Preserve existing notes
+                    reviewer_id=existing_data['reviewer_id'],
+                    reviewer_name=existing_data['reviewer_name'],
+                    review_date=existing_data['review_date'],
+                    s3_key=existing_data['s3_key'],  # Preserve verification screenshot
+                    verification_result=existing_data['verification_result'],  # Preserve verification outcome
                     organization_id=record.organization_id
                 )
                 
@@ -276,6 +548,10 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                 self.save(record)
                 processed_records.append(record)
         
+        self.refresh_match_summaries(
+            (record.matched_entity_type, record.matched_entity_id) for record in processed_records
+        )
+
         logger.info(f"Upsert completed: {len(processed_records)} records processed.")
         return processed_records
     
@@ -292,7 +568,7 @@ class EmployeeExclusionMatchRepository(BaseRepository):
         params = []
         
         for record in records:
-            placeholders.append("(%s, %s, %s, %s, %s, %s, %s)")
+            placeholders.append("(%s, %s, %s, %s, %s, %s, %s, %s)")
             params.extend([
                 record.first_name,
                 record.last_name,
@@ -300,17 +576,19 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                 record.exclusion_date,
                 record.matched_entity_type,
                 record.matched_entity_id,
-                record.organization_id
+                record.organization_id,
+                record.source
             ])
         
         existing_query = f"""
             SELECT entity_id, status, reviewer_notes, version, previous_version,
                    active, changed_by_id, changed_on,
+                   reviewer_id, reviewer_name, review_date, s3_key, verification_result,
                    first_name, last_name, exclusion_type, exclusion_date,
-                   matched_entity_type, matched_entity_id, organization_id
+                   matched_entity_type, matched_entity_id, organization_id, source
             FROM employee_exclusion_match 
             WHERE (first_name, last_name, exclusion_type, exclusion_date, 
-                   matched_entity_type, matched_entity_id, organization_id) 
+                   matched_entity_type, matched_entity_id, organization_id, source) 
                   IN ({','.join(placeholders)})
         """
         
@@ -332,7 +610,8 @@ class EmployeeExclusionMatchRepository(BaseRepository):
                     row['exclusion_date'],
                     row['matched_entity_type'],
                     row['matched_entity_id'],
-                    row['organization_id']
+                    row['organization_id'],
+                    row['source']
                 )
                 existing_matches[key] = row
         
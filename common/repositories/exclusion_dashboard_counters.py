@@ -0,0 +1,64 @@
+from typing import Optional
+
+from common.repositories.base import BaseRepository
+from common.models.exclusion_dashboard_counters import ExclusionDashboardCounters
+from common.models.current_employees_file import CurrentEmployeesFileStatusEnum
+
+
+class ExclusionDashboardCountersRepository(BaseRepository):
+    MODEL = ExclusionDashboardCounters
+
+    def __init__(self, adapter, message_adapter, message_queue_name, person_id):
+        super().__init__(adapter, message_adapter, message_queue_name, person_id)
+        self.table_name = "exclusion_dashboard_counters"
+
+    def get_cached(self, organization_id: str, ttl_seconds: int) -> Optional[ExclusionDashboardCounters]:
+        """
+        Returns the organization's cached counters if they are younger than `ttl_seconds`.
+        """
+        query = """
+            SELECT organization_id, current_employee_count, matches_count, files_count, computed_on
+            FROM exclusion_dashboard_counters
+            WHERE organization_id = %s
+            AND computed_on > CURRENT_TIMESTAMP - make_interval(secs => %s)
+        """
+        with self.adapter:
+            results = self.adapter.execute_query(query, (organization_id, ttl_seconds))
+        return ExclusionDashboardCounters(**results[0]) if results else None
+
+    def compute(self, organization_id: str) -> ExclusionDashboardCounters:
+        """
+        Computes the counters with one aggregate query and stores them in the cache.
+        """
+        query = """
+            SELECT
+                (SELECT COUNT(*) FROM employee WHERE organization_id = %s) AS current_employee_count,
+                (SELECT COUNT(*) FROM employee_exclusion_match
+                    WHERE organization_id = %s AND active = true) AS matches_count,
+                (SELECT COUNT(*) FROM current_employees_file
+                    WHERE organization_id = %s AND status = %s) AS files_count
+        """
+        store_query = """
+            INSERT INTO exclusion_dashboard_counters
+                (organization_id, current_employee_count, matches_count, files_count, computed_on)
+            VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (organization_id) DO UPDATE SET
+                current_employee_count = EXCLUDED.current_employee_count,
+                matches_count = EXCLUDED.matches_count,
+                files_count = EXCLUDED.files_count,
+                computed_on = EXCLUDED.computed_on
+        """
+        params = (organization_id, organization_id, organization_id, CurrentEmployeesFileStatusEnum.DONE.value)
+        with self.adapter:
+            row = self.adapter.execute_query(query, params)[0]
+            counters = ExclusionDashboardCounters(organization_id=organization_id, **row)
+            self.adapter.execute_query(store_query, (
+                organization_id, counters.current_employee_count, counters.matches_count, counters.files_count
+            ))
+        return counters
+
+    def invalidate(self, organization_id: str) -> None:
+        with self.adapter:
+            self.adapter.execute_query(
+                "DELETE FROM exclusion_dashboard_counters WHERE organization_id = %s", (organization_id,)
+            )
@@ -79,6 +79,11 @@ class RepoType(Enum):
     PHONE_NUMBER = auto()
     ALERT = auto()
     ALERT_PERSON = auto()
+    OUTBOX = auto()
+    PROCESSED_S3_EVENT = auto()
+    OIG_MATCH_SWEEP_ITEM = auto()
+    EXCLUSION_DASHBOARD_COUNTERS = auto()
+    SLOT_SERIES = auto()
 
 class RepositoryFactory:
 
@@ -110,6 +115,11 @@ class RepositoryFactory:
         RepoType.PHONE_NUMBER: PhoneNumberRepository,
         RepoType.ALERT: AlertRepository,
         RepoType.ALERT_PERSON: AlertPersonRepository,
+        RepoType.OUTBOX: OutboxRepository,
+        RepoType.PROCESSED_S3_EVENT: ProcessedS3EventRepository,
+        RepoType.OIG_MATCH_SWEEP_ITEM: OigMatchSweepItemRepository,
+        RepoType.EXCLUSION_DASHBOARD_COUNTERS: ExclusionDashboardCountersRepository,
+        RepoType.SLOT_SERIES: SlotSeriesRepository,
     }
 
     def get_db_connection(self):
@@ -17,7 +17,34 @@ class OigEmployeesExclusionRepository(BaseRepository):
             self.adapter.execute_query(query)
         
         return True
+
+    def delete_by_source(self, source: str):
+        """
+        Delete the records of one exclusion list before it is re-imported.
+        """
+        with self.adapter:
+            self.adapter.execute_query("DELETE FROM oig_employees_exclusion WHERE source = %s", (source,))
+
+        return True
         
+    def replace_source_exclusions(self, source: str, columns: list, batches) -> None:
+        """
+        Replace the records of one exclusion list with COPY batches in a single transaction,
+        so that matching never sees the list half-loaded.
+
+        Args:
+            source: The source whose existing records are deleted
+            columns: The column names, in the order of the batch values
+            batches: File-like objects in PostgreSQL COPY text format
+        """
+        cols_str = ', '.join([f'"{col}"' for col in columns])
+        copy_query = f"COPY oig_employees_exclusion ({cols_str}) FROM STDIN"
+
+        with self.transaction() as transaction:
+            transaction.execute("DELETE FROM oig_employees_exclusion WHERE source = %s", (source,))
+            for batch in batches:
+                transaction.copy(copy_query, batch)
+
     def insert_exclusion(self, record: OigEmployeesExclusion):
         """
         Insert a single OIG employee exclusion record into the database.
@@ -50,3 +77,17 @@ class OigEmployeesExclusionRepository(BaseRepository):
             return OigEmployeesExclusion(**result[0])
         
         return None
+
+    def get_index_records(self) -> list:
+        """
+        Fetch the columns of every exclusion record that the in-memory lookup index needs.
+        """
+        query = """
+            SELECT id, source, first_name, middle_name, last_name, business_name, npi, date_of_birth,
+                general, specialty, state, exclusion_type, exclusion_date
+            FROM oig_employees_exclusion
+        """
+        with self.adapter:
+            rows = self.adapter.execute_query(query)
+
+        return rows or []
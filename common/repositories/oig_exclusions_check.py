@@ -30,20 +30,24 @@ class OigExclusionsCheckRepository(BaseRepository):
 
         return checks
     
-    def get_checks_by_status(self, status):
+    def get_checks_by_status(self, status, source=None):
         """
-        Fetch all OIG exclusion checks with the specified status.
+        Fetch all OIG exclusion checks with the specified status, optionally of one source.
         Results are ordered by changed_on DESC.
         """
         query = """
             SELECT *
             FROM oig_exclusions_check
             WHERE status = %s
-            ORDER BY changed_on DESC;
         """
-
         params = (status,)
 
+        if source:
+            query += " AND source = %s"
+            params += (source,)
+
+        query += " ORDER BY changed_on DESC;"
+
         with self.adapter:
             rows = self.adapter.execute_query(query, params)
 
@@ -54,3 +58,41 @@ class OigExclusionsCheckRepository(BaseRepository):
             checks.append(check)
 
         return checks
+
+    def get_latest_import_id(self):
+        """
+        Returns the entity_id of the most recent successful import check, or None.
+        """
+        query = """
+            SELECT entity_id
+            FROM oig_exclusions_check
+            WHERE status = 'imported' AND active = true
+            ORDER BY changed_on DESC
+            LIMIT 1;
+        """
+
+        with self.adapter:
+            rows = self.adapter.execute_query(query)
+
+        return rows[0]['entity_id'] if rows else None
+
+    def get_last_validated_check(self, source):
+        """
+        Returns the latest 'imported' or 'no_update' check of a source that has an
+        ETag or Last-Modified validator, or None.
+        """
+        query = """
+            SELECT *
+            FROM oig_exclusions_check
+            WHERE source = %s
+            AND status IN ('imported', 'no_update')
+            AND (etag IS NOT NULL OR last_modified IS NOT NULL)
+            AND active = true
+            ORDER BY changed_on DESC
+            LIMIT 1;
+        """
+
+        with self.adapter:
+            rows = self.adapter.execute_query(query, (source,))
+
+        return self.MODEL.from_dict(rows[0]) if rows else None
@@ -0,0 +1,62 @@
+from typing import List
+
+from common.repositories.base import BaseRepository
+from common.models.oig_match_sweep_item import OigMatchSweepItem
+
+
+class OigMatchSweepItemRepository(BaseRepository):
+    MODEL = OigMatchSweepItem
+
+    def __init__(self, adapter, message_adapter, message_queue_name, person_id):
+        super().__init__(adapter, message_adapter, message_queue_name, person_id)
+        self.table_name = "oig_match_sweep_item"
+
+    def get_organization_ids_to_sweep(self) -> List[str]:
+        """
+        Organizations with at least one active employee or physician to match.
+        """
+        query = """
+            SELECT organization_id FROM employee WHERE active = true AND organization_id IS NOT NULL
+            UNION
+            SELECT organization_id FROM physician WHERE active = true AND organization_id IS NOT NULL
+        """
+        with self.adapter:
+            results = self.adapter.execute_query(query)
+        return [row['organization_id'] for row in results] if results else []
+
+    def create_items(self, check_id: str, organization_ids: List[str]) -> None:
+        if not organization_ids:
+            return
+        placeholders = ", ".join(["(%s, %s)"] * len(organization_ids))
+        params = []
+        for organization_id in organization_ids:
+            params.extend([check_id, organization_id])
+        query = f"""
+            INSERT INTO oig_match_sweep_item (check_id, organization_id)
+            VALUES {placeholders}
+            ON CONFLICT (check_id, organization_id) DO NOTHING
+        """
+        with self.adapter:
+            self.adapter.execute_query(query, tuple(params))
+
+    def complete_item(self, check_id: str, organization_id: str, status: str, match_count: int = None) -> dict:
+        """
+        Mark an organization's work item as finished and return the sweep's progress
+        as a dict with `pending` and `failed` counts.
+        """
+        update_query = """
+            UPDATE oig_match_sweep_item
+            SET status = %s, match_count = %s, completed_on = CURRENT_TIMESTAMP
+            WHERE check_id = %s AND organization_id = %s
+        """
+        progress_query = """
+            SELECT
+                COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+                COUNT(*) FILTER (WHERE status = 'failed') AS failed
+            FROM oig_match_sweep_item
+            WHERE check_id = %s
+        """
+        with self.adapter:
+            self.adapter.execute_query(update_query, (status, match_count, check_id, organization_id))
+            results = self.adapter.execute_query(progress_query, (check_id,))
+        return results[0] if results else {'pending': 0, 'failed': 0}
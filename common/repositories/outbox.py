@@ -0,0 +1,70 @@
+import json
+from typing import List, Tuple
+
+from common.repositories.base import BaseRepository
+from common.models.outbox import OutboxMessage
+
+
+class OutboxRepository(BaseRepository):
+    MODEL = OutboxMessage
+
+    def __init__(self, adapter, message_adapter, message_queue_name, person_id):
+        super().__init__(adapter, message_adapter, message_queue_name, person_id)
+        self.table_name = "outbox"
+
+    @staticmethod
+    def get_insert_query(queue_name: str, data: dict) -> Tuple[str, tuple]:
+        """
+        Returns the query to add a message to the outbox, for use in `run_transaction`.
+        """
+        query = "INSERT INTO outbox (queue_name, payload) VALUES (%s, %s)"
+        return query, (queue_name, json.dumps(data))
+
+    def add_message(self, queue_name: str, data: dict) -> None:
+        """
+        Add a message to the outbox in its own transaction.
+        """
+        query, values = self.get_insert_query(queue_name, data)
+        with self.adapter:
+            self.adapter.execute_query(query, values)
+
+    def claim_pending(self, limit: int) -> List[OutboxMessage]:
+        """
+        Lock and return the oldest unpublished messages. Rows locked by another relay
+        are skipped. Must be called inside an open adapter context; the locks are
+        released when `mark_published` or `mark_failed` commits.
+        """
+        query = """
+            SELECT id, queue_name, payload, created_on, attempts
+            FROM outbox
+            WHERE published_on IS NULL
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """
+        results = self.adapter.execute_query(query, (limit,))
+        return [OutboxMessage(**row) for row in results] if results else []
+
+    def mark_published(self, ids: List[int]) -> None:
+        if not ids:
+            return
+        query = "UPDATE outbox SET published_on = CURRENT_TIMESTAMP, attempts = attempts + 1 WHERE id IN %s"
+        self.adapter.execute_query(query, (tuple(ids),))
+
+    def mark_failed(self, ids: List[int], error: str) -> None:
+        if not ids:
+            return
+        query = "UPDATE outbox SET attempts = attempts + 1, last_error = %s WHERE id IN %s"
+        self.adapter.execute_query(query, (error, tuple(ids)))
+
+    def delete_published(self, older_than_days: int) -> None:
+        """
+        Remove relayed messages older than the retention window.
+        """
+        query = """
+            DELETE FROM outbox
+            WHERE published_on IS NOT NULL
+            AND published_on < CURRENT_TIMESTAMP - make_interval(days => %s)
+        """
+        with self.adapter:
+            self.adapter.execute_query(query, (older_than_days,))
@@ -1,7 +1,8 @@
 
 from common.repositories.base import BaseRepository
 from common.models.patient_care_slot import PatientCareSlot
-from datetime import time, date, datetime
+from datetime import date, timedelta
+from typing import Dict, Optional
 
 class PatientCareSlotRepository(BaseRepository):
     MODEL = PatientCareSlot
@@ -18,79 +19,88 @@ class PatientCareSlotRepository(BaseRepository):
     def update_patient_care_slot(self, patient_care_slot: PatientCareSlot) -> PatientCareSlot:
         return self.save(patient_care_slot)
 
-    def get_eligible_patient_care_slots_by_availability_slot(self, start_time: time, end_time: time, visit_date: date, employee_id: str, organization_ids: list[str]) -> list:
+    def get_patient_slots_in_range(self, patient_id: str, start_date: date, end_date: date) -> list[PatientCareSlot]:
+        """Active care slots of a patient starting between start_date and end_date, inclusive"""
+        query = """
+            SELECT *
+            FROM patient_care_slot
+            WHERE patient_id = %s
+              AND active = true
+              AND start_date BETWEEN %s AND %s
+            ORDER BY start_date, start_time
         """
-        Get patients eligible for a care slot based on availability slot criteria.
-        
-        Args:
-            start_time: Start time of the availability slot
-            end_time: End time of the availability slot
-            start_day_of_week: Day of the week (0=Monday, 6=Sunday)
-            organization_ids: The organization IDs to filter by
 
-        Returns:
-            List of Patient instances that match the criteria
+        with self.adapter:
+            rows = self.adapter.execute_query(query, (patient_id, start_date, end_date)) or []
+        return [self.MODEL.from_dict(row) for row in rows]
+
+    def get_weekly_scheduled_minutes(self, patient_id: str, start_date: date, end_date: date,
+                                     exclude_slot_id: Optional[str] = None) -> Dict[date, int]:
+        """
+        Minutes of the patient's active care slots starting between start_date and end_date,
+        by the Monday of their week. A slot that ends at or before its start time runs
+        overnight, as in PatientCareSlotService._calculate_slot_duration_minutes.
         """
+        query = """
+            SELECT
+                date_trunc('week', start_date)::date AS week_start_date,
+                SUM(
+                    CASE WHEN end_minutes > start_minutes
+                        THEN end_minutes - start_minutes
+                        ELSE 24 * 60 - start_minutes + end_minutes
+                    END
+                )::int AS scheduled_minutes
+            FROM (
+                SELECT
+                    start_date,
+                    extract(hour FROM start_time)::int * 60 + extract(minute FROM start_time)::int AS start_minutes,
+                    extract(hour FROM end_time)::int * 60 + extract(minute FROM end_time)::int AS end_minutes
+                FROM patient_care_slot
+                WHERE patient_id = %s
+                  AND active = true
+                  AND start_date BETWEEN %s AND %s
+                  AND start_time IS NOT NULL
+                  AND end_time IS NOT NULL
+                  AND entity_id <> %s
+            ) slots
+            GROUP BY week_start_date
+        """
+        params = (patient_id, start_date, end_date, exclude_slot_id or '')
 
-        start_dt = datetime.combine(visit_date, start_time)
-        end_dt = datetime.combine(visit_date, end_time)
+        with self.adapter:
+            rows = self.adapter.execute_query(query, params) or []
+        return {row['week_start_date']: row['scheduled_minutes'] for row in rows}
 
+    def get_organization_slots_in_window(self, organization_id: str, window_start: date, window_end: date) -> list:
+        """
+        Active care slots of the organization's active patients overlapping the window,
+        and weekly template slots without a start_date, with the patient's name, care period and quota.
+        """
         query = """
-            SELECT 
-                pcs.patient_id AS patient_id,
+            SELECT
+                pcs.*,
                 ps.first_name || ' ' || ps.last_name AS patient_name,
-                pcs.*
+                p.care_period_start,
+                p.care_period_end,
+                p.weekly_quota
             FROM patient_care_slot pcs
             JOIN patient p ON pcs.patient_id = p.entity_id
             JOIN person ps ON p.person_id = ps.entity_id
-            WHERE (pcs.start_day_of_week <= %s AND pcs.end_day_of_week >= %s))
-            AND pcs.end_time > %s
-            AND pcs.start_time < %s
-            AND p.organization_id IN %s
-            AND p.active = true
-            AND pcs.active = true
-            AND %s >= p.care_period_start
-            AND (%s <= p.care_period_end OR p.care_period_end IS NULL)
-            AND pcs.entity_id NOT IN (
-                SELECT patient_care_slot_id
-                FROM care_visit
-                WHERE visit_date = %s
-                AND scheduled_end_time > %s
-                AND scheduled_start_time < %s
-                AND active = true
-            )
-            AND NOT EXISTS (
-                SELECT 1
-                FROM care_visit cv
-                WHERE cv.visit_date = %s
-                    AND cv.employee_id = %s
-                    AND cv.active = true
-                    AND cv.scheduled_end_time > (timestamp %s + pcs.start_time)
-                    AND cv.scheduled_start_time < (timestamp %s + pcs.end_time)
-            );
-        """
-        params = (
-            visit_date.weekday(),  # start_day_of_week = %s
-            visit_date.weekday(),  # start_day_of_week <= %s
-            visit_date.weekday(),  # end_day_of_week >= %s
-            start_time, 
-            end_time, 
-            tuple(organization_ids), 
-            visit_date, 
-            visit_date, 
-            visit_date, 
-            start_dt, 
-            end_dt, 
-            visit_date, 
-            employee_id, 
-            visit_date, 
-            visit_date
-        )
-        
-        with self.adapter:
-            result = self.adapter.execute_query(query, params)
+            WHERE p.organization_id = %s
+              AND p.active = true
+              AND pcs.active = true
+              AND (
+                  pcs.start_date IS NULL
+                  OR pcs.slot_range && tsrange(%s::timestamp, %s::timestamp)
+              )
+        """
+        params = (organization_id, window_start, window_end + timedelta(days=1))
 
-        return result
+        with self.adapter:
+            rows = self.adapter.execute_query(query, params) or []
+        for row in rows:
+            row.pop('slot_range', None)
+        return rows
 
     def get_patient_care_slots_by_organization(self, organization_id: str) -> list:
         """
@@ -170,6 +180,62 @@ class PatientCareSlotRepository(BaseRepository):
              
         return list(slots_map.values())
 
+    def get_organization_slots_page(self, organization_id: str, start_date: date, end_date: date,
+                                    limit: int, after: tuple = None) -> list:
+        """
+        A keyset page of the active care slots of the organization's active patients starting
+        between start_date and end_date, ordered by (patient_id, start_date, slot_id), each with
+        its care visits. `after` is the sort key of the last slot of the previous page, as
+        returned by `get_schedule_sort_key`.
+        """
+        query = """
+            SELECT
+                pcs.patient_id,
+                pcs.entity_id AS slot_id,
+                pcs.series_id,
+                pcs.start_date,
+                pcs.end_date,
+                pcs.start_time,
+                pcs.end_time,
+                pcs.start_day_of_week,
+                pcs.end_day_of_week,
+                per.first_name,
+                per.last_name,
+                COALESCE(visits.care_visits, '[]') AS care_visits
+            FROM patient_care_slot pcs
+            JOIN patient p ON pcs.patient_id = p.entity_id
+            JOIN person per ON p.person_id = per.entity_id
+            LEFT JOIN LATERAL (
+                SELECT json_agg(json_build_object(
+                    'visit_date', cv.visit_date,
+                    'status', cv.status,
+                    'employee_id', cv.employee_id,
+                    'employee_first_name', e.first_name,
+                    'employee_last_name', e.last_name
+                ) ORDER BY cv.visit_date) AS care_visits
+                FROM care_visit cv
+                LEFT JOIN employee e ON cv.employee_id = e.entity_id
+                WHERE cv.patient_care_slot_id = pcs.entity_id
+                  AND cv.active = true
+            ) visits ON true
+            WHERE p.organization_id = %s
+              AND p.active = true
+              AND pcs.active = true
+              AND pcs.start_date BETWEEN %s AND %s
+        """
+        params = [organization_id, start_date, end_date]
+
+        if after:
+            # Occurrence ids of slot series are compared with slot ids, so byte order is used
+            query += " AND (pcs.patient_id, pcs.start_date, pcs.entity_id COLLATE \"C\") > (%s, %s, %s)"
+            params += list(after)
+
+        query += " ORDER BY pcs.patient_id, pcs.start_date, pcs.entity_id COLLATE \"C\" LIMIT %s"
+        params.append(limit)
+
+        with self.adapter:
+            return self.adapter.execute_query(query, tuple(params)) or []
+
     def delete_future_patient_care_slots(self, patient_id: str, series_id: str, from_date: str) -> int:
         """
         Soft delete all patient care slots from this date forward within the same series.
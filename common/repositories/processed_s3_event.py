@@ -0,0 +1,62 @@
+from common.repositories.base import BaseRepository
+from common.models.processed_s3_event import ProcessedS3Event
+
+
+class ProcessedS3EventRepository(BaseRepository):
+    MODEL = ProcessedS3Event
+
+    def __init__(self, adapter, message_adapter, message_queue_name, person_id):
+        super().__init__(adapter, message_adapter, message_queue_name, person_id)
+        self.table_name = "processed_s3_event"
+
+    def claim(self, event: ProcessedS3Event, ttl_hours: int) -> bool:
+        """
+        Record the event for its processor and return True if this call claimed it.
+
+        Returns False, and increments `duplicate_count`, when the event is already
+        recorded and has not expired. An expired record is claimed again.
+        """
+        upsert_query = """
+            INSERT INTO processed_s3_event
+                (processor, event_key, bucket_name, object_key, etag, sequencer, claim_token, expires_on)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP + make_interval(hours => %s))
+            ON CONFLICT (processor, event_key) DO UPDATE SET
+                claim_token = CASE WHEN processed_s3_event.expires_on < CURRENT_TIMESTAMP
+                    THEN EXCLUDED.claim_token ELSE processed_s3_event.claim_token END,
+                duplicate_count = CASE WHEN processed_s3_event.expires_on < CURRENT_TIMESTAMP
+                    THEN 0 ELSE processed_s3_event.duplicate_count + 1 END,
+                first_seen_on = CASE WHEN processed_s3_event.expires_on < CURRENT_TIMESTAMP
+                    THEN CURRENT_TIMESTAMP ELSE processed_s3_event.first_seen_on END,
+                expires_on = CASE WHEN processed_s3_event.expires_on < CURRENT_TIMESTAMP
+                    THEN EXCLUDED.expires_on ELSE processed_s3_event.expires_on END
+        """
+        upsert_params = (
+            event.processor, event.event_key, event.bucket_name, event.object_key,
+            event.etag, event.sequencer, event.claim_token, ttl_hours
+        )
+        # The upsert is atomic, so only the delivery whose token was stored owns the event
+        claim_query = """
+            SELECT claim_token = %s AS claimed
+            FROM processed_s3_event
+            WHERE processor = %s AND event_key = %s
+        """
+        with self.adapter:
+            self.adapter.execute_query(upsert_query, upsert_params)
+            result = self.adapter.execute_query(claim_query, (event.claim_token, event.processor, event.event_key))
+
+        return bool(result and result[0]['claimed'])
+
+    def release(self, event: ProcessedS3Event) -> None:
+        """
+        Forget a claimed event so that a redelivery is processed again.
+        """
+        query = """
+            DELETE FROM processed_s3_event
+            WHERE processor = %s AND event_key = %s AND claim_token = %s
+        """
+        with self.adapter:
+            self.adapter.execute_query(query, (event.processor, event.event_key, event.claim_token))
+
+    def delete_expired(self) -> None:
+        with self.adapter:
+            self.adapter.execute_query("DELETE FROM processed_s3_event WHERE expires_on < CURRENT_TIMESTAMP")
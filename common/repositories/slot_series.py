@@ -0,0 +1,146 @@
+import json
+from dataclasses import fields
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+
+from common.models.slot_series import SlotSeries
+from common.repositories.base import BaseRepository
+
+SLOT_SERIES_FIELDS = {field.name for field in fields(SlotSeries)}
+
+
+class SlotSeriesRepository(BaseRepository):
+    MODEL = SlotSeries
+
+    def _process_data_before_save(self, instance: SlotSeries):
+        data = super()._process_data_before_save(instance)
+        # psycopg2 would send a list of dicts as an array, the column is jsonb
+        if data.get('shifts') is not None and not isinstance(data['shifts'], str):
+            data['shifts'] = json.dumps(data['shifts'])
+        return data
+
+    def get_series_in_window(self, window_start: Optional[date] = None, window_end: Optional[date] = None,
+                             patient_id: str = None, employee_id: str = None) -> List[SlotSeries]:
+        """Active series of a patient or an employee with dates overlapping the window"""
+        conditions = ["active = true"]
+        params = []
+        if patient_id:
+            conditions.append("patient_id = %s")
+            params.append(patient_id)
+        if employee_id:
+            conditions.append("employee_id = %s")
+            params.append(employee_id)
+        if window_end:
+            conditions.append("start_date <= %s")
+            params.append(window_end)
+        if window_start:
+            conditions.append("(end_date IS NULL OR end_date >= %s)")
+            params.append(window_start)
+
+        query = f"SELECT * FROM slot_series WHERE {' AND '.join(conditions)}"
+
+        with self.adapter:
+            rows = self.adapter.execute_query(query, tuple(params)) or []
+
+        return [SlotSeries.from_dict(row) for row in rows]
+
+    def get_organization_series(self, entity_type: str, organization_ids: List[str],
+                                window_start: Optional[date] = None, window_end: Optional[date] = None) -> List[Tuple[SlotSeries, dict]]:
+        """
+        Active patient or employee series in the given organizations with dates overlapping
+        the window, each with the owner's details the slot listings show.
+        """
+        if entity_type == "patient":
+            query = """
+                SELECT ss.*,
+                    per.first_name AS first_name,
+                    per.last_name AS last_name,
+                    per.first_name || ' ' || per.last_name AS patient_name,
+                    p.care_period_start,
+                    p.care_period_end,
+                    p.weekly_quota
+                FROM slot_series ss
+                JOIN patient p ON ss.patient_id = p.entity_id
+                JOIN person per ON p.person_id = per.entity_id
+                WHERE p.organization_id IN %s
+                  AND p.active = true
+                  AND ss.active = true
+            """
+        else:
+            query = """
+                SELECT ss.*,
+                    e.first_name AS first_name,
+                    e.last_name AS last_name,
+                    e.employee_id AS employee_display_id,
+                    e.social_security_number AS employee_social_security_number,
+                    e.date_of_birth AS employee_date_of_birth,
+                    ps.first_name || ' ' || ps.last_name AS employee_name
+                FROM slot_series ss
+                JOIN employee e ON ss.employee_id = e.entity_id
+                JOIN person ps ON e.person_id = ps.entity_id
+                WHERE e.organization_id IN %s
+                  AND e.active = true
+                  AND ss.active = true
+            """
+        params = [tuple(organization_ids)]
+        if window_end:
+            query += " AND ss.start_date <= %s"
+            params.append(window_end)
+        if window_start:
+            query += " AND (ss.end_date IS NULL OR ss.end_date >= %s)"
+            params.append(window_start)
+
+        with self.adapter:
+            rows = self.adapter.execute_query(query, tuple(params)) or []
+
+        return [
+            (
+                SlotSeries.from_dict({key: value for key, value in row.items() if key in SLOT_SERIES_FIELDS}),
+                {key: value for key, value in row.items() if key not in SLOT_SERIES_FIELDS}
+            ) for row in rows
+        ]
+
+    def get_overridden_occurrences(self, slot_table: str, series_ids: List[str], window_start: Optional[date] = None,
+                                   window_end: Optional[date] = None) -> Set[Tuple[str, date, object]]:
+        """
+        The (series_id, recurrence_date, recurrence_start_time) of every occurrence that has its
+        own row in `slot_table`, active or not, so that expansion skips them.
+        """
+        if not series_ids:
+            return set()
+
+        query = f"""
+            SELECT DISTINCT series_id, recurrence_date, recurrence_start_time
+            FROM {slot_table}
+            WHERE series_id IN %s
+              AND recurrence_date IS NOT NULL
+        """
+        params = [tuple(series_ids)]
+        if window_start:
+            query += " AND recurrence_date >= %s"
+            params.append(window_start)
+        if window_end:
+            query += " AND recurrence_date <= %s"
+            params.append(window_end)
+
+        with self.adapter:
+            rows = self.adapter.execute_query(query, tuple(params)) or []
+
+        return {(row['series_id'], row['recurrence_date'], row['recurrence_start_time']) for row in rows}
+
+    def get_occurrence_rows(self, slot_table: str, occurrences: List[Tuple[str, date, object]]) -> Dict[Tuple[str, date, object], dict]:
+        """The rows of `slot_table` overriding the given (series_id, recurrence_date, recurrence_start_time)"""
+        if not occurrences:
+            return {}
+
+        query = f"""
+            SELECT *
+            FROM {slot_table}
+            WHERE recurrence_date IS NOT NULL
+              AND (series_id, recurrence_date, recurrence_start_time) IN %s
+        """
+
+        with self.adapter:
+            rows = self.adapter.execute_query(query, (tuple(occurrences),)) or []
+
+        return {(row['series_id'], row['recurrence_date'], row['recurrence_start_time']): row for row in rows}
@@ -20,3 +20,9 @@ from .fax_template import FaxTemplateService
 from .phone_number import PhoneNumberService
 from .alert import AlertService
 from .alert_person import AlertPerson
+from .outbox import OutboxService
+from .s3_event_ledger import S3EventLedgerService
+from .exclusion_index import ExclusionLookupService
+from .slot_series import SlotSeriesService
+from .scheduling_index import SchedulingIndexService
+from .auto_scheduler import AutoSchedulerService
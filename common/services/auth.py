@@ -2,9 +2,9 @@ from common.services import (
     PersonService, EmailService, LoginMethodService, OrganizationService,
     PersonOrganizationRoleService, PersonOrganizationInvitationService
 )
+from common.services.outbox import OutboxService
 from common.models import Person, Email, LoginMethod, Organization, PersonOrganizationRole, PersonOrganizationRoleEnum
 from common.models.login_method import LoginMethodType
-from common.tasks.send_message import MessageSender
 from common.app_logger import logger
 
 from werkzeug.security import check_password_hash
@@ -30,7 +30,7 @@ class AuthService:
         self.person_organization_role_service = PersonOrganizationRoleService(config)
         self.person_organization_invitation_service = PersonOrganizationInvitationService(config)
 
-        self.message_sender = MessageSender()
+        self.outbox_service = OutboxService(config)
 
     def signup_by_email(self, email, first_name, last_name, person_id=None):
         login_method = LoginMethod(
@@ -71,9 +71,14 @@ class AuthService:
         person = self.person_service.save_person(person)
         login_method = self.login_method_service.save_login_method(login_method)
         self.organization_service.save_organization(organization)
-        self.person_organization_role_service.save_person_organization_role(person_organization_role)
 
-        self.send_welcome_email(login_method, person, email.email)
+        # The welcome email is queued in the same transaction as the final save of the signup
+        outbox_messages = []
+        if welcome_message := self.get_welcome_email_message(login_method, person, email.email):
+            outbox_messages.append((self.EMAIL_TRANSMITTER_QUEUE_NAME, welcome_message))
+        self.person_organization_role_service.save_person_organization_role(
+            person_organization_role, outbox_messages=outbox_messages
+        )
         return person
 
 
@@ -202,9 +207,10 @@ class AuthService:
         return password_reset_url
 
 
-    def send_welcome_email(self, login_method: LoginMethod, person: Person, email: str):
+    def get_welcome_email_message(self, login_method: LoginMethod, person: Person, email: str):
         if verify_link := self.prepare_password_reset_url(login_method, email):
-            message = {
+            logger.info(f"confirmation_link {verify_link}")
+            return {
                 "event": "WELCOME_EMAIL",
                 "data": {
                     "verify_link": verify_link,
@@ -212,8 +218,10 @@ class AuthService:
                 },
                 "to_emails": [email],
             }
-            logger.info(f"confirmation_link {verify_link}")
-            self.message_sender.send_message(self.EMAIL_TRANSMITTER_QUEUE_NAME, message)
+
+    def send_welcome_email(self, login_method: LoginMethod, person: Person, email: str):
+        if message := self.get_welcome_email_message(login_method, person, email):
+            self.outbox_service.enqueue(self.EMAIL_TRANSMITTER_QUEUE_NAME, message)
 
     def login_user_by_email_password(self, email: str, password: str):
         email_obj = self.email_service.get_email_by_email_address(email)
@@ -306,7 +314,7 @@ class AuthService:
                 },
                 "to_emails": [email],
             }
-            self.message_sender.send_message(self.EMAIL_TRANSMITTER_QUEUE_NAME, message)
+            self.outbox_service.enqueue(self.EMAIL_TRANSMITTER_QUEUE_NAME, message)
 
     def reset_user_password(self, token: str, uidb64: str, password: str):
         # Create new login method temporarily to validate and generate hashed password in its `password` field.`
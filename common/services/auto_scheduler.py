@@ -0,0 +1,249 @@
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from common.app_logger import get_logger
+from common.helpers.exceptions import InputValidationError
+from common.models.care_visit import CareVisit
+from common.services.scheduling_index import SchedulingIndex, SchedulingIndexService
+from common.utils.assignment import min_cost_assignment
+from common.utils.slot import get_week_start_date
+
+logger = get_logger(__name__)
+
+# Added to the cost of an employee who is available for only part of a slot, so that
+# any full coverage is preferred over any partial one (offsets are under a day)
+PARTIAL_MATCH_PENALTY = 24 * 60
+
+
+def _minutes(start: datetime, end: datetime) -> float:
+    return (end - start).total_seconds() / 60
+
+
+def _overlaps(intervals: List[Tuple[datetime, datetime]], start: datetime, end: datetime) -> bool:
+    return any(other_start < end and other_end > start for other_start, other_end in intervals)
+
+
+class AutoScheduler:
+    """
+    Proposes employees for the open patient care slots of a snapshot between two dates.
+
+    Open slots are the occurrences of care slots that are not booked, of patients in their
+    care period without a visit at that time. Each can be covered by the employees whose
+    availability overlaps it and who have no visit then. Day by day, the slots and the
+    employees are paired with a min-cost matching, full coverage first and then by the
+    distance between the slot's and the availability's midpoints. An employee takes one
+    slot per round, so rounds are repeated until no more slots of the day can be covered.
+    Proposals never overlap each other, and never take a patient over their weekly quota.
+    """
+
+    def __init__(self, index: SchedulingIndex, start_date: date, end_date: date):
+        self.index = index
+        self.start_date = start_date
+        self.end_date = end_date
+
+        self.employee_bookings = {}
+        self.patient_bookings = {}
+        # Minutes of visits per (patient_id, week start), from the whole weeks of the snapshot
+        self.scheduled_minutes = {}
+        for patient_id, tree in index.visits_by_patient.items():
+            for start, end, _ in tree:
+                key = (patient_id, get_week_start_date(start.date()))
+                self.scheduled_minutes[key] = self.scheduled_minutes.get(key, 0) + _minutes(start, end)
+
+    def get_open_slots(self) -> List[Dict[str, Any]]:
+        window_start = datetime.combine(self.start_date, datetime.min.time())
+        window_end = datetime.combine(self.end_date + timedelta(days=1), datetime.min.time())
+
+        open_slots = []
+        for start, end, (slot, patient) in self.index.patient_care_slots.overlapping(window_start, window_end):
+            if not self.start_date <= start.date() <= self.end_date:
+                continue
+            if patient.get('care_period_start') and start.date() < patient['care_period_start']:
+                continue
+            if patient.get('care_period_end') and start.date() > patient['care_period_end']:
+                continue
+            if SchedulingIndex.is_booked(self.index.booked_patient_care_slots.get(slot['entity_id']), start, end):
+                continue
+            if SchedulingIndex.get_visits([self.index], start, end, patient_id=slot['patient_id']):
+                continue
+
+            open_slots.append({
+                "start": start,
+                "end": end,
+                "slot": slot,
+                "patient": patient,
+                "candidates": self.get_candidates(start, end),
+            })
+        return open_slots
+
+    def get_candidates(self, start: datetime, end: datetime) -> Dict[str, Dict[str, Any]]:
+        """The cheapest availability slot of each employee who can cover [start, end), by employee id"""
+        midpoint = start + (end - start) / 2
+        candidates = {}
+        for available_from, available_to, (slot, employee) in self.index.availability.overlapping(start, end):
+            if SchedulingIndex.is_booked(self.index.booked_availability_slots.get(slot['entity_id']), start, end):
+                continue
+            if SchedulingIndex.get_visits([self.index], start, end, employee_id=slot['employee_id']):
+                continue
+
+            full = available_from <= start and available_to >= end
+            offset = abs(_minutes(midpoint, available_from + (available_to - available_from) / 2))
+            cost = offset + (0 if full else PARTIAL_MATCH_PENALTY)
+
+            best = candidates.get(slot['employee_id'])
+            if best is None or cost < best['cost']:
+                candidates[slot['employee_id']] = {
+                    "cost": cost,
+                    "offset": offset,
+                    "match_type": "full" if full else "partial",
+                    "slot": slot,
+                    "employee": employee,
+                }
+        return candidates
+
+    def _fits_quota(self, open_slot: Dict[str, Any]) -> bool:
+        weekly_quota = open_slot['patient'].get('weekly_quota')
+        # No quota set means no limit, as for care slots
+        if not weekly_quota:
+            return True
+        key = (open_slot['slot']['patient_id'], get_week_start_date(open_slot['start'].date()))
+        minutes = self.scheduled_minutes.get(key, 0) + _minutes(open_slot['start'], open_slot['end'])
+        return minutes <= weekly_quota * 60
+
+    def _can_take(self, open_slot: Dict[str, Any], employee_id: str) -> bool:
+        start, end = open_slot['start'], open_slot['end']
+        return (
+            not _overlaps(self.employee_bookings.get(employee_id, []), start, end)
+            and not _overlaps(self.patient_bookings.get(open_slot['slot']['patient_id'], []), start, end)
+            and self._fits_quota(open_slot)
+        )
+
+    def _book(self, open_slot: Dict[str, Any], employee_id: str):
+        start, end = open_slot['start'], open_slot['end']
+        patient_id = open_slot['slot']['patient_id']
+        self.employee_bookings.setdefault(employee_id, []).append((start, end))
+        self.patient_bookings.setdefault(patient_id, []).append((start, end))
+        key = (patient_id, get_week_start_date(start.date()))
+        self.scheduled_minutes[key] = self.scheduled_minutes.get(key, 0) + _minutes(start, end)
+
+    def solve(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Returns the (open slot, candidate) assignments and the open slots left unassigned"""
+        by_day = {}
+        for open_slot in self.get_open_slots():
+            by_day.setdefault(open_slot['start'].date(), []).append(open_slot)
+
+        assignments, unassigned = [], []
+        for day in sorted(by_day):
+            remaining = sorted(by_day[day], key=lambda open_slot: open_slot['start'])
+            while remaining:
+                edges = [
+                    {employee_id: candidate for employee_id, candidate in open_slot['candidates'].items()
+                     if self._can_take(open_slot, employee_id)}
+                    for open_slot in remaining
+                ]
+                # Bookings only grow, so a slot without candidates now never gets one
+                unassigned += [open_slot for open_slot, slot_edges in zip(remaining, edges) if not slot_edges]
+                remaining, edges = (
+                    [open_slot for open_slot, slot_edges in zip(remaining, edges) if slot_edges],
+                    [slot_edges for slot_edges in edges if slot_edges]
+                )
+                if not remaining:
+                    break
+
+                employee_ids = sorted({employee_id for slot_edges in edges for employee_id in slot_edges})
+                costs = [
+                    [slot_edges[employee_id]['cost'] if employee_id in slot_edges else None for employee_id in employee_ids]
+                    for slot_edges in edges
+                ]
+                pairs = sorted(min_cost_assignment(costs), key=lambda pair: costs[pair[0]][pair[1]])
+
+                # Slots of the same patient can be paired in the same round; the later ones wait
+                assigned = set()
+                for row, column in pairs:
+                    open_slot, employee_id = remaining[row], employee_ids[column]
+                    if not self._can_take(open_slot, employee_id):
+                        continue
+                    self._book(open_slot, employee_id)
+                    assignments.append((open_slot, edges[row][employee_id]))
+                    assigned.add(row)
+
+                remaining = [open_slot for row, open_slot in enumerate(remaining) if row not in assigned]
+
+        return assignments, unassigned
+
+
+class AutoSchedulerService:
+
+    def __init__(self, config):
+        self.config = config
+
+    def propose_schedule(self, organization_id: str, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Propose employees for the organization's open patient care slots between start_date
+        and end_date, from one snapshot of its slots and visits. Nothing is saved; the
+        proposed visits can be committed with `commit_schedule`.
+        """
+        if end_date < start_date:
+            raise InputValidationError("end_date must be on or after start_date.")
+        if (end_date - start_date).days >= self.config.AUTO_SCHEDULER_MAX_WINDOW_DAYS:
+            raise InputValidationError(
+                f"At most {self.config.AUTO_SCHEDULER_MAX_WINDOW_DAYS} days can be scheduled at once."
+            )
+
+        started = time.monotonic()
+        # Whole weeks are loaded, so that weekly quotas count the visits outside the window
+        index = SchedulingIndexService(self.config).build_index(
+            organization_id, get_week_start_date(start_date), get_week_start_date(end_date) + timedelta(days=6)
+        )
+        assignments, unassigned = AutoScheduler(index, start_date, end_date).solve()
+        logger.info(
+            f"Proposed {len(assignments)} visits for organization {organization_id} from {start_date} to {end_date}, "
+            f"{len(unassigned)} slots left open, in {time.monotonic() - started:.2f}s"
+        )
+
+        visits = []
+        for open_slot, candidate in assignments:
+            visits.append({
+                **self._describe_slot(open_slot),
+                "employee_id": candidate['slot']['employee_id'],
+                "employee_name": candidate['employee'].get('employee_name'),
+                "employee_display_id": candidate['employee'].get('employee_display_id'),
+                "availability_slot_id": candidate['slot']['entity_id'],
+                "match_type": candidate['match_type'],
+                "offset": candidate['offset'],
+            })
+
+        return {
+            "visits": visits,
+            "unassigned": [self._describe_slot(open_slot) for open_slot in unassigned],
+        }
+
+    @staticmethod
+    def _describe_slot(open_slot: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "patient_id": open_slot['slot']['patient_id'],
+            "patient_name": open_slot['patient'].get('patient_name'),
+            "patient_care_slot_id": open_slot['slot']['entity_id'],
+            "visit_date": open_slot['start'].date().isoformat(),
+            "scheduled_start_time": open_slot['start'].isoformat(),
+            "scheduled_end_time": open_slot['end'].isoformat(),
+        }
+
+    def commit_schedule(self, visits_data: List[Dict[str, Any]], scheduled_by_id: str,
+                        organization_id: str) -> List[CareVisit]:
+        """
+        Save proposed visits in one statement. If any of them now overlaps another visit of
+        its employee or patient, overlaps another visit of the schedule, or names a slot that
+        is not its employee's or patient's, none are saved.
+        """
+        from common.services import CareVisitService
+
+        care_visits, conflicts = CareVisitService(self.config).schedule_multiple_care_visits(
+            visits_data, scheduled_by_id, organization_id, all_or_nothing=True
+        )
+        if conflicts:
+            raise InputValidationError("; ".join(
+                f"Visit {conflict['index'] + 1}: {conflict['message']}" for conflict in conflicts
+            ))
+        return care_visits
@@ -2,10 +2,14 @@ from typing import List, Optional
 from common.helpers.exceptions import NotFoundError, InputValidationError
 from common.repositories.factory import RepositoryFactory, RepoType
 from common.models.availability_slot import AvailabilitySlot
+from common.helpers.string_utils import encode_cursor, decode_cursor
 from common.utils.slot import (
+    compact_schedule,
+    get_schedule_sort_key,
     expand_slots,
+    expand_series,
+    parse_occurrence_id,
     validate_and_parse_day_of_week,
-    get_week_start_date,
     parse_time_field,
     parse_date_field,
     validate_day_range,
@@ -13,6 +17,7 @@ from common.utils.slot import (
 )
 from datetime import time, date, timedelta
 from common.app_logger import get_logger
+from common.services.scheduling_index import invalidate_scheduling_index
 
 logger = get_logger(__name__)
 
@@ -26,6 +31,7 @@ class AvailabilitySlotService:
 
     def save_availability_slot(self, availability_slot: AvailabilitySlot):
         availability_slot = self.availability_slot_repo.save(availability_slot)
+        invalidate_scheduling_index(self.config, employee_ids=[availability_slot.employee_id])
         return availability_slot
 
     def get_availability_slot_by_id(self, entity_id: str):
@@ -33,21 +39,74 @@ class AvailabilitySlotService:
         return availability_slot
 
     def get_availability_slots_by_employee_id(self, employee_id: str):
+        from common.services import SlotSeriesService
+
         availability_slots = self.availability_slot_repo.get_many({"employee_id": employee_id})
-        return availability_slots
+        return availability_slots + SlotSeriesService(self.config).get_occurrences(employee_id=employee_id)
 
     def get_availability_slots_by_week(self, employee_id: str, week_start_date: date):
-        """Get availability slots for an employee within a date range"""
-      
-        availability_slots = self.availability_slot_repo.get_many({"employee_id": employee_id})
-        
-        return [slot for slot in availability_slots if week_start_date == get_week_start_date(slot.start_date)]
-        
+        """Get availability slots for an employee within a week, including occurrences of slot series"""
+        return self.get_availability_slots_in_range(employee_id, week_start_date, week_start_date + timedelta(days=6))
+
+    def get_availability_slots_in_range(self, employee_id: str, start_date: date, end_date: date):
+        """Get availability slots of an employee starting between start_date and end_date, including occurrences of slot series"""
+        from common.services import SlotSeriesService
+
+        slots = self.availability_slot_repo.get_employee_slots_in_range(employee_id, start_date, end_date)
+        return slots + SlotSeriesService(self.config).get_occurrences(start_date, end_date, employee_id=employee_id)
+
     def get_availability_slots_for_organization(self, organization_id: str):
+        from common.services import SlotSeriesService
+
         availability_slots = self.availability_slot_repo.get_employee_availability_slots([organization_id])
+        for slot, employee in SlotSeriesService(self.config).get_organization_occurrences("employee", [organization_id]):
+            availability_slots.append(self._get_occurrence_listing_row(slot, employee))
         
         return availability_slots
 
+    def get_organization_schedule_page(self, organization_ids: List[str], start_date: date, end_date: date,
+                                       limit: int, cursor: Optional[str] = None, compact: bool = False) -> dict:
+        """
+        A keyset page of the availability slots of the organizations' employees starting between
+        start_date and end_date, including occurrences of slot series, ordered by employee and
+        start date. Returns the slots under `data`, or in the compact format of `compact_schedule`,
+        and the `next_cursor` of the next page, which is None on the last page.
+        """
+        from common.services import SlotSeriesService
+
+        after = decode_cursor(cursor, 3) if cursor else None
+        rows = self.availability_slot_repo.get_organization_slots_page(organization_ids, start_date, end_date, limit, after)
+
+        for slot, employee in SlotSeriesService(self.config).get_organization_occurrences(
+            "employee", organization_ids, start_date, end_date
+        ):
+            row = self._get_occurrence_listing_row(slot, employee)
+            if after is None or get_schedule_sort_key(row, "employee_id") > after:
+                rows.append(row)
+
+        rows = sorted(rows, key=lambda row: get_schedule_sort_key(row, "employee_id"))[:limit]
+        next_cursor = encode_cursor(get_schedule_sort_key(rows[-1], "employee_id")) if len(rows) == limit else None
+
+        page = compact_schedule(rows, "employee_id", "patient") if compact else {"data": rows}
+        return {**page, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _get_occurrence_listing_row(slot: AvailabilitySlot, employee: dict) -> dict:
+        return {
+            "employee_id": slot.employee_id,
+            "series_id": slot.series_id,
+            "first_name": employee["first_name"],
+            "last_name": employee["last_name"],
+            "slot_id": slot.entity_id,
+            "start_time": slot.start_time,
+            "end_time": slot.end_time,
+            "start_date": slot.start_date,
+            "end_date": slot.end_date,
+            "start_day_of_week": slot.start_day_of_week,
+            "end_day_of_week": slot.end_day_of_week,
+            "care_visits": []
+        }
+
     def get_availability_slots_for_time_slot(self, start_time: time, end_time: time, visit_date: date, patient_id: str, organization_ids: List[str]) -> List[AvailabilitySlot]:
         """
         Get availability slots for a specific time slot and employee.
@@ -61,12 +120,14 @@ class AvailabilitySlotService:
         Returns:
             List of AvailabilitySlot instances that match the criteria
         """
-        results = self.availability_slot_repo.get_eligible_availability_slots_by_patient_care_slot(
+        from common.services import SchedulingIndexService
+
+        results = SchedulingIndexService(self.config).find_available_employees(
+            organization_ids=organization_ids,
+            visit_date=visit_date,
             start_time=start_time,
             end_time=end_time,
-            visit_date=visit_date,
-            patient_id=patient_id,
-            organization_ids=organization_ids
+            patient_id=patient_id
         )
 
         def time_to_minutes(t: time) -> int:
@@ -116,18 +177,24 @@ class AvailabilitySlotService:
         ]
 
     def delete_employee_availability_slot(self, employee_id: str, slot_id: str, series_id: Optional[str] = None, from_date: Optional[str] = None) -> AvailabilitySlot:
+        from common.services import SlotSeriesService
+
         if series_id and from_date:
-            deleted_slots = self.availability_slot_repo.delete_future_patient_care_slots(
+            SlotSeriesService(self.config).end_series(series_id, from_date, owner_id=employee_id)
+            deleted_slots = self.availability_slot_repo.delete_future_availability_slots(
                 employee_id=employee_id,
                 series_id=series_id,
                 from_date=from_date
             )
+            invalidate_scheduling_index(self.config, employee_ids=[employee_id])
             return deleted_slots
-        slot = self.availability_slot_repo.get_one({"entity_id": slot_id, "employee_id": employee_id})
+        slot = self._get_slot_or_occurrence(employee_id, slot_id)
         if not slot:
             raise NotFoundError(f"Availability slot with id '{slot_id}' not found for employee '{employee_id}'")
         slot.active = False
-        return self.availability_slot_repo.save(slot)
+        slot = self.availability_slot_repo.save(slot)
+        invalidate_scheduling_index(self.config, employee_ids=[employee_id])
+        return slot
 
     def update_availability_slot(self, employee_id: str, slot_id: str, slot_data: dict) -> AvailabilitySlot:
         """
@@ -142,7 +209,7 @@ class AvailabilitySlotService:
             The updated AvailabilitySlot
         """
         # Fetch existing slot
-        slot = self.availability_slot_repo.get_one({"entity_id": slot_id, "employee_id": employee_id})
+        slot = self._get_slot_or_occurrence(employee_id, slot_id)
         if not slot:
             raise NotFoundError(f"Availability slot with id '{slot_id}' not found for employee '{employee_id}'")
         
@@ -180,17 +247,40 @@ class AvailabilitySlotService:
             slot.end_date = parse_date_field(slot_data['end_date'], "end_date")
         
         logger.info(f"Updating availability slot {slot_id} for employee {employee_id}")
-        return self.availability_slot_repo.save(slot)
+        slot = self.availability_slot_repo.save(slot)
+        invalidate_scheduling_index(self.config, employee_ids=[employee_id])
+        return slot
+
+    def _get_slot_or_occurrence(self, employee_id: str, slot_id: str) -> Optional[AvailabilitySlot]:
+        """
+        Get a stored slot, or for the id of a series occurrence, the occurrence as a new
+        unsaved slot that overrides it once saved.
+        """
+        if parse_occurrence_id(slot_id):
+            from common.services import SlotSeriesService
+            return SlotSeriesService(self.config).get_occurrence(slot_id, owner_id=employee_id)
+        return self.availability_slot_repo.get_one({"entity_id": slot_id, "employee_id": employee_id})
 
     def expand_and_save_slots(self, payload, employee_id):
+        """
+        Save a recurring pattern as a slot series, stored once and expanded on read, and
+        return its occurrences. A pattern with a single occurrence is saved as a plain slot.
+        """
+        from common.services import SlotSeriesService
+
+        slot_series_service = SlotSeriesService(self.config)
+        series = slot_series_service.build_series(payload, employee_id, 'employee')
+        occurrences = expand_series(series, series.start_date, series.end_date)
+        if len(occurrences) > 1:
+            slot_series_service.save_series(series)
+            return occurrences
+
         expanded_slots = expand_slots(
             payload=payload,
             start_date=payload.get('start_date'),
             entity_id=employee_id,
             entity_type='employee'
         )
-        saved_slots = []
-        for slot in expanded_slots:
-            saved_slot = self.availability_slot_repo.save(slot)
-            saved_slots.append(saved_slot)
+        saved_slots = self.availability_slot_repo.save_many(expanded_slots)
+        invalidate_scheduling_index(self.config, employee_ids=[employee_id])
         return saved_slots
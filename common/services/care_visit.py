@@ -1,7 +1,13 @@
-from datetime import datetime
-from typing import List, Union, Dict, Any
+from datetime import datetime, timedelta
+from typing import List, Union, Dict, Any, Tuple
+from common.app_logger import get_logger
 from common.repositories.factory import RepositoryFactory, RepoType
 from common.models.care_visit import CareVisit, CareVisitStatusEnum
+from common.services.scheduling_index import invalidate_scheduling_index
+
+logger = get_logger(__name__)
+
+MISSED_VISIT_SWEEP_JOB = 'missed_visit_sweeper'
 
 class CareVisitService:
 
@@ -26,15 +32,87 @@ class CareVisitService:
         )
 
     def save_care_visit(self, care_visit: CareVisit):
-        return self.care_visit_repo.save(care_visit)
+        care_visit = self.care_visit_repo.save(care_visit)
+        self._invalidate_scheduling_index([care_visit])
+        return care_visit
+
+    def save_care_visits(self, care_visits: List[CareVisit]) -> List[CareVisit]:
+        """Save many care visits in one transaction; none are saved if any of them overlaps another visit"""
+        care_visits = self.care_visit_repo.save_many(care_visits)
+        self._invalidate_scheduling_index(care_visits)
+        return care_visits
+
+    def _invalidate_scheduling_index(self, care_visits: List[CareVisit]):
+        """Drop the cached scheduling snapshots the visits show up in"""
+        if care_visits:
+            invalidate_scheduling_index(
+                self.config,
+                employee_ids=[care_visit.employee_id for care_visit in care_visits],
+                patient_ids=[care_visit.patient_id for care_visit in care_visits],
+                organization_ids=[care_visit.organization_id for care_visit in care_visits]
+            )
+
+    def cancel_care_visit(self, care_visit: CareVisit) -> CareVisit:
+        care_visit.status = CareVisitStatusEnum.CANCELLED
+        care_visit = self.care_visit_repo.delete(care_visit)
+        self._invalidate_scheduling_index([care_visit])
+        return care_visit
+
+    def materialize_slot_occurrences(self, *slot_ids: str) -> List[str]:
+        """
+        Slots of a slot series that are booked are stored as their own slot rows first;
+        returns the given slot ids with occurrence ids replaced by the stored slot ids.
+        """
+        from common.services import SlotSeriesService
+        from common.utils.slot import parse_occurrence_id
+
+        occurrence_ids = [slot_id for slot_id in slot_ids if parse_occurrence_id(slot_id)]
+        if not occurrence_ids:
+            return list(slot_ids)
+
+        materialized = SlotSeriesService(self.config).materialize_occurrences(occurrence_ids)
+        return [materialized[slot_id].entity_id if slot_id in materialized else slot_id for slot_id in slot_ids]
+
+    def materialize_visit_slots(self, care_visits: List[CareVisit]) -> None:
+        """
+        Point new visits that book slot occurrences at the stored slot rows. Occurrences of a
+        series of another employee or patient are not stored, and keep their occurrence id
+        for schedule_care_visits to reject with the visit.
+        """
+        from common.services import SlotSeriesService
+        from common.utils.slot import parse_occurrence_id
+
+        slot_series_service = SlotSeriesService(self.config)
+        series_owners = {}
+        slot_ids = []
+        for care_visit in care_visits:
+            for slot_id, owner_id in ((care_visit.availability_slot_id, care_visit.employee_id),
+                                      (care_visit.patient_care_slot_id, care_visit.patient_id)):
+                parsed = parse_occurrence_id(slot_id)
+                if not parsed:
+                    continue
+                series_id = parsed[0]
+                if series_id not in series_owners:
+                    series = slot_series_service.get_series_by_id(series_id)
+                    series_owners[series_id] = series.owner_id if series else None
+                if series_owners[series_id] == owner_id:
+                    slot_ids.append(slot_id)
+
+        materialized = self.materialize_slot_occurrences(*slot_ids)
+        stored_ids = dict(zip(slot_ids, materialized))
+        for care_visit in care_visits:
+            care_visit.availability_slot_id = stored_ids.get(care_visit.availability_slot_id, care_visit.availability_slot_id)
+            care_visit.patient_care_slot_id = stored_ids.get(care_visit.patient_care_slot_id, care_visit.patient_care_slot_id)
 
     def schedule_care_visit(self, patient_id: str, employee_id: str, visit_date: datetime,
                             scheduled_start_time: datetime, scheduled_end_time: datetime,
                             scheduled_by_id: str, availability_slot_id: str, patient_care_slot_id: str,
                             organization_id: str):
 
-        care_visit = CareVisit(
-            status=CareVisitStatusEnum.SCHEDULED,
+        availability_slot_id, patient_care_slot_id = self.materialize_slot_occurrences(
+            availability_slot_id, patient_care_slot_id
+        )
+        care_visit = self.build_care_visit(
             patient_id=patient_id,
             employee_id=employee_id,
             visit_date=visit_date,
@@ -47,20 +125,40 @@ class CareVisitService:
         )
         return self.save_care_visit(care_visit)
 
+    def build_care_visit(self, patient_id: str, employee_id: str, visit_date: datetime,
+                         scheduled_start_time: datetime, scheduled_end_time: datetime,
+                         scheduled_by_id: str, availability_slot_id: str, patient_care_slot_id: str,
+                         organization_id: str) -> CareVisit:
+        return CareVisit(
+            status=CareVisitStatusEnum.SCHEDULED,
+            patient_id=patient_id,
+            employee_id=employee_id,
+            visit_date=visit_date,
+            scheduled_start_time=scheduled_start_time,
+            scheduled_end_time=scheduled_end_time,
+            scheduled_by_id=scheduled_by_id,
+            availability_slot_id=availability_slot_id,
+            patient_care_slot_id=patient_care_slot_id,
+            organization_id=organization_id
+        )
+
     def schedule_multiple_care_visits(self, visits_data: List[Dict[str, Any]], scheduled_by_id: str,
-                                      organization_id: str) -> List[CareVisit]:
+                                      organization_id: str,
+                                      all_or_nothing: bool = False) -> Tuple[List[CareVisit], List[Dict[str, Any]]]:
         """
-        Schedule multiple care visits from a list of visit data.
+        Schedule multiple care visits from a list of visit data, checked and saved in one
+        statement. Visits that end before they start, or conflict with existing visits, with
+        each other or with their slots are left out; returns the scheduled visits and the
+        conflicts of the others. With `all_or_nothing`, no visit is scheduled if any conflicts.
         """
-        scheduled_visits = []
-
+        care_visits = []
         for visit_data in visits_data:
             # Parse datetime fields
             visit_date = datetime.fromisoformat(visit_data['visit_date'].replace('Z', ''))
             scheduled_start_time = datetime.fromisoformat(visit_data['scheduled_start_time'].replace('Z', ''))
             scheduled_end_time = datetime.fromisoformat(visit_data['scheduled_end_time'].replace('Z', ''))
 
-            care_visit = self.schedule_care_visit(
+            care_visits.append(self.build_care_visit(
                 patient_id=visit_data['patient_id'],
                 employee_id=visit_data['employee_id'],
                 visit_date=visit_date,
@@ -70,37 +168,51 @@ class CareVisitService:
                 availability_slot_id=visit_data['availability_slot_id'],
                 patient_care_slot_id=visit_data['patient_care_slot_id'],
                 organization_id=organization_id
-            )
-            scheduled_visits.append(care_visit)
+            ))
+
+        self.materialize_visit_slots(care_visits)
 
-        return scheduled_visits
+        scheduled_visits, conflicts = self.care_visit_repo.schedule_care_visits(care_visits, all_or_nothing=all_or_nothing)
+        self._invalidate_scheduling_index(scheduled_visits)
+        return scheduled_visits, conflicts
 
     def get_care_visit_by_id(self, care_visit_id: str) -> CareVisit:
         return self.care_visit_repo.get_one({"entity_id": care_visit_id})
 
     def process_missed_visits(self, employee_id=None, current_datetime=None) -> int:
-        care_visits = self.care_visit_repo.get_care_visits(
-            employee_id=employee_id
-        )
-
-        count = 0
-        for visit_data in care_visits:
-            if (visit_data.get('status') == CareVisitStatusEnum.SCHEDULED and
-                    visit_data.get('scheduled_end_time') and
-                    visit_data['scheduled_end_time'] < current_datetime):
+        """Mark the employee's scheduled visits that ended by current_datetime as missed, in one update"""
+        # Snapshots hold the times of active visits, not their status, so they stay valid
+        counts = self.care_visit_repo.mark_missed_visits(current_datetime or datetime.utcnow(), employee_id=employee_id)
+        return sum(counts.values())
 
-                care_visit = self.get_care_visit_by_id(visit_data['entity_id'])
-                if care_visit:
-                    care_visit.status = CareVisitStatusEnum.MISSED
-                    self.save_care_visit(care_visit)
-                    count += 1
-
-        return count
+    def sweep_missed_visits(self) -> Dict[str, int]:
+        """
+        Mark the scheduled visits that have ended since the last sweep as missed, across all
+        organizations, and return the number marked per organization.
+        """
+        counts = self.care_visit_repo.sweep_missed_visits(
+            MISSED_VISIT_SWEEP_JOB,
+            datetime.utcnow(),
+            timedelta(hours=self.config.MISSED_VISIT_SWEEP_LOOKBACK_HOURS)
+        )
+        for organization_id, count in sorted(counts.items()):
+            logger.info(f"Marked {count} visits as missed for organization {organization_id}")
+        return counts
 
     def create_care_visit_from_assignment(self, visit_data: Dict[str, Any]) -> CareVisit:
         """
         Create a care visit from employee assignment data.
         """
+        availability_slot_id, patient_care_slot_id = self.materialize_slot_occurrences(
+            visit_data.get('availability_slot_id', ''), visit_data.get('patient_care_slot_id', '')
+        )
+        visit_data = {**visit_data, 'availability_slot_id': availability_slot_id, 'patient_care_slot_id': patient_care_slot_id}
+        return self.save_care_visit(self.build_care_visit_from_assignment(visit_data))
+
+    def build_care_visit_from_assignment(self, visit_data: Dict[str, Any]) -> CareVisit:
+        """
+        Build an unsaved care visit from employee assignment data.
+        """
         from datetime import datetime, date, time
       
         # Parse date and time fields
@@ -115,6 +227,9 @@ class CareVisitService:
         # Convert time strings to datetime objects for the visit date
         start_time = datetime.strptime(f"{visit_date} {start_time_str}", '%Y-%m-%d %H:%M')
         end_time = datetime.strptime(f"{visit_date} {end_time_str}", '%Y-%m-%d %H:%M')
+        # Overnight slots (e.g. 22:00 to 06:00) end on the next day
+        if end_time <= start_time:
+            end_time += timedelta(days=1)
         
         # Convert visit_date to datetime (start of day) since the model expects datetime
         visit_datetime = datetime.combine(visit_date, datetime.min.time())
@@ -133,7 +248,7 @@ class CareVisitService:
             organization_id=visit_data['organization_id']
         )
         
-        return self.save_care_visit(care_visit)
+        return care_visit
 
     def assign_employee_to_recurring_pattern(self, visit_data: Dict[str, Any]) -> List[CareVisit]:
         """
@@ -160,10 +275,9 @@ class CareVisitService:
         if not all_slots:
             raise ValueError(f"No active slots found for series_id: {series_id}")
         
+        availability_slots = []
         created_visits = []
 
-        availability_slot_service = AvailabilitySlotService(self.config)
-
         for slot in all_slots:
             # Create a matching availability slot for the employee for this occurrence 
             availability_slot = AvailabilitySlot(
@@ -176,19 +290,24 @@ class CareVisitService:
                 end_date=slot.end_date,
                 series_id = slot.series_id
             )
-            
-            saved_availability_slot = availability_slot_service.save_availability_slot(availability_slot)
+            availability_slots.append(availability_slot)
 
-           
             slot_visit_data = {
                 **visit_data,
                 'visit_date': slot.start_date.strftime('%Y-%m-%d'),
                 'scheduled_start_time': slot.start_time.strftime('%H:%M'), 
                 'scheduled_end_time': slot.end_time.strftime('%H:%M'),
                 'patient_care_slot_id': getattr(slot, 'entity_id', ''),
-                'availability_slot_id': getattr(saved_availability_slot, 'entity_id', ''),
+                'availability_slot_id': availability_slot.entity_id,
             }
-            care_visit = self.create_care_visit_from_assignment(slot_visit_data)
-            created_visits.append(care_visit)
+            created_visits.append(self.build_care_visit_from_assignment(slot_visit_data))
+
+        # Save the whole series of availability slots and visits in one transaction
+        availability_slot_repo = AvailabilitySlotService(self.config).availability_slot_repo
+        queries = availability_slot_repo.get_save_many_queries(availability_slots)
+        queries += self.care_visit_repo.get_save_many_queries(created_visits)
+        self.care_visit_repo.run_transaction(queries)
+        self._invalidate_scheduling_index(created_visits)
+
         return created_visits
     
\ No newline at end of file
@@ -11,6 +11,7 @@ class CurrentEmployeesFileService:
         self.config = config
         self.repository_factory = RepositoryFactory(config)
         self.current_employees_file_repo = self.repository_factory.get_repository(RepoType.CURRENT_EMPLOYEES_FILE, message_queue_name="")
+        self.dashboard_counters_repo = self.repository_factory.get_repository(RepoType.EXCLUSION_DASHBOARD_COUNTERS, message_queue_name="")
 
     def get_by_id(self, entity_id: str, organization_id: str) -> CurrentEmployeesFile:
         """
@@ -66,7 +67,11 @@ class CurrentEmployeesFileService:
         """
         logger.info(f"Updating file status to '{status}' for organization: {instance.organization_id}")
         instance.status = status
-        return self.current_employees_file_repo.save(instance)
+        instance = self.current_employees_file_repo.save(instance)
+        if status in (CurrentEmployeesFileStatusEnum.IMPORTED, CurrentEmployeesFileStatusEnum.DONE, CurrentEmployeesFileStatusEnum.ERROR):
+            # A finished import changes the employee and file counts on the exclusion dashboard
+            self.dashboard_counters_repo.invalidate(instance.organization_id)
+        return instance
 
     def update_record_count(self, instance: CurrentEmployeesFile, count: int) -> CurrentEmployeesFile:
         """
@@ -10,9 +10,10 @@ from common.models.employee import Employee
 from common.models.current_employees_file import CurrentEmployeesFile, CurrentEmployeesFileStatusEnum
 from common.services.s3_client import S3ClientService
 from common.services.alert import AlertService
+from common.services.outbox import OutboxService
+from common.services.employee_exclusion_match import EmployeeExclusionMatchService
 from common.services.current_employees_file import CurrentEmployeesFileService
 from common.helpers.csv_utils import get_first_matching_column_value,is_valid_email
-from common.tasks.send_message import send_message
 
 logger = get_logger(__name__)
 
@@ -26,6 +27,8 @@ class EmployeeService:
         self.current_employees_file_service = CurrentEmployeesFileService(config)
         self.s3_client = S3ClientService()
         self.alert_service = AlertService(config)
+        self.outbox_service = OutboxService(config)
+        self.employee_exclusion_match_service = EmployeeExclusionMatchService(config)
         self.bucket_name = config.AWS_S3_BUCKET_NAME
         self.employees_prefix = f"{config.AWS_S3_KEY_PREFIX}employees-list/"
         self.physicians_prefix = f"{config.AWS_S3_KEY_PREFIX}physicians-list/"
@@ -262,17 +265,25 @@ class EmployeeService:
         self.s3_client.delete_object(s3_key)
         return True
 
-    def get_employees_with_matches(self, organization_id: str) -> List[Employee]:
+    def get_employees_with_matches(self, organization_id: str, page: int = None, page_size: int = None) -> tuple[List[dict], int]:
         """
-        Get employees who have at least one match in the employee_exclusion_match table.
+        Get employees and physicians who have at least one active exclusion match.
         
         Args:
             organization_id (str): The ID of the organization to filter by.
+            page (int): Optional 1-based page number; requires page_size.
+            page_size (int): Optional number of entities per page; all are returned if not set.
         
         Returns:
-            List[Employee]: List of Employee objects with matches.
+            tuple: The entity dictionaries with their match summary, and the total number of matched entities.
         """
-        return self.employee_repo.get_employees_with_matches(organization_id)
+        if not page_size:
+            return self.employee_repo.get_employees_with_matches(organization_id)
+
+        page = max(page or 1, 1)
+        return self.employee_repo.get_employees_with_matches(
+            organization_id, limit=page_size, offset=(page - 1) * page_size
+        )
 
     def get_employees_by_organization(self, organization_ids: List[str], employee_type: str = None) -> List[Employee]:
         """
@@ -299,28 +310,49 @@ class EmployeeService:
         """
         return self.employee_repo.get_one({'person_id': person_id, 'organization_id': organization_id})
 
-    def save_employee(self, employee: Employee) -> Employee:
+    def save_employee(self, employee: Employee, trigger_match: bool = False, previous_match_fields: tuple = None) -> Employee:
         """
         Save an employee record to the database.
         
         Args:
             employee (Employee): The employee object to save.
+            trigger_match (bool): Also queue an exclusion match request for the employee,
+                written to the outbox in the same transaction as the save.
+            previous_match_fields (tuple): For an edit, the employee's `get_match_fields` before
+                the change. A targeted rematch is queued only if the name or date of birth changed.
         
         Returns:
             Employee: The saved employee object with updated entity_id.
         """
-        return self.employee_repo.save(employee)
+        outbox_messages = None
+        if previous_match_fields is not None:
+            if self.get_match_fields(employee) != previous_match_fields:
+                outbox_messages = [self.employee_exclusion_match_service.get_rematch_message(
+                    'employee', employee.entity_id, employee.organization_id
+                )]
+        elif trigger_match:
+            outbox_messages = [self.get_match_request_message(employee.entity_id)]
+        return self.employee_repo.save(employee, outbox_messages=outbox_messages)
 
-    def trigger_match_for_employee(self, entity_id: str):
-        logger.info("Triggering matching process for employee: %s", entity_id)
-        logger.info("Sending message to queue: %s",
-            self.config.PREFIXED_EMPLOYEE_EXCLUSION_MATCH_PROCESSOR_QUEUE_NAME
+    def get_match_fields(self, employee: Employee) -> tuple:
+        """Returns the employee's normalized name and date of birth used for exclusion matching"""
+        return self.employee_exclusion_match_service.get_match_fields(
+            employee.first_name, employee.last_name, employee.date_of_birth
         )
-        send_message(
-            queue_name=self.config.PREFIXED_EMPLOYEE_EXCLUSION_MATCH_PROCESSOR_QUEUE_NAME,
-            data={
+
+    def get_match_request_message(self, entity_id: str) -> tuple:
+        """Returns the (queue_name, message) pair requesting an exclusion match for an employee"""
+        return (
+            self.config.PREFIXED_EMPLOYEE_EXCLUSION_MATCH_PROCESSOR_QUEUE_NAME,
+            {
                 'action': 'match_exclusions',
                 'source': 'employee_creation',
                 'employee_id': entity_id
             }
-        )
\ No newline at end of file
+        )
+
+    def trigger_match_for_employee(self, entity_id: str):
+        logger.info("Triggering matching process for employee: %s", entity_id)
+        queue_name, message = self.get_match_request_message(entity_id)
+        logger.info("Adding message for queue %s to the outbox", queue_name)
+        self.outbox_service.enqueue(queue_name, message)
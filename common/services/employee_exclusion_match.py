@@ -1,11 +1,13 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
 
 from common.app_logger import get_logger
 from common.repositories.factory import RepositoryFactory, RepoType
 from common.models.employee_exclusion_match import EmployeeExclusionMatch
 from common.models.person import Person
-from common.helpers.exceptions import APIException
+from common.models.exclusion_dashboard_counters import ExclusionDashboardCounters
+from common.helpers.exceptions import APIException, InputValidationError
+from common.helpers.string_utils import encode_cursor, decode_cursor
 
 logger = get_logger(__name__)
 
@@ -16,6 +18,32 @@ class EmployeeExclusionMatchService:
         self.config = config
         self.repository_factory = RepositoryFactory(config)
         self.employee_exclusion_match_repo = self.repository_factory.get_repository(RepoType.EMPLOYEE_EXCLUSION_MATCH)
+        self.dashboard_counters_repo = self.repository_factory.get_repository(RepoType.EXCLUSION_DASHBOARD_COUNTERS)
+
+    @staticmethod
+    def get_match_fields(first_name, last_name, date_of_birth) -> tuple:
+        """
+        Returns the values exclusion matching depends on, normalized the way the match
+        queries compare them. A rematch is only needed when these change.
+        """
+        return (
+            (first_name or '').strip().lower(),
+            (last_name or '').strip().lower(),
+            str(date_of_birth) if date_of_birth else None
+        )
+
+    def get_rematch_message(self, entity_type: str, entity_id: str, organization_id: str = None) -> tuple:
+        """Returns the (queue_name, message) pair requesting a targeted rematch of one employee or physician"""
+        return (
+            self.config.PREFIXED_EMPLOYEE_EXCLUSION_MATCH_PROCESSOR_QUEUE_NAME,
+            {
+                'action': 'match_exclusions',
+                'source': 'entity_update',
+                'entity_type': entity_type,
+                'entity_id': entity_id,
+                'organization_id': organization_id
+            }
+        )
 
     def get_all_matches(self, organization_id) -> List[EmployeeExclusionMatch]:
         """Get all employee exclusion matches"""
@@ -23,12 +51,59 @@ class EmployeeExclusionMatchService:
             match.as_dict() for match in self.employee_exclusion_match_repo.get_all(organization_id=organization_id)
         ]
     
+    def get_matches_page(self, organization_id: str, filters: dict = None, name_prefix: str = None,
+                         limit: int = None, cursor: str = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        Get a keyset-paginated page of the organization's matches, ordered by name.
+
+        Returns the matches as dicts and the cursor of the next page, which is None on the last page.
+        Raises InputValidationError for an unknown filter or a malformed cursor.
+        """
+        filters = filters or {}
+        unknown = set(filters) - set(self.employee_exclusion_match_repo.LISTING_FILTER_COLUMNS)
+        if unknown:
+            raise InputValidationError(f"Unknown match filter(s): {', '.join(sorted(unknown))}")
+
+        after = self.decode_cursor(cursor) if cursor else None
+        matches = self.employee_exclusion_match_repo.get_matches_page(
+            organization_id, filters=filters, name_prefix=name_prefix, limit=limit, after=after
+        )
+
+        next_cursor = None
+        if limit and len(matches) == limit:
+            next_cursor = self.encode_cursor(self.employee_exclusion_match_repo.get_listing_sort_key(matches[-1]))
+
+        return [match.as_dict() for match in matches], next_cursor
+
+    def count_matches(self, organization_id: str, filters: dict = None, name_prefix: str = None) -> int:
+        """Count the organization's active matches with the filters of `get_matches_page`."""
+        return self.employee_exclusion_match_repo.count_matches(organization_id, filters=filters, name_prefix=name_prefix)
+
+    @staticmethod
+    def encode_cursor(sort_key: tuple) -> str:
+        return encode_cursor(sort_key)
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        return decode_cursor(cursor, 3)
+
+    def get_dashboard_counters(self, organization_id: str) -> ExclusionDashboardCounters:
+        """
+        Get the exclusion dashboard counters (employees, active matches, finished files)
+        from the cache, recomputing them if they were invalidated or are older than the TTL.
+        """
+        counters = self.dashboard_counters_repo.get_cached(organization_id, self.config.EXCLUSION_DASHBOARD_CACHE_TTL_SECONDS)
+        if counters is None:
+            counters = self.dashboard_counters_repo.compute(organization_id)
+        return counters
+
     def get_all_matches_count(self, organization_id) -> int:
         """Get all employee exclusion matches"""
         return self.employee_exclusion_match_repo.get_all_count(organization_id=organization_id)
 
     def update_exclusion_match(self, matched_entity_id: str, matched_entity_type: str, organization_id: str, reviewer: Person, reviewer_notes: str=None, status: str=None):
         matches = self.get_matches_by_entity(organization_id, matched_entity_id, matched_entity_type)
+        any_saved = False
 
         for match in matches:
             should_save = False
@@ -47,6 +122,10 @@ class EmployeeExclusionMatchService:
                 match.status = status if status else match.status
                 match.reviewer_notes = reviewer_notes if reviewer_notes else match.reviewer_notes
                 self.employee_exclusion_match_repo.save(match)
+                any_saved = True
+
+        if any_saved:
+            self.employee_exclusion_match_repo.refresh_match_summaries([(matched_entity_type, matched_entity_id)])
 
         return matches
 
@@ -0,0 +1,177 @@
+import time
+import threading
+from datetime import date
+from typing import Optional, List, Dict, Any
+
+from common.app_logger import get_logger
+from common.repositories.factory import RepositoryFactory, RepoType
+from common.services.oig_exclusions_check import OigExclusionsCheckService
+from common.helpers.csv_utils import parse_date
+from common.helpers.exceptions import InputValidationError
+
+logger = get_logger(__name__)
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """Lowercase a name and collapse its whitespace, so that lookups ignore formatting differences"""
+    if not value:
+        return ''
+    return ' '.join(str(value).lower().split())
+
+
+def normalize_npi(value: Optional[str]) -> str:
+    if not value:
+        return ''
+    npi = ''.join(ch for ch in str(value) if ch.isdigit())
+    # The LEIE uses 0000000000 for records without an NPI
+    return '' if not npi or set(npi) == {'0'} else npi
+
+
+class ExclusionIndex:
+    """
+    Immutable in-memory snapshot of the exclusion list, keyed by normalized
+    (first name, last name) and by NPI. A new snapshot is built on every refresh
+    and swapped in whole, so readers on other threads never see a partial index.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], version: Optional[str] = None):
+        self.version = version
+        self.record_count = len(records)
+        self.by_name = {}
+        self.by_npi = {}
+
+        for record in records:
+            first_name = normalize_name(record.get('first_name'))
+            last_name = normalize_name(record.get('last_name'))
+            if first_name and last_name:
+                self.by_name.setdefault((first_name, last_name), []).append(record)
+
+            npi = normalize_npi(record.get('npi'))
+            if npi:
+                self.by_npi.setdefault(npi, []).append(record)
+
+    def lookup(self, first_name: str = None, last_name: str = None, date_of_birth: date = None,
+               npi: str = None) -> List[Dict[str, Any]]:
+        """
+        Find the exclusion records matching a candidate.
+
+        A name match is reported as 'name_and_dob' when the birth dates agree and
+        'name_only' otherwise, as the match service does; an NPI match is 'npi'.
+        """
+        matches = {}
+
+        for record in self.by_name.get((normalize_name(first_name), normalize_name(last_name)), []):
+            dob_matches = date_of_birth is not None and record.get('date_of_birth') == date_of_birth
+            matches[record['id']] = dict(record, match_type='name_and_dob' if dob_matches else 'name_only')
+
+        normalized_npi = normalize_npi(npi)
+        if normalized_npi:
+            for record in self.by_npi.get(normalized_npi, []):
+                matches.setdefault(record['id'], dict(record, match_type='npi'))
+
+        return list(matches.values())
+
+
+# Shared by every request thread of the process
+_index = None
+_index_lock = threading.Lock()
+_last_version_check = 0.0
+
+
+class ExclusionLookupService:
+
+    def __init__(self, config):
+        self.config = config
+        self.repository_factory = RepositoryFactory(config)
+        self.oig_exclusions_repo = self.repository_factory.get_repository(RepoType.OIG_EMPLOYEES_EXCLUSION, message_queue_name="")
+        self.oig_exclusions_check_service = OigExclusionsCheckService(config)
+
+    def get_index(self) -> ExclusionIndex:
+        """
+        Get the process-wide exclusion index, building it on first use.
+
+        At most once every EXCLUSION_INDEX_REFRESH_SECONDS the latest successful OIG import
+        is looked up, and the index is rebuilt if it was loaded from an older import. Only
+        the first build is waited for; while one thread checks and rebuilds, the others
+        keep using the current index.
+        """
+        global _index, _last_version_check
+
+        index = _index
+        if index is not None and time.monotonic() - _last_version_check < self.config.EXCLUSION_INDEX_REFRESH_SECONDS:
+            return index
+
+        if not _index_lock.acquire(blocking=index is None):
+            # Another thread is already refreshing the index
+            return index
+
+        try:
+            # Another thread may have refreshed the index while this one waited for the lock
+            if _index is not None and time.monotonic() - _last_version_check < self.config.EXCLUSION_INDEX_REFRESH_SECONDS:
+                return _index
+
+            version = self.oig_exclusions_check_service.get_latest_import_id()
+            if _index is None or _index.version != version:
+                _index = self.build_index(version)
+            _last_version_check = time.monotonic()
+            return _index
+        finally:
+            _index_lock.release()
+
+    def build_index(self, version: Optional[str] = None) -> ExclusionIndex:
+        started = time.monotonic()
+        index = ExclusionIndex(self.oig_exclusions_repo.get_index_records(), version=version)
+        logger.info(
+            f"Built exclusion index from import {version} with {index.record_count} records "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return index
+
+    def lookup(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Check candidates against the exclusion list before they are saved.
+
+        Each candidate is a dict with first_name, last_name and optionally date_of_birth
+        (YYYY-MM-DD, MM/DD/YYYY or YYYYMMDD) and npi. Returns one result per candidate,
+        in order, with the matching exclusion records.
+        """
+        if len(candidates) > self.config.EXCLUSION_LOOKUP_MAX_BATCH_SIZE:
+            raise InputValidationError(
+                f"At most {self.config.EXCLUSION_LOOKUP_MAX_BATCH_SIZE} candidates can be looked up per request."
+            )
+
+        parsed = []
+        for position, candidate in enumerate(candidates):
+            if not isinstance(candidate, dict):
+                raise InputValidationError(f"Candidate {position} must be an object.")
+
+            has_name = candidate.get('first_name') and candidate.get('last_name')
+            if not has_name and not candidate.get('npi'):
+                raise InputValidationError(f"Candidate {position} needs first_name and last_name, or npi.")
+
+            date_of_birth = None
+            if candidate.get('date_of_birth'):
+                date_of_birth = parse_date(str(candidate['date_of_birth']))
+                if date_of_birth is None:
+                    raise InputValidationError(f"Candidate {position} has an invalid date_of_birth.")
+            parsed.append((candidate, date_of_birth))
+
+        index = self.get_index()
+        results = []
+        for candidate, date_of_birth in parsed:
+            matches = index.lookup(
+                first_name=candidate.get('first_name'),
+                last_name=candidate.get('last_name'),
+                date_of_birth=date_of_birth,
+                npi=candidate.get('npi'),
+            )
+            results.append({
+                'first_name': candidate.get('first_name'),
+                'last_name': candidate.get('last_name'),
+                'date_of_birth': date_of_birth,
+                'npi': candidate.get('npi'),
+                'excluded': bool(matches),
+                'matches': matches,
+            })
+
+        return results
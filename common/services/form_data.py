@@ -2,6 +2,8 @@ from typing import List, Optional
 from datetime import datetime
 from common.repositories.factory import RepositoryFactory, RepoType
 from common.models.form_data import FormData
+from common.services.employee_exclusion_match import EmployeeExclusionMatchService
+from common.services.outbox import OutboxService
 from common.app_logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,6 +21,9 @@ class FormDataService:
         self.form_data_repo = self.repository_factory.get_repository(RepoType.FORM_DATA)
         self.employee_repo = self.repository_factory.get_repository(RepoType.EMPLOYEE)
         self.person_repo = self.repository_factory.get_repository(RepoType.PERSON)
+        self.physician_repo = self.repository_factory.get_repository(RepoType.PHYSICIAN)
+        self.employee_exclusion_match_service = EmployeeExclusionMatchService(config)
+        self.outbox_service = OutboxService(config)
 
     def save_form_field(self, person_id: str, form_name: str, field_name: str, value: str, 
                        organization_id: str = None) -> FormData:
@@ -149,27 +154,59 @@ class FormDataService:
             }
             
             field_lower = field_name.lower()
+            match_fields_changed = False
             
             # Update Employee record if applicable
             if field_lower in employee_update_fields and organization_id:
-                self._update_employee_field(person_id, organization_id, employee_update_fields[field_lower], value)
+                match_fields_changed |= self._update_employee_field(person_id, organization_id, employee_update_fields[field_lower], value)
             
             # Update Person record for name fields
             if field_lower in ['first_name', 'last_name']:
-                self._update_person_name(person_id, field_lower, value)
+                match_fields_changed |= self._update_person_name(person_id, field_lower, value)
+
+            # Exclusion matches depend on the name and date of birth
+            if match_fields_changed:
+                self._trigger_rematch_for_person(person_id)
                 
         except Exception as e:
             logger.warning(f"Failed to update employee data from form field: {e}")
 
-    def _update_employee_field(self, person_id: str, organization_id: str, employee_field: str, value: str) -> None:
-        """Update a specific employee field."""
+    def _update_employee_field(self, person_id: str, organization_id: str, employee_field: str, value: str) -> bool:
+        """
+        Update a specific employee field.
+
+        Returns:
+            True if a field used for exclusion matching (name or date of birth) changed
+        """
         employee = self.employee_repo.get_one({'person_id': person_id, 'organization_id': organization_id})
         if employee:
             converted_value = self._convert_value_for_employee_field(employee_field, value)
             if converted_value is not None:
+                previous_match_fields = self._get_employee_match_fields(employee)
                 setattr(employee, employee_field, converted_value)
                 self.employee_repo.save(employee)
                 logger.info(f"Updated employee {employee_field} from form data: {person_id}")
+                return self._get_employee_match_fields(employee) != previous_match_fields
+        return False
+
+    def _get_employee_match_fields(self, employee) -> tuple:
+        return self.employee_exclusion_match_service.get_match_fields(
+            employee.first_name, employee.last_name, employee.date_of_birth
+        )
+
+    def _trigger_rematch_for_person(self, person_id: str) -> None:
+        """
+        Queue targeted exclusion rematches for the employees and physicians of a person
+        whose name or date of birth changed.
+        """
+        entities = [('employee', employee) for employee in self.employee_repo.get_many({'person_id': person_id})]
+        entities += [('physician', physician) for physician in self.physician_repo.get_many({'person_id': person_id})]
+        for entity_type, entity in entities:
+            queue_name, message = self.employee_exclusion_match_service.get_rematch_message(
+                entity_type, entity.entity_id, entity.organization_id
+            )
+            self.outbox_service.enqueue(queue_name, message)
+        logger.info(f"Queued exclusion rematch for {len(entities)} entities of person: {person_id}")
 
     def _convert_value_for_employee_field(self, employee_field: str, value: str) -> Optional[str]:
         """
@@ -227,7 +264,7 @@ class FormDataService:
         logger.warning(f"Could not parse date: {date_string}")
         return None
 
-    def _update_person_name(self, person_id: str, field_name: str, value: str) -> None:
+    def _update_person_name(self, person_id: str, field_name: str, value: str) -> bool:
         """
         Update the Person record with first_name or last_name.
         
@@ -235,18 +272,24 @@ class FormDataService:
             person_id: The person's entity ID
             field_name: The field name ('first_name' or 'last_name')
             value: The field value
+
+        Returns:
+            True if the name changed
         """
         try:
             person = self.person_repo.get_one({'entity_id': person_id})
             if person:
+                changed = (getattr(person, field_name) or '').strip().lower() != (value or '').strip().lower()
                 setattr(person, field_name, value)
                 self.person_repo.save(person)
                 logger.info(f"Updated person {field_name} from form data: {person_id}")
+                return changed
             else:
                 logger.warning(f"Person not found for ID: {person_id}")
                 
         except Exception as e:
             logger.warning(f"Failed to update person {field_name} from form field: {e}")
+        return False
 
     def _validate_person_exists(self, person_id: str) -> None:
         """
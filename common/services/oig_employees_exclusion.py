@@ -1,9 +1,8 @@
-from typing import List, Dict
+from typing import List
 
 from common.app_logger import get_logger
 from common.repositories.factory import RepositoryFactory, RepoType
 from common.models.oig_employees_exclusion import OigEmployeesExclusion
-from common.helpers.csv_utils import clean_string, parse_date
 
 logger = get_logger(__name__)
 
@@ -20,10 +19,22 @@ class OigEmployeesExclusionService:
         logger.info("Deleting all existing OIG exclusion records...")
         return self.oig_exclusions_repo.truncate_table()
 
-    def bulk_import_exclusions(self, rows: List[Dict[str, str]]) -> bool:
-        """Import CSV data into oig_employees_exclusion table using batch processing"""
-        record_count = len(rows)
-        logger.info(f"Inserting {record_count} OIG exclusion records...")
+    def delete_source_exclusions(self, source: str) -> bool:
+        """Delete the existing records of one exclusion list source"""
+        logger.info(f"Deleting existing {source} exclusion records...")
+        return self.oig_exclusions_repo.delete_by_source(source)
+
+    def replace_source_exclusions(self, source: str, columns: list, batches) -> bool:
+        """Replace one exclusion list source's records with COPY batches, atomically"""
+        logger.info(f"Replacing {source} exclusion records...")
+        self.oig_exclusions_repo.replace_source_exclusions(source, columns, batches)
+        logger.info(f"Successfully imported {source} exclusion records")
+        return True
+
+    def bulk_import_exclusions(self, records: List[OigEmployeesExclusion]) -> bool:
+        """Import parsed exclusion records into oig_employees_exclusion table using batch processing"""
+        record_count = len(records)
+        logger.info(f"Inserting {record_count} exclusion records...")
         
         # Process in batches for better performance
         batch_size = 1000
@@ -32,36 +43,14 @@ class OigEmployeesExclusionService:
         for batch_num in range(total_batches):
             start_idx = batch_num * batch_size
             end_idx = min(start_idx + batch_size, record_count)
-            batch_rows = rows[start_idx:end_idx]
             
             with self.oig_exclusions_repo.adapter:
-                for row in batch_rows:
-                    record = OigEmployeesExclusion(
-                        last_name=clean_string(row.get('LASTNAME')),
-                        first_name=clean_string(row.get('FIRSTNAME')),
-                        middle_name=clean_string(row.get('MIDNAME')),
-                        business_name=clean_string(row.get('BUSNAME')),
-                        general=clean_string(row.get('GENERAL')),
-                        specialty=clean_string(row.get('SPECIALTY')),
-                        upin=clean_string(row.get('UPIN')),
-                        npi=clean_string(row.get('NPI')),
-                        date_of_birth=parse_date(row.get('DOB')),
-                        address=clean_string(row.get('ADDRESS')),
-                        city=clean_string(row.get('CITY')),
-                        state=clean_string(row.get('STATE')),
-                        zip_code=clean_string(row.get('ZIP')),
-                        exclusion_type=clean_string(row.get('EXCLTYPE')),
-                        exclusion_date=parse_date(row.get('EXCLDATE')),
-                        reinstatement_date=parse_date(row.get('REINDATE')),
-                        waiver_date=parse_date(row.get('WAIVERDATE')),
-                        waiver_state=clean_string(row.get('WVRSTATE'))
-                    )
-                    
+                for record in records[start_idx:end_idx]:
                     self.oig_exclusions_repo.insert_exclusion(record)
             
             logger.info(f"Completed batch {batch_num+1}/{total_batches}")
         
-        logger.info("Successfully imported OIG LEIE data")
+        logger.info("Successfully imported exclusion records")
         return True
 
     def get_exclusion_by_id(self, exclusion_id: int) -> OigEmployeesExclusion:
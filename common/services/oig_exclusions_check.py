@@ -1,5 +1,5 @@
 from typing import Optional, List
-from datetime import date
+from datetime import date, datetime
 
 from common.app_logger import get_logger
 from common.repositories.factory import RepositoryFactory, RepoType
@@ -14,30 +14,99 @@ class OigExclusionsCheckService:
         self.config = config
         self.repository_factory = RepositoryFactory(config)
         self.oig_checks_repo = self.repository_factory.get_repository(RepoType.OIG_EXCLUSIONS_CHECK, message_queue_name="")
+        self.sweep_item_repo = self.repository_factory.get_repository(RepoType.OIG_MATCH_SWEEP_ITEM, message_queue_name="")
     
-    def get_last_successful_import_date(self) -> Optional[date]:
+    def get_last_successful_import_date(self, source: str = 'leie') -> Optional[date]:
         """Get the last successful import date from oig_exclusions_check table"""
+        last_import = self.get_last_successful_import(source)
+        return last_import.last_update_on_webpage if last_import else None
+
+    def get_last_successful_import(self, source: str = 'leie') -> Optional[OigExclusionsCheck]:
+        """Get the latest 'imported' check of an exclusion list source"""
         # Get all records with status 'imported', ordered by created_at desc
-        successful_imports = self.oig_checks_repo.get_checks_by_status('imported')
+        successful_imports = self.oig_checks_repo.get_checks_by_status('imported', source=source)
         if successful_imports:
             # Sort by changed_on descending and get the first one
             successful_imports.sort(key=lambda x: x.changed_on, reverse=True)
-            return successful_imports[0].last_update_on_webpage
+            return successful_imports[0]
         
         return None
 
     
-    def log_check_result(self, status: str, last_update_on_webpage: Optional[date] = None) -> bool:
+    def get_last_validated_check(self, source: str = 'leie') -> Optional[OigExclusionsCheck]:
+        """
+        Get the latest check of a source that stored HTTP validators and confirmed the
+        imported data is current ('imported' or 'no_update')
+        """
+        return self.oig_checks_repo.get_last_validated_check(source)
+
+    def get_latest_import_id(self) -> Optional[str]:
+        """Get the ID of the latest successful import check of any source, which identifies the loaded exclusion data"""
+        return self.oig_checks_repo.get_latest_import_id()
+
+    def log_check_result(self, status: str, last_update_on_webpage: Optional[date] = None, source: str = 'leie',
+                         content_hash: Optional[str] = None, validators: Optional[dict] = None) -> OigExclusionsCheck:
         """Log the check result to oig_exclusions_check table"""
+        validators = validators or {}
         check_record = OigExclusionsCheck(
             status=status,
-            last_update_on_webpage=last_update_on_webpage
+            last_update_on_webpage=last_update_on_webpage,
+            source=source,
+            content_hash=content_hash,
+            etag=validators.get('etag'),
+            last_modified=validators.get('last_modified'),
+            content_length=validators.get('content_length')
         )
         
         # Use repository method to save the check record
         self.oig_checks_repo.save(check_record)
-        logger.info(f"Logged check result with status: {status}")
-        return True
+        logger.info(f"Logged {source} check result with status: {status}")
+        return check_record
+
+    def start_match_sweep(self, check_records: List[OigExclusionsCheck]) -> List[str]:
+        """
+        Create one rematch work item per organization for the imports of a run and mark the
+        sweep in progress on the last check record. Every check record is linked to it by
+        match_sweep_check_id.
+
+        Returns:
+            List[str]: The organization IDs to rematch
+        """
+        sweep_check = check_records[-1]
+        organization_ids = self.sweep_item_repo.get_organization_ids_to_sweep()
+        self.sweep_item_repo.create_items(sweep_check.entity_id, organization_ids)
+
+        sweep_check.match_sweep_total = len(organization_ids)
+        if organization_ids:
+            sweep_check.match_sweep_status = 'in_progress'
+        else:
+            sweep_check.match_sweep_status = 'completed'
+            sweep_check.match_sweep_completed_on = datetime.utcnow()
+        for check_record in check_records:
+            check_record.match_sweep_check_id = sweep_check.entity_id
+        self.oig_checks_repo.save_many(check_records)
+
+        logger.info(f"Started OIG match sweep {sweep_check.entity_id} for {len(organization_ids)} organizations")
+        return organization_ids
+
+    def complete_match_sweep_item(self, check_id: str, organization_id: str, match_count: int = None, failed: bool = False) -> None:
+        """
+        Record that an organization's rematch finished. The sweep is completed on the
+        check record once no organization is pending.
+        """
+        status = 'failed' if failed else 'done'
+        progress = self.sweep_item_repo.complete_item(check_id, organization_id, status, match_count)
+        if progress['pending']:
+            return
+
+        check_record = self.oig_checks_repo.get_one({'entity_id': check_id})
+        if not check_record or check_record.match_sweep_status != 'in_progress':
+            return
+
+        check_record.match_sweep_status = 'completed_with_errors' if progress['failed'] else 'completed'
+        check_record.match_sweep_completed_on = datetime.utcnow()
+        self.oig_checks_repo.save(check_record)
+        logger.info(f"OIG match sweep {check_id} finished with status: {check_record.match_sweep_status}")
 
     
     def get_all_checks(self) -> List[OigExclusionsCheck]:
@@ -45,6 +114,6 @@ class OigExclusionsCheckService:
         return self.oig_checks_repo.get_all_checks()
 
     
-    def get_checks_by_status(self, status: str) -> List[OigExclusionsCheck]:
+    def get_checks_by_status(self, status: str, source: str = None) -> List[OigExclusionsCheck]:
         """Get OIG exclusion checks by status"""
-        return self.oig_checks_repo.get_checks_by_status(status)
+        return self.oig_checks_repo.get_checks_by_status(status, source=source)
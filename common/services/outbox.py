@@ -0,0 +1,63 @@
+from common.app_logger import get_logger
+from common.repositories.factory import RepositoryFactory, RepoType
+from common.tasks.send_message import get_publisher
+
+logger = get_logger(__name__)
+
+
+class OutboxService:
+
+    def __init__(self, config):
+        self.config = config
+        self.repository_factory = RepositoryFactory(config)
+        self.outbox_repo = self.repository_factory.get_repository(RepoType.OUTBOX, message_queue_name="")
+
+    def enqueue(self, queue_name: str, data: dict) -> None:
+        """Add a message to the outbox without an accompanying entity save"""
+        self.outbox_repo.add_message(queue_name, data)
+
+    def relay_batch(self, batch_size: int) -> int:
+        """
+        Publish one batch of pending outbox messages to RabbitMQ.
+
+        Returns:
+            int: Number of messages published
+        """
+        with self.outbox_repo.adapter:
+            messages = self.outbox_repo.claim_pending(batch_size)
+            if not messages:
+                return 0
+
+            ids = [message.id for message in messages]
+            try:
+                get_publisher().publish_batch(
+                    [(message.queue_name, message.payload, None, None) for message in messages]
+                )
+            except Exception as e:
+                logger.error(f"Failed to relay {len(messages)} outbox messages: {str(e)}")
+                self.outbox_repo.mark_failed(ids, str(e))
+                raise
+
+            self.outbox_repo.mark_published(ids)
+
+        logger.info(f"Relayed {len(messages)} outbox messages")
+        return len(messages)
+
+    def relay_pending(self, batch_size: int = None) -> int:
+        """
+        Drain the outbox in batches until no pending messages are left.
+
+        Returns:
+            int: Total number of messages published
+        """
+        batch_size = batch_size or self.config.OUTBOX_RELAY_BATCH_SIZE
+        total = 0
+        while True:
+            published = self.relay_batch(batch_size)
+            total += published
+            if published < batch_size:
+                return total
+
+    def cleanup_published(self) -> None:
+        """Delete relayed messages older than the retention window"""
+        self.outbox_repo.delete_published(self.config.OUTBOX_RETENTION_DAYS)
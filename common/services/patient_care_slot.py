@@ -1,12 +1,19 @@
+from dataclasses import fields
 from typing import List, Dict, Optional
 from datetime import date, time, timedelta
 from common.repositories.factory import RepositoryFactory, RepoType
 from common.models.patient_care_slot import PatientCareSlot
 from common.app_logger import get_logger
+from common.services.scheduling_index import invalidate_scheduling_index
 from common.helpers.exceptions import InputValidationError, NotFoundError
+from common.helpers.string_utils import encode_cursor, decode_cursor
 from common.utils.slot import (
-    expand_slots,
+    compact_schedule,
+    get_schedule_sort_key,
     get_week_start_date,
+    expand_slots,
+    expand_series,
+    parse_occurrence_id,
     validate_and_parse_day_of_week,
     parse_time_field,
     parse_date_field,
@@ -16,6 +23,8 @@ from common.utils.slot import (
 
 logger = get_logger(__name__)
 
+PATIENT_CARE_SLOT_FIELDS = {field.name for field in fields(PatientCareSlot)}
+
 class PatientCareSlotService:
 
     def __init__(self, config):
@@ -25,25 +34,30 @@ class PatientCareSlotService:
 
     def save_patient_care_slot(self, patient_care_slot: PatientCareSlot):
         patient_care_slot = self.patient_care_slot_repo.save(patient_care_slot)
+        invalidate_scheduling_index(self.config, patient_ids=[patient_care_slot.patient_id])
         return patient_care_slot
 
     def get_patient_care_slots_by_week(self, patient_id: str, week_start_date: date):
-        """Get all care slots for a patient in a specific week."""
-        # Get all slots for the patient first
-        patient_slots = self.patient_care_slot_repo.get_many({
-            "patient_id": patient_id,
-        })
+        """Get all care slots for a patient in a specific week, including occurrences of slot series."""
+        return self.get_patient_care_slots_in_range(patient_id, week_start_date, week_start_date + timedelta(days=6))
+
+    def get_patient_care_slots_in_range(self, patient_id: str, start_date: date, end_date: date):
+        """Get the care slots of a patient starting between start_date and end_date, including occurrences of slot series."""
+        from common.services import SlotSeriesService
 
-        # Then filter for the specific week in Python
-        return [slot for slot in patient_slots if week_start_date == get_week_start_date(slot.start_date) ] 
+        slots = self.patient_care_slot_repo.get_patient_slots_in_range(patient_id, start_date, end_date)
+        return slots + SlotSeriesService(self.config).get_occurrences(start_date, end_date, patient_id=patient_id)
 
     def get_patient_care_slots_by_patient_id(self, patient_id: str) -> List[PatientCareSlot]:
         """
-        Get all care slots for a specific patient.
+        Get all care slots for a specific patient, including occurrences of slot series.
         """ 
-        return self.patient_care_slot_repo.get_many({
+        from common.services import SlotSeriesService
+
+        patient_slots = self.patient_care_slot_repo.get_many({
             "patient_id": patient_id
         })
+        return patient_slots + SlotSeriesService(self.config).get_occurrences(patient_id=patient_id)
 
     def get_patient_care_slots_for_time_slot(self, start_time: time, end_time: time, 
                                   visit_date: date, employee_id: str, organization_ids: List[str]) -> List[PatientCareSlot]:
@@ -59,12 +73,14 @@ class PatientCareSlotService:
         Returns:
             List of PatientCareSlot instances that match the criteria
         """
-        results = self.patient_care_slot_repo.get_eligible_patient_care_slots_by_availability_slot(
+        from common.services import SchedulingIndexService
+
+        results = SchedulingIndexService(self.config).find_eligible_patients(
+            organization_ids=organization_ids,
+            visit_date=visit_date,
             start_time=start_time,
             end_time=end_time,
-            visit_date=visit_date,
-            employee_id=employee_id,
-            organization_ids=organization_ids
+            employee_id=employee_id
         )
 
         def time_to_minutes(t: time) -> int:
@@ -102,50 +118,125 @@ class PatientCareSlotService:
                 "patient_name": row.pop("patient_name"),
                 "offset": row.pop("offset"),
                 "match_type": row.pop("match_type"),
-                **PatientCareSlot(**{k: v for k, v in row.items() if k in PatientCareSlot.__annotations__}).as_dict()
+                **PatientCareSlot(**{k: v for k, v in row.items() if k in PATIENT_CARE_SLOT_FIELDS}).as_dict()
             } for row in sorted_results
         ]
 
     def get_patient_care_slots_for_organization(self, organization_id: str):
-        return self.patient_care_slot_repo.get_patient_care_slots_by_organization(organization_id)
-    
-    def _calculate_total_hours(self, slots: List[PatientCareSlot]) -> float:
-        """Calculate total hours from a list of slots."""
-        total_minutes = 0
-        for slot in slots:
-            if slot.start_time and slot.end_time:
-                total_minutes += self._calculate_slot_duration_minutes(slot.start_time, slot.end_time)
-        return total_minutes / 60
+        from common.services import SlotSeriesService
+
+        slots = self.patient_care_slot_repo.get_patient_care_slots_by_organization(organization_id)
+        for slot, patient in SlotSeriesService(self.config).get_organization_occurrences("patient", [organization_id]):
+            slots.append(self._get_occurrence_listing_row(slot, patient))
+        return slots
+
+    def get_organization_schedule_page(self, organization_id: str, start_date: date, end_date: date,
+                                       limit: int, cursor: Optional[str] = None, compact: bool = False) -> dict:
+        """
+        A keyset page of the care slots of the organization's patients starting between start_date
+        and end_date, including occurrences of slot series, ordered by patient and start date.
+        Returns the slots under `data`, or in the compact format of `compact_schedule`, and the
+        `next_cursor` of the next page, which is None on the last page.
+        """
+        from common.services import SlotSeriesService
+
+        after = decode_cursor(cursor, 3) if cursor else None
+        rows = self.patient_care_slot_repo.get_organization_slots_page(organization_id, start_date, end_date, limit, after)
+
+        for slot, patient in SlotSeriesService(self.config).get_organization_occurrences(
+            "patient", [organization_id], start_date, end_date
+        ):
+            row = self._get_occurrence_listing_row(slot, patient)
+            if after is None or get_schedule_sort_key(row, "patient_id") > after:
+                rows.append(row)
+
+        rows = sorted(rows, key=lambda row: get_schedule_sort_key(row, "patient_id"))[:limit]
+        next_cursor = encode_cursor(get_schedule_sort_key(rows[-1], "patient_id")) if len(rows) == limit else None
+
+        page = compact_schedule(rows, "patient_id", "employee") if compact else {"data": rows}
+        return {**page, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _get_occurrence_listing_row(slot: PatientCareSlot, patient: dict) -> dict:
+        return {
+            "slot_id": slot.entity_id,
+            "series_id": slot.series_id,
+            "patient_id": slot.patient_id,
+            "first_name": patient["first_name"],
+            "last_name": patient["last_name"],
+            "start_time": slot.start_time,
+            "end_time": slot.end_time,
+            "start_date": slot.start_date,
+            "end_date": slot.end_date,
+            "start_day_of_week": slot.start_day_of_week,
+            "end_day_of_week": slot.end_day_of_week,
+            "care_visits": []
+        }
     
-    def _validate_weekly_quota(self, patient_weekly_quota: Optional[float], new_slot: PatientCareSlot, 
-                               existing_slots: List[PatientCareSlot], exclude_slot_id: Optional[str] = None) -> None:
+    def get_weekly_scheduled_minutes(self, patient_id: str, start_date: date, end_date: date,
+                                     exclude_slot_id: Optional[str] = None) -> Dict[date, int]:
+        """
+        Minutes of the patient's care slots per week, by the Monday of the week, for the weeks
+        of start_date through end_date, including occurrences of slot series. Stored slots are
+        summed by the database; only the occurrences of the weeks are expanded.
+        """
+        from common.services import SlotSeriesService
+
+        week_start, week_end = get_week_start_date(start_date), get_week_start_date(end_date) + timedelta(days=6)
+        minutes = self.patient_care_slot_repo.get_weekly_scheduled_minutes(patient_id, week_start, week_end, exclude_slot_id)
+        for occurrence in SlotSeriesService(self.config).get_occurrences(week_start, week_end, patient_id=patient_id):
+            if occurrence.entity_id == exclude_slot_id or not (occurrence.start_time and occurrence.end_time):
+                continue
+            key = get_week_start_date(occurrence.start_date)
+            minutes[key] = minutes.get(key, 0) + self._calculate_slot_duration_minutes(occurrence.start_time, occurrence.end_time)
+        return minutes
+
+    def get_weekly_quota_usage(self, patient_id: str, weekly_quota: Optional[float], start_date: date,
+                               end_date: date) -> List[dict]:
+        """The scheduled and remaining hours of the patient's quota for each week of start_date through end_date"""
+        minutes = self.get_weekly_scheduled_minutes(patient_id, start_date, end_date)
+
+        usage = []
+        week_start = get_week_start_date(start_date)
+        while week_start <= end_date:
+            scheduled_hours = minutes.get(week_start, 0) / 60
+            usage.append({
+                "week_start_date": week_start,
+                "scheduled_minutes": minutes.get(week_start, 0),
+                "scheduled_hours": round(scheduled_hours, 2),
+                "weekly_quota": weekly_quota,
+                "remaining_hours": round(weekly_quota - scheduled_hours, 2) if weekly_quota else None,
+            })
+            week_start += timedelta(days=7)
+        return usage
+
+    def _validate_weekly_quota(self, patient_weekly_quota: Optional[float], patient_id: str, slot: PatientCareSlot,
+                               exclude_slot_id: Optional[str] = None) -> None:
         """
         Validate that adding/updating a slot doesn't exceed the patient's weekly quota.
         
         Args:
             patient_weekly_quota: The patient's weekly quota in hours (None means no limit)
-            new_slot: The slot being created or updated
-            existing_slots: Existing slots for the same week
+            patient_id: The patient's entity_id
+            slot: The slot being created or updated
             exclude_slot_id: Optional slot ID to exclude from calculation (for updates)
         
         Raises:
             InputValidationError: If weekly quota would be exceeded
         """
-        # Skip validation if patient has no quota set
-        if patient_weekly_quota is None or patient_weekly_quota == 0:
+        # Skip validation if patient has no quota set, or the slot is a weekly template
+        if patient_weekly_quota is None or patient_weekly_quota == 0 or not slot.start_date:
             return
-        
-        # Filter out the slot being updated
-        slots_to_count = [slot for slot in existing_slots 
-                         if not (exclude_slot_id and slot.entity_id == exclude_slot_id)]
-        
-        # Add the new/updated slot
-        slots_to_count.append(new_slot)
-        
-        # Calculate total hours
-        total_hours = self._calculate_total_hours(slots_to_count)
-        
+
+        # Minutes of the other slots of the slot's week
+        scheduled_minutes = self.get_weekly_scheduled_minutes(
+            patient_id, slot.start_date, slot.start_date, exclude_slot_id=exclude_slot_id
+        ).get(get_week_start_date(slot.start_date), 0)
+        if slot.start_time and slot.end_time:
+            scheduled_minutes += self._calculate_slot_duration_minutes(slot.start_time, slot.end_time)
+
         # Validate against quota
+        total_hours = scheduled_minutes / 60
         if total_hours > patient_weekly_quota:
             raise InputValidationError(
                 f"Weekly quota exceeded: total would be {total_hours:.2f}h, limit is {patient_weekly_quota}h"
@@ -164,18 +255,24 @@ class PatientCareSlotService:
             return (24 * 60 - start_minutes) + end_minutes
 
     def delete_patient_care_slot(self, patient_id: str, slot_id: str, series_id: Optional[str] = None, from_date: Optional[str] = None) -> PatientCareSlot:
+        from common.services import SlotSeriesService
+
         if series_id and from_date:
+            SlotSeriesService(self.config).end_series(series_id, from_date, owner_id=patient_id)
             deleted_slots = self.patient_care_slot_repo.delete_future_patient_care_slots(
                 patient_id=patient_id,
                 series_id=series_id,
                 from_date=from_date
             )
+            invalidate_scheduling_index(self.config, patient_ids=[patient_id])
             return deleted_slots
-        slot = self.patient_care_slot_repo.get_one({"entity_id": slot_id, "patient_id": patient_id})
+        slot = self._get_slot_or_occurrence(patient_id, slot_id)
         if not slot:
             raise NotFoundError(f"Patient care slot with id '{slot_id}' not found for patient '{patient_id}'")
         slot.active = False
-        return self.patient_care_slot_repo.save(slot)
+        slot = self.patient_care_slot_repo.save(slot)
+        invalidate_scheduling_index(self.config, patient_ids=[patient_id])
+        return slot
 
     def update_patient_care_slot(self, patient_id: str, slot_id: str, slot_data: dict, patient_weekly_quota: Optional[float] = None) -> PatientCareSlot:
         """
@@ -191,7 +288,7 @@ class PatientCareSlotService:
             The updated PatientCareSlot
         """
         # Fetch existing slot
-        slot = self.patient_care_slot_repo.get_one({"entity_id": slot_id, "patient_id": patient_id})
+        slot = self._get_slot_or_occurrence(patient_id, slot_id)
         if not slot:
             raise NotFoundError(f"Patient care slot with id '{slot_id}' not found for patient '{patient_id}'")
         
@@ -232,16 +329,35 @@ class PatientCareSlotService:
             raise InputValidationError("Please set a weekly quota before adding care slots.")
         
         # Validate weekly quota if provided
-        start_date = slot.start_date
-        existing_slots = self.get_patient_care_slots_by_week(patient_id, start_date) if start_date  else []
-        self._validate_weekly_quota(patient_weekly_quota, slot, existing_slots, exclude_slot_id=slot_id)
+        self._validate_weekly_quota(patient_weekly_quota, patient_id, slot, exclude_slot_id=slot_id)
         
         logger.info(f"Updating patient care slot {slot_id} for patient {patient_id}")
-        return self.patient_care_slot_repo.save(slot)
+        slot = self.patient_care_slot_repo.save(slot)
+        invalidate_scheduling_index(self.config, patient_ids=[patient_id])
+        return slot
     
+    def _get_slot_or_occurrence(self, patient_id: str, slot_id: str) -> Optional[PatientCareSlot]:
+        """
+        Get a stored slot, or for the id of a series occurrence, the occurrence as a new
+        unsaved slot that overrides it once saved.
+        """
+        if parse_occurrence_id(slot_id):
+            from common.services import SlotSeriesService
+            return SlotSeriesService(self.config).get_occurrence(slot_id, owner_id=patient_id)
+        return self.patient_care_slot_repo.get_one({"entity_id": slot_id, "patient_id": patient_id})
+
     def get_slots_by_series_id(self, series_id: str, entity_id: str, patient_id: str) -> List[PatientCareSlot]:
-        """Get all slots with the same series_id for a patient."""
-        
+        """
+        Get all slots with the same series_id for a patient. The occurrences of a slot
+        series are stored as slots first, since they are about to be booked.
+        """
+        if series_id:
+            from common.services import SlotSeriesService
+            slot_series_service = SlotSeriesService(self.config)
+            series = slot_series_service.get_series_by_id(series_id)
+            if series and series.patient_id == patient_id:
+                return slot_series_service.materialize_series(series)
+
         if series_id:
             return self.patient_care_slot_repo.get_many({
             "series_id": series_id,
@@ -257,14 +373,25 @@ class PatientCareSlotService:
             })
             
     def expand_and_save_slots(self, payload, patient_id):
+        """
+        Save a recurring pattern as a slot series, stored once and expanded on read, and
+        return its occurrences. A pattern with a single occurrence is saved as a plain slot.
+        """
+        from common.services import SlotSeriesService
+
+        slot_series_service = SlotSeriesService(self.config)
+        series = slot_series_service.build_series(payload, patient_id, 'patient')
+        occurrences = expand_series(series, series.start_date, series.end_date)
+        if len(occurrences) > 1:
+            slot_series_service.save_series(series)
+            return occurrences
+
         expanded_slots = expand_slots(
             payload=payload,
             start_date=payload.get('start_date'),
             entity_id=patient_id,
             entity_type='patient'
         ) 
-        saved_slots = []
-        for slot in expanded_slots:
-            saved_slot = self.patient_care_slot_repo.save(slot)
-            saved_slots.append(saved_slot)
+        saved_slots = self.patient_care_slot_repo.save_many(expanded_slots)
+        invalidate_scheduling_index(self.config, patient_ids=[patient_id])
         return saved_slots
@@ -9,8 +9,8 @@ class PersonOrganizationRoleService:
         self.repository_factory = RepositoryFactory(config)
         self.person_organization_role_repo = self.repository_factory.get_repository(RepoType.PERSON_ORGANIZATION_ROLE)
 
-    def save_person_organization_role(self, person_organization_role: PersonOrganizationRole):
-        person_organization_role = self.person_organization_role_repo.save(person_organization_role)
+    def save_person_organization_role(self, person_organization_role: PersonOrganizationRole, outbox_messages: list = None):
+        person_organization_role = self.person_organization_role_repo.save(person_organization_role, outbox_messages=outbox_messages)
         return person_organization_role
     
     def delete_person_organization_role(self, person_organization_role: PersonOrganizationRole):
@@ -1,19 +1,43 @@
+import atexit
+import queue
+import threading
+import time
+from collections import defaultdict
+
 import pusher
 from common.app_config import config
 from common.app_logger import get_logger
 
 logger = get_logger(__name__)
 
+_pusher_client = None
+_pusher_client_lock = threading.Lock()
+
+
+def get_pusher_client() -> pusher.Pusher:
+    """
+    Return the process-wide Pusher client, creating it on first use.
+
+    The client keeps its own HTTP session, so sharing one instance avoids a new
+    connection setup for every event.
+    """
+    global _pusher_client
+    if _pusher_client is None:
+        with _pusher_client_lock:
+            if _pusher_client is None:
+                _pusher_client = pusher.Pusher(
+                    app_id=config.PUSHER_APP_ID,
+                    key=config.PUSHER_KEY,
+                    secret=config.PUSHER_SECRET,
+                    cluster=config.PUSHER_CLUSTER,
+                    ssl=True
+                )
+    return _pusher_client
+
 
 class PusherService:
     def __init__(self):
-        self.pusher_client = pusher.Pusher(
-            app_id=config.PUSHER_APP_ID,
-            key=config.PUSHER_KEY,
-            secret=config.PUSHER_SECRET,
-            cluster=config.PUSHER_CLUSTER,
-            ssl=True
-        )
+        self.pusher_client = get_pusher_client()
 
     def trigger_verification_update(self, organization_id: str, match_data: dict):
         """
@@ -62,4 +86,107 @@ class PusherService:
             
         except Exception as e:
             logger.error(f"Error triggering Pusher batch event: {str(e)}")
-            logger.exception(e) 
\ No newline at end of file
+            logger.exception(e)
+
+
+class VerificationUpdateBatcher:
+    """
+    Buffers verification updates per organization and publishes them as
+    `verification-batch-update` events from a background thread.
+
+    A batch for an organization is sent once it reaches `max_batch_size` updates
+    or once `flush_interval` seconds have passed since its first buffered update,
+    whichever comes first. `add` never blocks on Pusher; if the buffer is full
+    the update is dropped and logged.
+    """
+
+    _FLUSH = object()
+
+    def __init__(self, pusher_service: PusherService = None, max_batch_size: int = None,
+                 flush_interval: float = None, max_queue_size: int = None):
+        self.pusher_service = pusher_service or PusherService()
+        self.max_batch_size = max_batch_size or config.PUSHER_BATCH_MAX_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else config.PUSHER_BATCH_FLUSH_INTERVAL
+        self._queue = queue.Queue(maxsize=max_queue_size or config.PUSHER_BATCH_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="pusher-verification-batcher", daemon=True)
+        self._thread.start()
+
+    def add(self, organization_id: str, match_data: dict) -> bool:
+        """
+        Buffer a verification update for an organization.
+
+        Returns:
+            bool: False if the buffer was full and the update was dropped.
+        """
+        try:
+            self._queue.put_nowait((organization_id, match_data))
+            return True
+        except queue.Full:
+            logger.warning(f"Pusher update buffer full, dropping update for match {match_data.get('entity_id')}")
+            return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Publish everything buffered so far and wait for it to be sent.
+
+        Returns:
+            bool: True if the flush completed within `timeout` seconds.
+        """
+        done = threading.Event()
+        try:
+            self._queue.put((self._FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _run(self):
+        pending = defaultdict(list)
+        deadlines = {}
+
+        while True:
+            timeout = None
+            if deadlines:
+                timeout = max(0.0, min(deadlines.values()) - time.monotonic())
+
+            try:
+                organization_id, payload = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                organization_id, payload = None, None
+
+            if organization_id is self._FLUSH:
+                for org_id in list(pending):
+                    self._send(org_id, pending, deadlines)
+                payload.set()
+                continue
+
+            if organization_id is not None:
+                pending[organization_id].append(payload)
+                deadlines.setdefault(organization_id, time.monotonic() + self.flush_interval)
+                if len(pending[organization_id]) >= self.max_batch_size:
+                    self._send(organization_id, pending, deadlines)
+
+            now = time.monotonic()
+            for org_id, deadline in list(deadlines.items()):
+                if deadline <= now:
+                    self._send(org_id, pending, deadlines)
+
+    def _send(self, organization_id, pending, deadlines):
+        matches_data = pending.pop(organization_id, [])
+        deadlines.pop(organization_id, None)
+        if matches_data:
+            self.pusher_service.trigger_verification_batch_update(organization_id, matches_data)
+
+
+_verification_update_batcher = None
+_verification_update_batcher_lock = threading.Lock()
+
+
+def get_verification_update_batcher() -> VerificationUpdateBatcher:
+    """Return the process-wide VerificationUpdateBatcher, starting it on first use."""
+    global _verification_update_batcher
+    if _verification_update_batcher is None:
+        with _verification_update_batcher_lock:
+            if _verification_update_batcher is None:
+                _verification_update_batcher = VerificationUpdateBatcher()
+                atexit.register(_verification_update_batcher.flush)
+    return _verification_update_batcher
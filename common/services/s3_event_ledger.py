@@ -0,0 +1,95 @@
+import time
+import uuid
+from typing import Optional
+
+from common.app_logger import get_logger
+from common.models.processed_s3_event import ProcessedS3Event
+from common.repositories.factory import RepositoryFactory, RepoType
+
+logger = get_logger(__name__)
+
+# Expired ledger rows are purged at most this often per process
+CLEANUP_INTERVAL_SECONDS = 3600
+
+
+class S3EventLedgerService:
+    """
+    Idempotency layer for S3 event notifications, which SQS and RabbitMQ deliver at least once.
+
+    An import service calls `claim_record` for each S3 record before downloading the
+    object; only the first delivery of a given bucket/key/ETag/sequencer within the
+    TTL is claimed, later deliveries are suppressed and counted.
+    """
+
+    def __init__(self, config, processor: str):
+        self.config = config
+        self.processor = processor
+        self.repository_factory = RepositoryFactory(config)
+        self.processed_s3_event_repo = self.repository_factory.get_repository(RepoType.PROCESSED_S3_EVENT, message_queue_name="")
+        self.suppressed_count = 0
+        self._last_cleanup = 0.0
+
+    def get_event(self, record: dict) -> Optional[ProcessedS3Event]:
+        """
+        Build the ledger entry for an S3 notification record.
+        Returns None if the record has no bucket or key.
+        """
+        s3 = record.get('s3', {})
+        bucket_name = s3.get('bucket', {}).get('name')
+        s3_object = s3.get('object', {})
+        object_key = s3_object.get('key')
+        if not bucket_name or not object_key:
+            return None
+
+        etag = s3_object.get('eTag') or s3_object.get('etag')
+        sequencer = s3_object.get('sequencer')
+        return ProcessedS3Event(
+            processor=self.processor,
+            event_key=f"{bucket_name}/{object_key}/{etag or ''}/{sequencer or ''}",
+            bucket_name=bucket_name,
+            object_key=object_key,
+            etag=etag,
+            sequencer=sequencer,
+            claim_token=uuid.uuid4().hex,
+        )
+
+    def claim_record(self, record: dict) -> Optional[ProcessedS3Event]:
+        """
+        Claim an S3 notification record for processing.
+
+        Returns:
+            ProcessedS3Event: The claimed event, to pass to `release` if processing fails,
+            or None if the record is a duplicate delivery and must be skipped.
+        """
+        event = self.get_event(record)
+        if event is None:
+            return None
+
+        self._cleanup_expired()
+
+        if self.processed_s3_event_repo.claim(event, self.config.S3_EVENT_LEDGER_TTL_HOURS):
+            return event
+
+        self.suppressed_count += 1
+        logger.info(
+            f"Skipping duplicate S3 event for {event.bucket_name}/{event.object_key} "
+            f"({self.suppressed_count} duplicates suppressed by {self.processor})"
+        )
+        return None
+
+    def release(self, event: ProcessedS3Event) -> None:
+        """Forget a claimed event after a failure so that a redelivery is processed again"""
+        try:
+            self.processed_s3_event_repo.release(event)
+        except Exception as e:
+            logger.error(f"Failed to release S3 event {event.event_key}: {str(e)}")
+
+    def _cleanup_expired(self):
+        now = time.monotonic()
+        if now - self._last_cleanup < CLEANUP_INTERVAL_SECONDS:
+            return
+        self._last_cleanup = now
+        try:
+            self.processed_s3_event_repo.delete_expired()
+        except Exception as e:
+            logger.warning(f"Failed to delete expired S3 event ledger rows: {str(e)}")
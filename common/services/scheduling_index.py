@@ -0,0 +1,365 @@
+import time
+import threading
+from collections import defaultdict
+from dataclasses import fields
+from datetime import date, datetime, timedelta
+from datetime import time as time_of_day
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from common.app_logger import get_logger
+from common.models.availability_slot import AvailabilitySlot
+from common.models.patient_care_slot import PatientCareSlot
+from common.repositories.factory import RepositoryFactory, RepoType
+from common.utils.slot import get_week_start_date
+
+logger = get_logger(__name__)
+
+AVAILABILITY_SLOT_FIELDS = [field.name for field in fields(AvailabilitySlot)]
+PATIENT_CARE_SLOT_FIELDS = [field.name for field in fields(PatientCareSlot)]
+
+
+class IntervalTree:
+    """
+    Static interval tree over half-open [start, end) intervals. The intervals are kept
+    sorted by start, and each implicit subtree of that array (rooted at its midpoint)
+    knows the latest end below it, so an overlap query skips the subtrees that end
+    too early and the ones that start too late: O(log n + matches).
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, Any]]):
+        self._intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._max_end = [None] * len(self._intervals)
+        self._annotate(0, len(self._intervals))
+
+    def _annotate(self, low: int, high: int):
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        max_end = self._intervals[middle][1]
+        for child_end in (self._annotate(low, middle), self._annotate(middle + 1, high)):
+            if child_end is not None and child_end > max_end:
+                max_end = child_end
+        self._max_end[middle] = max_end
+        return max_end
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __iter__(self):
+        return iter(self._intervals)
+
+    def overlapping(self, start, end) -> List[Tuple[Any, Any, Any]]:
+        """The (start, end, item) intervals overlapping [start, end), in start order"""
+        found = []
+        stack = [(0, len(self._intervals))]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+            middle = (low + high) // 2
+            if self._max_end[middle] <= start:
+                continue
+            interval = self._intervals[middle]
+            # Only the left half can hold intervals that start before `end`
+            stack.append((low, middle))
+            if interval[0] < end:
+                if interval[1] > start:
+                    found.append(interval)
+                stack.append((middle + 1, high))
+        return sorted(found, key=lambda interval: interval[0])
+
+
+EMPTY_TREE = IntervalTree([])
+
+
+def to_interval(start_date: date, start_time: time_of_day, end_time: time_of_day,
+                end_date: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """A slot's [start, end) on the calendar; slots ending at or before their start time end the next day"""
+    start = datetime.combine(start_date, start_time)
+    end = datetime.combine(end_date or start_date, end_time)
+    if end <= start:
+        end = datetime.combine(start_date + timedelta(days=1), end_time)
+    return start, end
+
+
+def slot_intervals(slot: Dict[str, Any], window_start: date, window_end: date) -> List[Tuple[datetime, datetime]]:
+    """
+    The calendar intervals of a slot within the window: its own dates, or for a weekly
+    template slot without a start_date, every date whose weekday is in its day range.
+    """
+    if slot.get('start_date'):
+        return [to_interval(slot['start_date'], slot['start_time'], slot['end_time'], slot.get('end_date'))]
+
+    start_day, end_day = slot.get('start_day_of_week'), slot.get('end_day_of_week')
+    if start_day is None:
+        return []
+    end_day = start_day if end_day is None else end_day
+    days = set(range(start_day, end_day + 1)) if start_day <= end_day else {start_day, end_day}
+
+    intervals = []
+    day = window_start
+    while day <= window_end:
+        if day.weekday() in days:
+            intervals.append(to_interval(day, slot['start_time'], slot['end_time']))
+        day += timedelta(days=1)
+    return intervals
+
+
+class SchedulingIndex:
+    """
+    Immutable snapshot of one organization's schedule for a date window: interval trees
+    of availability slots, patient care slots, and booked visits per employee and per
+    patient. Answers which employees can cover a patient care slot and which patients
+    fit an availability slot, with the same rules as the eligibility queries it replaces.
+    """
+
+    def __init__(self, organization_id: str, window_start: date, window_end: date,
+                 availability_slots: List[Tuple[Dict, Dict]], patient_care_slots: List[Tuple[Dict, Dict]],
+                 care_visits: List[Dict[str, Any]]):
+        self.organization_id = organization_id
+        self.window_start = window_start
+        self.window_end = window_end
+
+        self.availability = IntervalTree(
+            (start, end, (slot, details))
+            for slot, details in availability_slots
+            for start, end in slot_intervals(slot, window_start, window_end)
+        )
+        self.patient_care_slots = IntervalTree(
+            (start, end, (slot, details))
+            for slot, details in patient_care_slots
+            for start, end in slot_intervals(slot, window_start, window_end)
+        )
+
+        visits_by_employee, visits_by_patient = {}, {}
+        self.booked_availability_slots, self.booked_patient_care_slots = {}, {}
+        for visit in care_visits:
+            if not visit.get('scheduled_start_time') or not visit.get('scheduled_end_time'):
+                continue
+            interval = (visit['scheduled_start_time'], visit['scheduled_end_time'], visit)
+            visits_by_employee.setdefault(visit['employee_id'], []).append(interval)
+            visits_by_patient.setdefault(visit['patient_id'], []).append(interval)
+            if visit.get('availability_slot_id'):
+                self.booked_availability_slots.setdefault(visit['availability_slot_id'], []).append(interval)
+            if visit.get('patient_care_slot_id'):
+                self.booked_patient_care_slots.setdefault(visit['patient_care_slot_id'], []).append(interval)
+
+        self.visits_by_employee = {key: IntervalTree(value) for key, value in visits_by_employee.items()}
+        self.visits_by_patient = {key: IntervalTree(value) for key, value in visits_by_patient.items()}
+        self.size = len(self.availability) + len(self.patient_care_slots) + len(care_visits)
+
+    @staticmethod
+    def is_booked(bookings: Optional[list], start: datetime, end: datetime) -> bool:
+        return any(booked_start < end and booked_end > start for booked_start, booked_end, _ in bookings or ())
+
+    @staticmethod
+    def get_visits(indexes: List['SchedulingIndex'], start: datetime, end: datetime, employee_id: str = None,
+                   patient_id: str = None) -> List[Tuple[datetime, datetime, Dict]]:
+        """
+        Visits of an employee or a patient overlapping [start, end), from several organizations'
+        snapshots, since employees and patients can have visits in partner organizations.
+        """
+        visits = {}
+        for index in indexes:
+            tree = index.visits_by_employee.get(employee_id) if employee_id else index.visits_by_patient.get(patient_id)
+            for interval in (tree or EMPTY_TREE).overlapping(start, end):
+                visits[interval[2]['entity_id']] = interval
+        return list(visits.values())
+
+    def find_available_employees(self, visit_date: date, start_time: time_of_day, end_time: time_of_day,
+                                 patient_id: str, visit_indexes: List['SchedulingIndex'] = None) -> List[Dict[str, Any]]:
+        """
+        Availability slots overlapping the patient care slot, not booked over it, with the
+        window between the employee's surrounding visits that day. Empty when the patient
+        already has a visit at that time. Visits are looked up in `visit_indexes`
+        (default: this snapshot only).
+        """
+        visit_indexes = visit_indexes or [self]
+        start, end = to_interval(visit_date, start_time, end_time)
+        if self.get_visits(visit_indexes, start, end, patient_id=patient_id):
+            return []
+
+        day_start = datetime.combine(visit_date, time_of_day.min)
+        day_end = day_start + timedelta(days=1)
+
+        rows = {}
+        for _, _, (slot, employee) in self.availability.overlapping(start, end):
+            if slot['entity_id'] in rows or self.is_booked(self.booked_availability_slots.get(slot['entity_id']), start, end):
+                continue
+
+            day_visits = self.get_visits(visit_indexes, day_start, day_end, employee_id=slot['employee_id'])
+            ended_before = [visit_end.time() for _, visit_end, _ in day_visits if visit_end <= start]
+            starting_after = [visit_start.time() for visit_start, _, _ in day_visits if visit_start >= start]
+
+            rows[slot['entity_id']] = {
+                "employee_display_id": employee.get('employee_display_id'),
+                "employee_social_security_number": employee.get('employee_social_security_number'),
+                "employee_date_of_birth": employee.get('employee_date_of_birth'),
+                "employee_name": employee.get('employee_name'),
+                "available_from": max([slot['start_time']] + ended_before),
+                "available_to": min([slot['end_time']] + starting_after),
+                **slot
+            }
+        return list(rows.values())
+
+    def find_eligible_patients(self, visit_date: date, start_time: time_of_day, end_time: time_of_day,
+                               employee_id: str, visit_indexes: List['SchedulingIndex'] = None) -> List[Dict[str, Any]]:
+        """
+        Patient care slots overlapping the availability slot, of patients in their care
+        period, not booked over it, and not clashing with the employee's other visits.
+        Visits are looked up in `visit_indexes` (default: this snapshot only).
+        """
+        visit_indexes = visit_indexes or [self]
+        start, end = to_interval(visit_date, start_time, end_time)
+
+        rows = {}
+        for slot_start, slot_end, (slot, patient) in self.patient_care_slots.overlapping(start, end):
+            if slot['entity_id'] in rows:
+                continue
+            if patient.get('care_period_start') and visit_date < patient['care_period_start']:
+                continue
+            if patient.get('care_period_end') and visit_date > patient['care_period_end']:
+                continue
+            if self.is_booked(self.booked_patient_care_slots.get(slot['entity_id']), start, end):
+                continue
+            if self.get_visits(visit_indexes, slot_start, slot_end, employee_id=employee_id):
+                continue
+
+            rows[slot['entity_id']] = {"patient_name": patient.get('patient_name'), **slot}
+        return list(rows.values())
+
+
+# Snapshots shared by every request thread of the process, by (organization_id, window_start)
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+# Bumped for an organization on every invalidation of its snapshots, so that a snapshot built
+# from data read before a write is not cached
+_generations = defaultdict(int)
+# Snapshots being built, which an invalidation must reach even though they are not cached yet
+_builds_in_progress = 0
+
+
+def invalidate_scheduling_index(config, employee_ids: Iterable[str] = (), patient_ids: Iterable[str] = (),
+                                organization_ids: Iterable[str] = ()):
+    """
+    Drop the cached snapshots that slots or visits of the employees and patients can show up
+    in after they were written: those of the employees' and patients' organizations, and of
+    `organization_ids`, e.g. the organization that scheduled a visit. Other processes pick up
+    the change within SCHEDULING_INDEX_TTL_SECONDS.
+    """
+    employee_ids = [entity_id for entity_id in dict.fromkeys(employee_ids) if entity_id]
+    patient_ids = [entity_id for entity_id in dict.fromkeys(patient_ids) if entity_id]
+    organization_ids = {organization_id for organization_id in organization_ids if organization_id}
+
+    # Nothing is cached or being built in this process, e.g. in a background service
+    if not _snapshots and not _builds_in_progress:
+        return
+
+    if employee_ids or patient_ids:
+        care_visit_repo = RepositoryFactory(config).get_repository(RepoType.CARE_VISIT)
+        organization_ids |= care_visit_repo.get_participant_organization_ids(employee_ids, patient_ids)
+
+    with _snapshots_lock:
+        for organization_id in organization_ids:
+            _generations[organization_id] += 1
+        for key in [key for key in _snapshots if key[0] in organization_ids]:
+            del _snapshots[key]
+
+
+def _split_row(row: Dict[str, Any], slot_fields: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return (
+        {name: row.get(name) for name in slot_fields},
+        {key: value for key, value in row.items() if key not in slot_fields}
+    )
+
+
+class SchedulingIndexService:
+
+    def __init__(self, config):
+        self.config = config
+        self.repository_factory = RepositoryFactory(config)
+        self.availability_slot_repo = self.repository_factory.get_repository(RepoType.AVAILABILITY_SLOT)
+        self.patient_care_slot_repo = self.repository_factory.get_repository(RepoType.PATIENT_CARE_SLOT)
+        self.care_visit_repo = self.repository_factory.get_repository(RepoType.CARE_VISIT)
+
+    def get_window(self, visit_date: date) -> Tuple[date, date]:
+        window_start = get_week_start_date(visit_date)
+        return window_start, window_start + timedelta(weeks=self.config.SCHEDULING_INDEX_WINDOW_WEEKS, days=-1)
+
+    def get_index(self, organization_id: str, visit_date: date) -> SchedulingIndex:
+        """Get the snapshot of the organization's window containing visit_date, building it if missing or expired"""
+        window_start, window_end = self.get_window(visit_date)
+        key = (organization_id, window_start)
+
+        cached = _snapshots.get(key)
+        if cached and time.monotonic() - cached[0] < self.config.SCHEDULING_INDEX_TTL_SECONDS:
+            return cached[1]
+
+        global _builds_in_progress
+        with _snapshots_lock:
+            generation = _generations[organization_id]
+            _builds_in_progress += 1
+        try:
+            index = self.build_index(organization_id, window_start, window_end)
+        finally:
+            with _snapshots_lock:
+                _builds_in_progress -= 1
+        with _snapshots_lock:
+            if generation == _generations[organization_id]:
+                _snapshots[key] = (time.monotonic(), index)
+        return index
+
+    def build_index(self, organization_id: str, window_start: date, window_end: date) -> SchedulingIndex:
+        from common.services import SlotSeriesService
+
+        started = time.monotonic()
+        # Overnight slots and visits of the day before the window reach into it
+        load_start = window_start - timedelta(days=1)
+        slot_series_service = SlotSeriesService(self.config)
+
+        availability_slots = [
+            _split_row(row, AVAILABILITY_SLOT_FIELDS)
+            for row in self.availability_slot_repo.get_organization_slots_in_window(organization_id, load_start, window_end)
+        ]
+        availability_slots += [
+            (_split_row(occurrence.as_dict(convert_datetime_to_iso_string=False), AVAILABILITY_SLOT_FIELDS)[0], employee)
+            for occurrence, employee in slot_series_service.get_organization_occurrences(
+                "employee", [organization_id], load_start, window_end
+            )
+        ]
+
+        patient_care_slots = [
+            _split_row(row, PATIENT_CARE_SLOT_FIELDS)
+            for row in self.patient_care_slot_repo.get_organization_slots_in_window(organization_id, load_start, window_end)
+        ]
+        patient_care_slots += [
+            (_split_row(occurrence.as_dict(convert_datetime_to_iso_string=False), PATIENT_CARE_SLOT_FIELDS)[0], patient)
+            for occurrence, patient in slot_series_service.get_organization_occurrences(
+                "patient", [organization_id], load_start, window_end
+            )
+        ]
+
+        care_visits = self.care_visit_repo.get_organization_visits_in_window(organization_id, load_start, window_end)
+
+        index = SchedulingIndex(organization_id, load_start, window_end, availability_slots, patient_care_slots, care_visits)
+        logger.info(
+            f"Built scheduling index for organization {organization_id} from {window_start} to {window_end} "
+            f"with {index.size} intervals in {time.monotonic() - started:.2f}s"
+        )
+        return index
+
+    def find_available_employees(self, organization_ids: List[str], visit_date: date, start_time: time_of_day,
+                                 end_time: time_of_day, patient_id: str) -> List[Dict[str, Any]]:
+        indexes = [self.get_index(organization_id, visit_date) for organization_id in organization_ids]
+        rows = []
+        for index in indexes:
+            rows += index.find_available_employees(visit_date, start_time, end_time, patient_id, visit_indexes=indexes)
+        return rows
+
+    def find_eligible_patients(self, organization_ids: List[str], visit_date: date, start_time: time_of_day,
+                               end_time: time_of_day, employee_id: str) -> List[Dict[str, Any]]:
+        indexes = [self.get_index(organization_id, visit_date) for organization_id in organization_ids]
+        rows = []
+        for index in indexes:
+            rows += index.find_eligible_patients(visit_date, start_time, end_time, employee_id, visit_indexes=indexes)
+        return rows
@@ -0,0 +1,224 @@
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from common.app_logger import get_logger
+from common.helpers.exceptions import InputValidationError, NotFoundError
+from common.models.slot_series import SlotSeries
+from common.repositories.factory import RepositoryFactory, RepoType
+from common.services.scheduling_index import invalidate_scheduling_index
+from common.utils.slot import (
+    build_slot_series,
+    build_occurrence,
+    expand_series,
+    iter_series_dates,
+    parse_occurrence_id,
+    parse_date_field
+)
+
+logger = get_logger(__name__)
+
+SLOT_TABLES = {"patient": "patient_care_slot", "employee": "availability_slot"}
+
+# An occurrence has at most one overriding row, see the {table}_series_recurrence_ind unique indexes
+OCCURRENCE_CONFLICT = (
+    "ON CONFLICT (series_id, recurrence_date, recurrence_start_time) WHERE recurrence_date IS NOT NULL DO NOTHING"
+)
+
+
+class SlotSeriesService:
+
+    def __init__(self, config):
+        self.config = config
+        self.repository_factory = RepositoryFactory(config)
+        self.slot_series_repo = self.repository_factory.get_repository(RepoType.SLOT_SERIES)
+        self.patient_care_slot_repo = self.repository_factory.get_repository(RepoType.PATIENT_CARE_SLOT)
+        self.availability_slot_repo = self.repository_factory.get_repository(RepoType.AVAILABILITY_SLOT)
+
+    def _get_slot_repo(self, entity_type: str):
+        return self.patient_care_slot_repo if entity_type == "patient" else self.availability_slot_repo
+
+    def _get_window_end(self, series: SlotSeries, window_end: Optional[date]) -> date:
+        if window_end:
+            return window_end
+        if series.end_date:
+            return series.end_date
+        return date.today() + timedelta(weeks=self.config.SLOT_SERIES_EXPANSION_HORIZON_WEEKS)
+
+    def build_series(self, payload: dict, entity_id: str, entity_type: str) -> SlotSeries:
+        return build_slot_series(payload, payload.get('start_date'), entity_id, entity_type)
+
+    def save_series(self, series: SlotSeries) -> SlotSeries:
+        series = self.slot_series_repo.save(series)
+        invalidate_scheduling_index(self.config, employee_ids=[series.employee_id], patient_ids=[series.patient_id])
+        return series
+
+    def get_series_by_id(self, series_id: str) -> Optional[SlotSeries]:
+        return self.slot_series_repo.get_one({"entity_id": series_id})
+
+    def expand(self, series_list: List[SlotSeries], window_start: Optional[date] = None,
+               window_end: Optional[date] = None) -> List:
+        """
+        Expand the occurrences of the series within the window, leaving out the ones that
+        have their own slot row. Without a window, each series is expanded from its start
+        to its end, or SLOT_SERIES_EXPANSION_HORIZON_WEEKS from today if it is open-ended.
+        """
+        series_by_type = defaultdict(list)
+        for series in series_list:
+            series_by_type[series.entity_type].append(series)
+
+        occurrences = []
+        for entity_type, typed_series in series_by_type.items():
+            overridden = self.slot_series_repo.get_overridden_occurrences(
+                SLOT_TABLES[entity_type], [series.entity_id for series in typed_series], window_start, window_end
+            )
+            for series in typed_series:
+                occurrences += expand_series(
+                    series, window_start or series.start_date, self._get_window_end(series, window_end), overridden
+                )
+
+        return sorted(occurrences, key=lambda slot: (slot.start_date, slot.start_time))
+
+    def get_occurrences(self, window_start: Optional[date] = None, window_end: Optional[date] = None,
+                        patient_id: str = None, employee_id: str = None) -> List:
+        """Occurrences of a patient's or an employee's series within the window"""
+        series_list = self.slot_series_repo.get_series_in_window(
+            window_start, window_end, patient_id=patient_id, employee_id=employee_id
+        )
+        return self.expand(series_list, window_start, window_end)
+
+    def get_organization_occurrences(self, entity_type: str, organization_ids: List[str], window_start: Optional[date] = None,
+                                     window_end: Optional[date] = None) -> List[Tuple[object, dict]]:
+        """Occurrences of every patient or employee series in the organizations, each with its owner's details"""
+        series_rows = self.slot_series_repo.get_organization_series(entity_type, organization_ids, window_start, window_end)
+        owner_details = {series.entity_id: details for series, details in series_rows}
+
+        occurrences = self.expand([series for series, _ in series_rows], window_start, window_end)
+        return [(occurrence, owner_details[occurrence.series_id]) for occurrence in occurrences]
+
+    def get_occurrence(self, occurrence_id: str, owner_id: Optional[str] = None):
+        """
+        The unsaved slot of an occurrence that has no row yet, with a new entity_id so that it
+        can be saved as its own row, or None if the id is not a valid occurrence of an active series.
+        """
+        parsed = parse_occurrence_id(occurrence_id)
+        if not parsed:
+            return None
+        series_id, recurrence_date, recurrence_start_time = parsed
+
+        series = self.get_series_by_id(series_id)
+        if not series or (owner_id and series.owner_id != owner_id):
+            return None
+
+        shift_end_times = dict(series.get_shift_times())
+        if recurrence_start_time not in shift_end_times:
+            return None
+        if recurrence_date not in iter_series_dates(series, recurrence_date, recurrence_date):
+            return None
+
+        overridden = self.slot_series_repo.get_overridden_occurrences(
+            SLOT_TABLES[series.entity_type], [series_id], recurrence_date, recurrence_date
+        )
+        if (series_id, recurrence_date, recurrence_start_time) in overridden:
+            return None
+
+        return build_occurrence(
+            series, recurrence_date, recurrence_start_time, shift_end_times[recurrence_start_time],
+            entity_id=uuid.uuid4().hex
+        )
+
+    def materialize_occurrences(self, occurrence_ids: List[str]) -> Dict[str, object]:
+        """
+        Give each occurrence its own slot row, e.g. before it is booked, and return the saved
+        slots by occurrence id. Occurrences that already have an active row return that row.
+        """
+        materialized = {}
+        new_slots = defaultdict(list)
+
+        for occurrence_id in dict.fromkeys(occurrence_ids):
+            parsed = parse_occurrence_id(occurrence_id)
+            if not parsed:
+                raise InputValidationError(f"'{occurrence_id}' is not an occurrence id")
+
+            slot = self.get_occurrence(occurrence_id)
+            if slot is None:
+                series_id, recurrence_date, recurrence_start_time = parsed
+                series = self.get_series_by_id(series_id)
+                existing = self._get_slot_repo(series.entity_type).get_one({
+                    "series_id": series_id,
+                    "recurrence_date": recurrence_date.isoformat(),
+                    "recurrence_start_time": recurrence_start_time.strftime('%H:%M:%S'),
+                }) if series else None
+                if not existing or not existing.active:
+                    raise NotFoundError(f"Slot occurrence '{occurrence_id}' not found")
+                materialized[occurrence_id] = existing
+                continue
+
+            entity_type = "patient" if getattr(slot, 'patient_id', None) else "employee"
+            new_slots[entity_type].append((occurrence_id, slot))
+
+        for entity_type, slots in new_slots.items():
+            # Occurrences stored concurrently by another request keep that request's row
+            stored = self._insert_occurrences(entity_type, [slot for _, slot in slots])
+            for occurrence_id, slot in slots:
+                existing = stored.get((slot.series_id, slot.recurrence_date, slot.recurrence_start_time))
+                if not existing or not existing.active:
+                    raise NotFoundError(f"Slot occurrence '{occurrence_id}' not found")
+                materialized[occurrence_id] = existing
+
+        return materialized
+
+    def materialize_series(self, series: SlotSeries) -> List:
+        """
+        Give every occurrence of a series its own slot row, e.g. to book the whole series,
+        and return all of its active rows.
+        """
+        occurrences = self.expand([series])
+        for occurrence in occurrences:
+            occurrence.entity_id = uuid.uuid4().hex
+        self._insert_occurrences(series.entity_type, occurrences)
+
+        return sorted(
+            self._get_slot_repo(series.entity_type).get_many({"series_id": series.entity_id}),
+            key=lambda slot: (slot.start_date, slot.start_time)
+        )
+
+    def _insert_occurrences(self, entity_type: str, slots: List) -> Dict[Tuple[str, date, object], object]:
+        """
+        Store occurrences as their own slot rows, skipping those that another request stored
+        since they were expanded, and return the rows of all of them by
+        (series_id, recurrence_date, recurrence_start_time).
+        """
+        if not slots:
+            return {}
+
+        slot_repo = self._get_slot_repo(entity_type)
+        queries = slot_repo.get_save_many_queries(slots, on_conflict=OCCURRENCE_CONFLICT)
+        with slot_repo.adapter:
+            slot_repo.adapter.run_transaction(queries)
+
+        rows = self.slot_series_repo.get_occurrence_rows(
+            SLOT_TABLES[entity_type],
+            [(slot.series_id, slot.recurrence_date, slot.recurrence_start_time) for slot in slots]
+        )
+        return {key: slot_repo.MODEL.from_dict(row) for key, row in rows.items()}
+
+    def end_series(self, series_id: str, from_date, owner_id: Optional[str] = None) -> Optional[SlotSeries]:
+        """
+        Stop a series from generating occurrences on or after from_date. Returns None if
+        series_id is not a rule-based series (a series of stored rows only).
+        """
+        series = self.get_series_by_id(series_id)
+        if not series or (owner_id and series.owner_id != owner_id):
+            return None
+
+        from_date = parse_date_field(from_date, "from_date")
+        if from_date <= series.start_date:
+            series.active = False
+        else:
+            last_date = from_date - timedelta(days=1)
+            series.end_date = min(series.end_date, last_date) if series.end_date else last_date
+
+        logger.info(f"Ending slot series {series_id} from {from_date}")
+        return self.save_series(series)
@@ -0,0 +1,251 @@
+"""
+Concurrent RabbitMQ consumer runtime for BaseServiceProcessor services.
+
+Replaces the one-message-at-a-time loop of the service host. Run it from a
+service's src directory, with the same PROCESSOR_MODULE / PROCESSOR_TYPE
+environment the service host uses:
+
+    python3 -m common.tasks.consumer
+"""
+import os
+import json
+import functools
+import importlib
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pika
+
+from common.app_config import config
+from common.app_logger import create_logger
+from common.tasks.send_message import get_connection_parameters, establish_connection
+
+logger = create_logger(__name__)
+
+
+def get_default_organization_id(message: dict):
+    """Returns the organization a message belongs to, if it carries one at the top level or in `data`"""
+    if not isinstance(message, dict):
+        return None
+    if message.get('organization_id'):
+        return message['organization_id']
+    data = message.get('data')
+    if isinstance(data, dict):
+        return data.get('organization_id')
+    return None
+
+
+class ConcurrentConsumer:
+    """
+    Consumes a RabbitMQ queue with up to `prefetch_count` unacked messages in flight,
+    processing them on a pool of `max_workers` threads. Each message is acked only
+    after its processor call returns.
+
+    Every worker thread builds its own processor instance, since processors hold
+    repositories whose database adapters are not thread-safe.
+
+    When `max_per_organization` is set, at most that many messages for the same
+    organization are processed at once; further messages for that organization are
+    held (unacked) until one of its running messages completes. Held messages count
+    against the prefetch window, so the channel's QoS is raised by the number held,
+    in steps of `prefetch_count` and by at most `max_held`, to keep other
+    organizations' messages flowing to free workers. Past `max_held` held messages
+    the window is not raised further, which bounds the memory a burst can take.
+
+    Processors that define `get_batch_key(message)` and `process_batch(messages)`
+    get micro-batching: messages with the same non-None batch key are collected for
+    up to `batch_window` seconds or `batch_size` messages and handed to
+    `process_batch` in one call. They are acked together once it returns. A batch's
+    messages are unacked while it is collected, so they count against the prefetch
+    window too, and `batch_size` is clamped to `prefetch_count`.
+    """
+
+    def __init__(self, processor_class, queue_name: str, prefetch_count: int = None, max_workers: int = None,
+                 max_per_organization: int = None, parameters: pika.ConnectionParameters = None,
+                 batch_size: int = None, batch_window: float = None, max_held: int = None):
+        self.processor_class = processor_class
+        self.queue_name = queue_name
+        self.prefetch_count = prefetch_count or config.CONSUMER_PREFETCH_COUNT
+        self.max_workers = max_workers or config.CONSUMER_MAX_WORKERS
+        self.max_per_organization = max_per_organization if max_per_organization is not None else config.CONSUMER_MAX_PER_ORGANIZATION
+        self.max_held = max_held if max_held is not None else config.CONSUMER_MAX_HELD_MESSAGES
+        self.parameters = parameters or get_connection_parameters()
+
+        self.get_organization_id = getattr(processor_class, 'get_organization_id', get_default_organization_id)
+        self.get_batch_key = getattr(processor_class, 'get_batch_key', None)
+        # A batch can never hold more unacked deliveries than the prefetch window allows
+        self.batch_size = min(batch_size or config.CONSUMER_BATCH_SIZE, self.prefetch_count)
+        self.batch_window = batch_window if batch_window is not None else config.CONSUMER_BATCH_WINDOW
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="consumer-worker")
+        self._local = threading.local()
+        self._connection = None
+        self._channel = None
+
+        # Only touched from the connection thread
+        self._in_flight = defaultdict(int)
+        self._waiting = defaultdict(deque)
+        self._held = 0
+        self._qos = 0
+        self._batches = {}
+
+    def run(self):
+        logger.info(
+            "Consuming %s with prefetch_count=%s, max_workers=%s, max_per_organization=%s",
+            self.queue_name, self.prefetch_count, self.max_workers, self.max_per_organization
+        )
+        while True:
+            try:
+                self._connection = establish_connection(self.parameters)
+                self._channel = self._connection.channel()
+                self._in_flight.clear()
+                self._waiting.clear()
+                self._held = 0
+                self._batches.clear()
+
+                self._qos = self.prefetch_count
+                self._channel.basic_qos(prefetch_count=self._qos)
+                self._channel.queue_declare(queue=self.queue_name, durable=True)
+                self._channel.basic_consume(queue=self.queue_name, on_message_callback=self._on_message)
+                self._channel.start_consuming()
+            except (pika.exceptions.AMQPConnectionError, pika.exceptions.ChannelClosedByBroker) as e:
+                # Unacked deliveries are redelivered by the broker after reconnecting
+                logger.warning(f"Lost connection to RabbitMQ, reconnecting: {str(e)}")
+                continue
+            except KeyboardInterrupt:
+                logger.info("Exiting gracefully...")
+                break
+
+        self._executor.shutdown(wait=True)
+
+    def _on_message(self, channel, method, _properties, body):
+        try:
+            message = json.loads(body.decode())
+        except Exception as e:
+            logger.error(f"Discarding message that is not valid JSON: {str(e)}")
+            channel.basic_ack(method.delivery_tag)
+            return
+
+        if self.get_batch_key:
+            batch_key = self.get_batch_key(message)
+            if batch_key is not None:
+                self._add_to_batch(channel, batch_key, method.delivery_tag, message)
+                return
+
+        organization_id = self.get_organization_id(message)
+        if organization_id and self.max_per_organization and self._in_flight[organization_id] >= self.max_per_organization:
+            self._waiting[organization_id].append((method.delivery_tag, message))
+            self._held += 1
+            self._update_qos(channel)
+            return
+
+        self._dispatch(channel, method.delivery_tag, organization_id, message)
+
+    def _dispatch(self, channel, delivery_tag, organization_id, message):
+        self._in_flight[organization_id] += 1
+        connection = self._connection
+        future = self._executor.submit(self._process, message)
+        future.add_done_callback(
+            lambda _: self._schedule(connection, functools.partial(self._on_done, channel, delivery_tag, organization_id))
+        )
+
+    @staticmethod
+    def _schedule(connection, callback):
+        try:
+            connection.add_callback_threadsafe(callback)
+        except Exception as e:
+            logger.warning(f"Could not ack message, connection is closed: {str(e)}")
+
+    def _on_done(self, channel, delivery_tag, organization_id):
+        if channel.is_open:
+            channel.basic_ack(delivery_tag)
+
+        if channel is not self._channel:
+            return
+
+        self._in_flight[organization_id] -= 1
+        if self._in_flight[organization_id] <= 0:
+            del self._in_flight[organization_id]
+
+        waiting = self._waiting.get(organization_id)
+        if waiting:
+            next_tag, next_message = waiting.popleft()
+            if not waiting:
+                del self._waiting[organization_id]
+            self._held -= 1
+            self._update_qos(channel)
+            self._dispatch(channel, next_tag, organization_id, next_message)
+
+    def _update_qos(self, channel):
+        """Widen the prefetch window by the messages held back, rounded up to a step of prefetch_count"""
+        steps = -(-min(self._held, self.max_held) // self.prefetch_count)
+        qos = self.prefetch_count * (1 + steps)
+        if qos != self._qos and channel.is_open:
+            channel.basic_qos(prefetch_count=qos)
+            self._qos = qos
+
+    def _add_to_batch(self, channel, batch_key, delivery_tag, message):
+        batch = self._batches.setdefault(batch_key, [])
+        batch.append((delivery_tag, message))
+        if len(batch) >= self.batch_size:
+            self._flush_batch(channel, batch_key, batch)
+        elif len(batch) == 1:
+            self._connection.call_later(
+                self.batch_window, functools.partial(self._flush_batch, channel, batch_key, batch)
+            )
+
+    def _flush_batch(self, channel, batch_key, batch):
+        # The timer of a batch that was already flushed by size must not flush its successor
+        if channel is not self._channel or self._batches.get(batch_key) is not batch:
+            return
+        del self._batches[batch_key]
+
+        delivery_tags = [delivery_tag for delivery_tag, _ in batch]
+        messages = [message for _, message in batch]
+        connection = self._connection
+        future = self._executor.submit(self._process_batch, messages)
+        future.add_done_callback(
+            lambda _: self._schedule(connection, functools.partial(self._ack_all, channel, delivery_tags))
+        )
+
+    @staticmethod
+    def _ack_all(channel, delivery_tags):
+        if channel.is_open:
+            for delivery_tag in delivery_tags:
+                channel.basic_ack(delivery_tag)
+
+    def _get_processor(self):
+        processor = getattr(self._local, 'processor', None)
+        if processor is None:
+            processor = self.processor_class()
+            self._local.processor = processor
+        return processor
+
+    def _process(self, message):
+        try:
+            self._get_processor().process(message)
+        except Exception as e:
+            logger.error(f"Error processing message: {str(e)}")
+            logger.exception(e)
+
+    def _process_batch(self, messages):
+        try:
+            self._get_processor().process_batch(messages)
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(messages)} messages: {str(e)}")
+            logger.exception(e)
+
+
+def main():
+    processor_module = importlib.import_module(os.environ.get('PROCESSOR_MODULE', 'processor'))
+    processor_type = os.environ['PROCESSOR_TYPE']
+    processor_class = getattr(processor_module, processor_type)
+
+    queue_name = config.QUEUE_NAME_PREFIX + os.environ[f"{processor_type}_QUEUE_NAME"]
+
+    ConcurrentConsumer(processor_class, queue_name).run()
+
+
+if __name__ == '__main__':
+    main()
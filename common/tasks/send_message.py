@@ -1,27 +1,24 @@
+import os
 import pika
 import json
 import time
+import queue
+import atexit
+import threading
 from pika.exchange_type import ExchangeType
 
 from common.app_config import config
 from common.app_logger import logger
 
 
-from rococo.messaging.rabbitmq import RabbitMqConnection
-
-
 def send_message(queue_name: str, data: dict) -> None:
-    with RabbitMqConnection(
-        host=config.RABBITMQ_HOST,
-        port=config.RABBITMQ_PORT,
-        username=config.RABBITMQ_USER,
-        password=config.RABBITMQ_PASSWORD,
-        virtual_host=config.RABBITMQ_VIRTUAL_HOST
-    ) as connection:
-        connection.send_message(
-            queue_name=queue_name,
-            message=data,
-        )
+    """
+    Queue a message for the specified RabbitMQ queue on the process-wide publisher.
+
+    The call does not wait for the broker; the publisher's background thread
+    delivers the message with publisher confirms.
+    """
+    get_publisher().publish(queue_name=queue_name, data=data)
 
 
 def get_connection_parameters() -> pika.ConnectionParameters:
@@ -50,9 +47,231 @@ def establish_connection(parameters: pika.ConnectionParameters, max_retries: int
                 logger.error("Error connecting to RabbitMQ after multiple retries")
                 raise e
 
+
+def _default_properties() -> pika.BasicProperties:
+    return pika.BasicProperties(
+        delivery_mode=2,  # Make the message persistent
+    )
+
+
+class RabbitMqPublisher:
+    """
+    Process-wide RabbitMQ publisher.
+
+    Every thread that publishes gets its own long-lived connection and channel
+    (pika connections are not thread-safe), with publisher confirms enabled and
+    queue/exchange declarations cached per channel. `publish` only appends to a
+    bounded in-memory buffer; a background thread drains it in batches so that
+    request threads never wait on the broker or on reconnect backoff.
+    """
+
+    def __init__(self, parameters: pika.ConnectionParameters = None, buffer_size: int = None,
+                 batch_size: int = None, flush_interval: float = None):
+        self.parameters = parameters or get_connection_parameters()
+        self.batch_size = batch_size or config.RABBITMQ_PUBLISH_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else config.RABBITMQ_PUBLISH_FLUSH_INTERVAL
+        self._buffer = queue.Queue(maxsize=buffer_size or config.RABBITMQ_PUBLISH_BUFFER_SIZE)
+        self._local = threading.local()
+        self._closed = threading.Event()
+        self._pending = 0
+        self._pending_lock = threading.Condition()
+        # Messages that overflowed the buffer, for monitoring
+        self.spilled_count = 0
+        self.dropped_count = 0
+        self._thread = threading.Thread(target=self._run, name="rabbitmq-publisher", daemon=True)
+        self._thread.start()
+
+    def publish(self, queue_name: str, data: dict, properties: pika.BasicProperties = None,
+                exchange_name: str = None) -> None:
+        """
+        Buffer a message for delivery without blocking on the broker.
+
+        If the buffer is full, e.g. while the broker is down, the message is
+        spilled to the outbox table for the outbox relay to deliver, or dropped
+        if it cannot be.
+        """
+        message = (queue_name, data, properties, exchange_name)
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            self._buffer.put_nowait(message)
+        except queue.Full:
+            self._mark_done(1)
+            self._spill(message)
+
+    def publish_batch(self, messages: list) -> None:
+        """
+        Publish `(queue_name, data, properties, exchange_name)` tuples on the calling
+        thread's channel and wait for the broker to confirm them.
+
+        Raises the underlying pika error if the messages cannot be delivered after
+        one reconnect.
+        """
+        sent = 0
+        for attempt in range(2):
+            try:
+                channel = self._get_channel()
+                for queue_name, data, properties, exchange_name in messages[sent:]:
+                    self._publish_on_channel(channel, queue_name, data, properties, exchange_name)
+                    sent += 1
+                return
+            except pika.exceptions.AMQPError as e:
+                self._reset_thread_connection()
+                if attempt:
+                    raise e
+                logger.warning(f"RabbitMQ publish failed, reconnecting: {str(e)}")
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every buffered message has been handed to the broker."""
+        deadline = time.monotonic() + timeout
+        with self._pending_lock:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._pending_lock.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        self.flush(timeout)
+        self._closed.set()
+        self._thread.join(timeout)
+        self._reset_thread_connection()
+
+    def _get_channel(self):
+        channel = getattr(self._local, 'channel', None)
+        if channel is not None and channel.is_open and self._local.connection.is_open:
+            return channel
+
+        self._reset_thread_connection()
+        connection = establish_connection(self.parameters, max_retries=config.RABBITMQ_PUBLISH_CONNECT_RETRIES)
+        channel = connection.channel()
+        channel.confirm_delivery()
+        self._local.connection = connection
+        self._local.channel = channel
+        self._local.declared_queues = set()
+        self._local.declared_exchanges = set()
+        return channel
+
+    def _reset_thread_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        self._local.channel = None
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.debug(f"Error closing RabbitMQ connection: {str(e)}")
+
+    def _publish_on_channel(self, channel, queue_name, data, properties, exchange_name):
+        if properties is None:
+            properties = _default_properties()
+
+        if exchange_name is None:
+            exchange_name = ""
+        elif exchange_name not in self._local.declared_exchanges:
+            channel.exchange_declare(exchange=exchange_name, exchange_type=ExchangeType.topic.value, durable=True)
+            self._local.declared_exchanges.add(exchange_name)
+
+        if queue_name not in self._local.declared_queues:
+            channel.queue_declare(queue=queue_name, durable=True)
+            self._local.declared_queues.add(queue_name)
+
+        # With confirm_delivery enabled this returns once the broker has acked the message
+        channel.basic_publish(
+            exchange=exchange_name,
+            routing_key=queue_name,
+            body=json.dumps(data).encode(),
+            properties=properties,
+        )
+        logger.info(f"Sent message to queue: {queue_name}")
+
+    def _spill(self, message: tuple):
+        queue_name, data, properties, exchange_name = message
+        # The outbox relay publishes to the default exchange with the default properties
+        if properties is None and exchange_name is None:
+            from common.services.outbox import OutboxService
+            try:
+                OutboxService(config).enqueue(queue_name, data)
+                with self._pending_lock:
+                    self.spilled_count += 1
+                logger.warning(f"Publish buffer full, added message for queue {queue_name} to the outbox")
+                return
+            except Exception as e:
+                logger.error(f"Could not add message for queue {queue_name} to the outbox: {str(e)}")
+
+        with self._pending_lock:
+            self.dropped_count += 1
+            dropped_count = self.dropped_count
+        logger.error(f"Publish buffer full, dropped message for queue {queue_name} ({dropped_count} dropped so far)")
+
+    def _mark_done(self, count: int):
+        with self._pending_lock:
+            self._pending -= count
+            self._pending_lock.notify_all()
+
+    def _run(self):
+        while not self._closed.is_set():
+            try:
+                batch = [self._buffer.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                self._process_heartbeats()
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._buffer.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._publish_with_retry(batch)
+            self._mark_done(len(batch))
+
+    def _publish_with_retry(self, batch: list):
+        # Keep retrying while the broker is unavailable; new messages pile up in the
+        # bounded buffer and overflow to the outbox once it is full.
+        backoff = 1
+        while True:
+            try:
+                self.publish_batch(batch)
+                return
+            except Exception as e:
+                logger.error(f"Failed to publish {len(batch)} buffered RabbitMQ messages: {str(e)}")
+                if self._closed.wait(backoff):
+                    logger.error(f"Publisher closed, dropping {len(batch)} undelivered RabbitMQ messages")
+                    return
+                backoff = min(backoff * 2, 30)
+
+    def _process_heartbeats(self):
+        # An idle BlockingConnection only answers broker heartbeats while doing I/O
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and connection.is_open:
+            try:
+                connection.process_data_events(time_limit=0)
+            except Exception:
+                self._reset_thread_connection()
+
+
+_publisher = None
+_publisher_pid = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher() -> RabbitMqPublisher:
+    """Return the RabbitMqPublisher for this process, starting it on first use."""
+    global _publisher, _publisher_pid
+    if _publisher is None or _publisher_pid != os.getpid():
+        with _publisher_lock:
+            if _publisher is None or _publisher_pid != os.getpid():
+                _publisher = RabbitMqPublisher()
+                _publisher_pid = os.getpid()
+                atexit.register(_publisher.close)
+    return _publisher
+
+
 class MessageSender:
     def __init__(self):
-        self.parameters = get_connection_parameters()
+        self.publisher = get_publisher()
 
     def send_message(self, queue_name: str, data: dict, properties: pika.BasicProperties = None, exchange_name: str = None) -> None:
         """
@@ -62,26 +281,4 @@ class MessageSender:
         :param data: The data to send to the queue as a dictionary.
         :return: None
         """
-        connection = establish_connection(self.parameters)
-
-        with connection:
-            channel = connection.channel()
-
-            if properties is None:
-                properties = pika.BasicProperties(
-                    delivery_mode=2,  # Make the message persistent
-                )
-
-            if exchange_name is None:
-                exchange_name = ""
-            else:
-                channel.exchange_declare(exchange=exchange_name, exchange_type=ExchangeType.topic.value, durable=True)
-
-            channel.queue_declare(queue=queue_name, durable=True)
-            channel.basic_publish(
-                exchange=exchange_name,
-                routing_key=queue_name,
-                body=json.dumps(data).encode(),
-                properties=properties,
-            )
-            logger.info(f"Sent message to queue: {queue_name}")
+        self.publisher.publish(queue_name, data, properties=properties, exchange_name=exchange_name)
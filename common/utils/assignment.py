@@ -0,0 +1,77 @@
+from typing import List, Optional, Sequence, Tuple
+
+
+def min_cost_assignment(costs: Sequence[Sequence[Optional[float]]]) -> List[Tuple[int, int]]:
+    """
+    Solve the assignment problem on a rectangular cost matrix with the Hungarian method
+    (shortest augmenting paths with potentials, O(rows^2 * columns)).
+
+    `costs[row][column]` is the non-negative cost of assigning the row to the column, or
+    None where they cannot be paired. Returns the (row, column) pairs of an assignment that
+    pairs as many rows as possible and, among those, has the lowest total cost.
+    """
+    if not costs or not costs[0]:
+        return []
+
+    transposed = len(costs) > len(costs[0])
+    if transposed:
+        costs = [list(column) for column in zip(*costs)]
+    rows, columns = len(costs), len(costs[0])
+
+    finite = [cost for row in costs for cost in row if cost is not None]
+    if not finite:
+        return []
+    # Missing edges cost more than any assignment of real edges, so that coverage comes first
+    missing = (max(finite) + 1) * rows + 1
+    matrix = [[missing if cost is None else cost for cost in row] for row in costs]
+
+    # 1-based potentials and matching; column 0 is the virtual start of each augmenting path
+    row_potential = [0.0] * (rows + 1)
+    column_potential = [0.0] * (columns + 1)
+    matched_row = [0] * (columns + 1)
+    previous_column = [0] * (columns + 1)
+
+    for row in range(1, rows + 1):
+        matched_row[0] = row
+        current_column = 0
+        min_slack = [float('inf')] * (columns + 1)
+        visited = [False] * (columns + 1)
+
+        while True:
+            visited[current_column] = True
+            current_row = matched_row[current_column]
+            delta, next_column = float('inf'), 0
+            row_costs = matrix[current_row - 1]
+            for column in range(1, columns + 1):
+                if visited[column]:
+                    continue
+                slack = row_costs[column - 1] - row_potential[current_row] - column_potential[column]
+                if slack < min_slack[column]:
+                    min_slack[column] = slack
+                    previous_column[column] = current_column
+                if min_slack[column] < delta:
+                    delta, next_column = min_slack[column], column
+
+            for column in range(columns + 1):
+                if visited[column]:
+                    row_potential[matched_row[column]] += delta
+                    column_potential[column] -= delta
+                else:
+                    min_slack[column] -= delta
+
+            current_column = next_column
+            if matched_row[current_column] == 0:
+                break
+
+        # Flip the augmenting path
+        while current_column:
+            previous = previous_column[current_column]
+            matched_row[current_column] = matched_row[previous]
+            current_column = previous
+
+    pairs = []
+    for column in range(1, columns + 1):
+        row = matched_row[column]
+        if row and costs[row - 1][column - 1] is not None:
+            pairs.append((column - 1, row - 1) if transposed else (row - 1, column - 1))
+    return sorted(pairs)
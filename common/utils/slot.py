@@ -1,8 +1,9 @@
 import uuid
-from typing import Optional, Any
+from typing import Optional, Any, Dict, Iterable, List, Tuple
 from datetime import time, timedelta, datetime, date
 from common.models.patient_care_slot import PatientCareSlot
 from common.models.availability_slot import AvailabilitySlot
+from common.models.slot_series import SlotSeries
 from common.helpers.exceptions import InputValidationError
 
 # Validation constants
@@ -181,4 +182,154 @@ def get_week_start_date(date_:date):
     days_to_subtract = day_of_week
     start_of_week = date_ - timedelta(days=days_to_subtract)
     
-    return start_of_week
\ No newline at end of file
+    return start_of_week
+
+
+def _parse_start_date(start_date) -> date:
+    if isinstance(start_date, str):
+        return datetime.fromisoformat(start_date).date()
+    elif isinstance(start_date, datetime):
+        return start_date.date()
+    return start_date
+
+def build_slot_series(payload: dict, start_date, entity_id: str, entity_type: str = "patient") -> SlotSeries:
+    """
+    Build the recurrence rule for the same payload `expand_slots` takes: the selected days of
+    `duration_weeks` weeks from start_date, one slot per shift. An optional `interval_weeks`
+    (default 1) repeats the pattern every n weeks.
+    """
+    start_date = _parse_start_date(start_date)
+
+    shifts = []
+    for shift in payload["shifts"]:
+        start_t = parse_time_field(shift["start_time"], "start_time")
+        end_t = parse_time_field(shift["end_time"], "end_time")
+        if not is_valid_time_range(start_t, end_t):
+            raise InputValidationError(f"Invalid time range: start_time {start_t} to end_time {end_t}")
+        shifts.append({"start_time": start_t.strftime('%H:%M'), "end_time": end_t.strftime('%H:%M')})
+
+    days_of_week = sorted({validate_and_parse_day_of_week(day, "selected_days") for day in payload["selected_days"]})
+    interval_weeks = payload.get("interval_weeks") or 1
+    if not isinstance(interval_weeks, int) or interval_weeks < 1:
+        raise InputValidationError("interval_weeks must be a positive integer")
+
+    return SlotSeries(
+        patient_id=entity_id if entity_type == "patient" else None,
+        employee_id=entity_id if entity_type == "employee" else None,
+        days_of_week=days_of_week,
+        shifts=shifts,
+        interval_weeks=interval_weeks,
+        start_date=start_date,
+        # expand_slots covers duration_weeks full weeks counted from start_date
+        end_date=start_date + timedelta(weeks=payload["duration_weeks"]) - timedelta(days=1),
+    )
+
+def make_occurrence_id(series_id: str, recurrence_date: date, recurrence_start_time: time) -> str:
+    """Id of an occurrence of a series that has no slot row of its own"""
+    return f"{series_id}:{recurrence_date.strftime('%Y%m%d')}:{recurrence_start_time.strftime('%H%M')}"
+
+def parse_occurrence_id(value: Any) -> Optional[Tuple[str, date, time]]:
+    """Returns (series_id, recurrence_date, recurrence_start_time), or None for a slot row id"""
+    parts = value.split(':') if isinstance(value, str) else []
+    if len(parts) != 3:
+        return None
+    try:
+        return parts[0], datetime.strptime(parts[1], '%Y%m%d').date(), datetime.strptime(parts[2], '%H%M').time()
+    except ValueError:
+        return None
+
+def build_occurrence(series: SlotSeries, recurrence_date: date, start_time: time, end_time: time,
+                     entity_id: Optional[str] = None):
+    """
+    The PatientCareSlot or AvailabilitySlot of one occurrence of a series. Without an
+    entity_id it gets the occurrence id; pass a new id to materialize it as a row.
+    """
+    start_day_of_week = recurrence_date.weekday()
+    if end_time <= start_time:
+        end_date = recurrence_date + timedelta(days=1)
+        end_day_of_week = (start_day_of_week + 1) % 7
+    else:
+        end_date = recurrence_date
+        end_day_of_week = start_day_of_week
+
+    slot_data = dict(
+        entity_id=entity_id or make_occurrence_id(series.entity_id, recurrence_date, start_time),
+        series_id=series.entity_id,
+        start_day_of_week=start_day_of_week,
+        end_day_of_week=end_day_of_week,
+        start_time=start_time,
+        end_time=end_time,
+        start_date=recurrence_date,
+        end_date=end_date,
+        recurrence_date=recurrence_date,
+        recurrence_start_time=start_time,
+    )
+    if series.patient_id:
+        return PatientCareSlot(patient_id=series.patient_id, **slot_data)
+    return AvailabilitySlot(employee_id=series.employee_id, **slot_data)
+
+def iter_series_dates(series: SlotSeries, window_start: date, window_end: date) -> Iterable[date]:
+    """Dates in the window (inclusive) on which the series has occurrences"""
+    first = max(series.start_date, window_start)
+    last = min(series.end_date, window_end) if series.end_date else window_end
+    anchor = get_week_start_date(series.start_date)
+    days_of_week = set(series.days_of_week or [])
+    interval_weeks = series.interval_weeks or 1
+
+    day = first
+    while day <= last:
+        if day.weekday() in days_of_week and ((day - anchor).days // 7) % interval_weeks == 0:
+            yield day
+        day += timedelta(days=1)
+
+def expand_series(series: SlotSeries, window_start: date, window_end: date,
+                  overridden: Iterable[Tuple[str, date, time]] = ()) -> List:
+    """
+    Expand the occurrences of a series that start within the window (inclusive), skipping the
+    (series_id, recurrence_date, recurrence_start_time) occurrences that have their own row.
+    """
+    overridden = set(overridden)
+    shift_times = series.get_shift_times()
+
+    occurrences = []
+    for recurrence_date in iter_series_dates(series, window_start, window_end):
+        for start_time, end_time in shift_times:
+            if (series.entity_id, recurrence_date, start_time) in overridden:
+                continue
+            occurrences.append(build_occurrence(series, recurrence_date, start_time, end_time))
+    return occurrences
+
+
+# Slot columns of the compact organization schedule, after the owner id
+SCHEDULE_COLUMNS = ["slot_id", "series_id", "start_date", "end_date", "start_time", "end_time"]
+
+def get_schedule_sort_key(row: Dict[str, Any], owner_field: str) -> Tuple[str, str, str]:
+    """Keyset sort key of an organization schedule row: (owner id, start date, slot id)"""
+    return (row[owner_field], row['start_date'].isoformat(), row['slot_id'])
+
+def compact_schedule(rows: List[Dict[str, Any]], owner_field: str, counterpart: str) -> Dict[str, Any]:
+    """
+    Compact form of organization schedule rows: one array per slot under `columns`, the care
+    visits of each slot as arrays under `care_visit_columns`, and the names of the slot owners
+    and of the visits' `counterpart` ("patient" or "employee") once each under `names`.
+    """
+    counterpart_field = f"{counterpart}_id"
+    names = {}
+    compact_rows = []
+    for row in rows:
+        names[row[owner_field]] = [row.get('first_name'), row.get('last_name')]
+        visits = []
+        for visit in row.get('care_visits') or []:
+            if visit.get(counterpart_field):
+                names.setdefault(visit[counterpart_field], [
+                    visit.get(f"{counterpart}_first_name"), visit.get(f"{counterpart}_last_name")
+                ])
+            visits.append([visit.get('visit_date'), visit.get(counterpart_field), visit.get('status')])
+        compact_rows.append([row[owner_field]] + [row.get(column) for column in SCHEDULE_COLUMNS] + [visits])
+
+    return {
+        "columns": [owner_field] + SCHEDULE_COLUMNS + ["care_visits"],
+        "rows": compact_rows,
+        "care_visit_columns": ["visit_date", counterpart_field, "status"],
+        "names": names,
+    }
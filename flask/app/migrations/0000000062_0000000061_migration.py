@@ -0,0 +1,33 @@
+revision = "0000000062"
+down_revision = "0000000061"
+
+def upgrade(migration):
+    # Transactional outbox: rows are written in the same transaction as the entity
+    # save and drained to RabbitMQ by the outbox_relay service.
+    migration.create_table(
+        "outbox",
+        """
+            "id" BIGSERIAL PRIMARY KEY,
+            "queue_name" VARCHAR(255) NOT NULL,
+            "payload" JSONB NOT NULL,
+            "created_on" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            "published_on" TIMESTAMP DEFAULT NULL,
+            "attempts" INTEGER NOT NULL DEFAULT 0,
+            "last_error" TEXT DEFAULT NULL
+        """
+    )
+
+    # The relay only ever scans unpublished rows in insertion order
+    migration.execute("""
+        CREATE INDEX idx_outbox_unpublished
+        ON outbox (id)
+        WHERE published_on IS NULL;
+    """)
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.execute("DROP INDEX IF EXISTS idx_outbox_unpublished;")
+    migration.drop_table(table_name="outbox")
+
+    migration.update_version_table(version=down_revision)
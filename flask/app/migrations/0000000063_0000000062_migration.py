@@ -0,0 +1,35 @@
+revision = "0000000063"
+down_revision = "0000000062"
+
+def upgrade(migration):
+    # Ledger of S3 event notifications already handled by an import service, so that
+    # at-least-once redeliveries of the same ObjectCreated event are skipped.
+    migration.create_table(
+        "processed_s3_event",
+        """
+            "processor" VARCHAR(64) NOT NULL,
+            "event_key" TEXT NOT NULL,
+            "bucket_name" VARCHAR(255) NOT NULL,
+            "object_key" TEXT NOT NULL,
+            "etag" VARCHAR(255) DEFAULT NULL,
+            "sequencer" VARCHAR(255) DEFAULT NULL,
+            "claim_token" VARCHAR(32) NOT NULL,
+            "duplicate_count" INTEGER NOT NULL DEFAULT 0,
+            "first_seen_on" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            "expires_on" TIMESTAMP NOT NULL,
+            PRIMARY KEY ("processor", "event_key")
+        """
+    )
+
+    migration.execute("""
+        CREATE INDEX idx_processed_s3_event_expires_on
+        ON processed_s3_event (expires_on);
+    """)
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.execute("DROP INDEX IF EXISTS idx_processed_s3_event_expires_on;")
+    migration.drop_table(table_name="processed_s3_event")
+
+    migration.update_version_table(version=down_revision)
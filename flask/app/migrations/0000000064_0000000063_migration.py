@@ -0,0 +1,36 @@
+revision = "0000000064"
+down_revision = "0000000063"
+
+def upgrade(migration):
+    # Progress of the per-organization rematch that follows an OIG LEIE import
+    for table in ("oig_exclusions_check", "oig_exclusions_check_audit"):
+        migration.add_column(table, "match_sweep_status", "VARCHAR(32) DEFAULT NULL")
+        migration.add_column(table, "match_sweep_total", "INTEGER DEFAULT NULL")
+        migration.add_column(table, "match_sweep_completed_on", "TIMESTAMP DEFAULT NULL")
+
+    # One work item per organization and import; the match service marks its item
+    # done and the last one to finish completes the sweep on oig_exclusions_check.
+    migration.create_table(
+        "oig_match_sweep_item",
+        """
+            "check_id" VARCHAR(32) NOT NULL,
+            "organization_id" VARCHAR(32) NOT NULL,
+            "status" VARCHAR(32) NOT NULL DEFAULT 'pending',
+            "match_count" INTEGER DEFAULT NULL,
+            "created_on" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            "completed_on" TIMESTAMP DEFAULT NULL,
+            PRIMARY KEY ("check_id", "organization_id")
+        """
+    )
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.drop_table(table_name="oig_match_sweep_item")
+
+    for table in ("oig_exclusions_check", "oig_exclusions_check_audit"):
+        migration.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS match_sweep_status;")
+        migration.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS match_sweep_total;")
+        migration.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS match_sweep_completed_on;")
+
+    migration.update_version_table(version=down_revision)
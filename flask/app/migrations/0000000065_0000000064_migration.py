@@ -0,0 +1,54 @@
+revision = "0000000065"
+down_revision = "0000000064"
+
+def upgrade(migration):
+    # Per-entity rollup of active exclusion matches, kept up to date by the match
+    # repository whenever an entity's matches are upserted, retired, reviewed or verified.
+    migration.create_table(
+        "exclusion_match_summary",
+        """
+            "entity_type" VARCHAR(32) NOT NULL,
+            "entity_id" VARCHAR(32) NOT NULL,
+            "organization_id" VARCHAR(32) NOT NULL,
+            "match_type" VARCHAR(32) NOT NULL,
+            "match_count" INTEGER NOT NULL,
+            "status" VARCHAR(32) NOT NULL,
+            "verification_result" VARCHAR(255) DEFAULT NULL,
+            "s3_key" TEXT DEFAULT NULL,
+            "updated_on" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY ("entity_type", "entity_id")
+        """
+    )
+    migration.add_index("exclusion_match_summary", "exclusion_match_summary_org_ind", "organization_id, entity_type, entity_id")
+
+    # Refreshes look matches up by entity
+    migration.add_index("employee_exclusion_match", "employee_exclusion_match_entity_ind", "matched_entity_type, matched_entity_id")
+
+    # Backfill from the existing matches
+    migration.execute("""
+        INSERT INTO exclusion_match_summary
+            (entity_type, entity_id, organization_id, match_type, match_count, status, verification_result, s3_key)
+        SELECT
+            matched_entity_type,
+            matched_entity_id,
+            MAX(organization_id),
+            CASE WHEN COUNT(CASE WHEN match_type = 'name_and_dob' THEN 1 END) > 0 THEN 'name_and_dob' ELSE 'name_only' END,
+            COUNT(entity_id),
+            CASE WHEN COUNT(CASE WHEN status = 'pending' THEN 1 END) > 0 THEN 'pending' ELSE 'handled' END,
+            MAX(verification_result),
+            MAX(s3_key)
+        FROM employee_exclusion_match
+        WHERE active = true
+            AND matched_entity_id IS NOT NULL
+            AND organization_id IS NOT NULL
+            AND matched_entity_type IN ('employee', 'physician')
+        GROUP BY matched_entity_type, matched_entity_id;
+    """)
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.remove_index("employee_exclusion_match", "employee_exclusion_match_entity_ind")
+    migration.drop_table(table_name="exclusion_match_summary")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,25 @@
+revision = "0000000066"
+down_revision = "0000000065"
+
+def upgrade(migration):
+    # Cached exclusion dashboard counters, one row per organization. A row is deleted
+    # whenever its counts change (matches upserted, import finished) and recomputed
+    # with one aggregate query on the next read.
+    migration.create_table(
+        "exclusion_dashboard_counters",
+        """
+            "organization_id" VARCHAR(32) NOT NULL,
+            "current_employee_count" INTEGER NOT NULL,
+            "matches_count" INTEGER NOT NULL,
+            "files_count" INTEGER NOT NULL,
+            "computed_on" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY ("organization_id")
+        """
+    )
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.drop_table(table_name="exclusion_dashboard_counters")
+
+    migration.update_version_table(version=down_revision)
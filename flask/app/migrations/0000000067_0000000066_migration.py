@@ -0,0 +1,35 @@
+revision = "0000000067"
+down_revision = "0000000066"
+
+def upgrade(migration):
+    # Keyset pagination of the exclusion match listing walks active matches of an
+    # organization in (last name, first name, entity_id) order, optionally narrowed by status.
+    migration.execute("""
+        CREATE INDEX IF NOT EXISTS employee_exclusion_match_org_name_ind
+        ON employee_exclusion_match (
+            organization_id, lower(COALESCE(last_name, '')), lower(COALESCE(first_name, '')), entity_id
+        )
+        WHERE active = true;
+    """)
+    migration.execute("""
+        CREATE INDEX IF NOT EXISTS employee_exclusion_match_org_status_name_ind
+        ON employee_exclusion_match (
+            organization_id, status, lower(COALESCE(last_name, '')), lower(COALESCE(first_name, '')), entity_id
+        )
+        WHERE active = true;
+    """)
+    # Filtered counts by entity type, match type and verification result
+    migration.execute("""
+        CREATE INDEX IF NOT EXISTS employee_exclusion_match_org_filter_ind
+        ON employee_exclusion_match (organization_id, status, matched_entity_type, match_type, verification_result)
+        WHERE active = true;
+    """)
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.execute("DROP INDEX IF EXISTS employee_exclusion_match_org_filter_ind;")
+    migration.execute("DROP INDEX IF EXISTS employee_exclusion_match_org_status_name_ind;")
+    migration.execute("DROP INDEX IF EXISTS employee_exclusion_match_org_name_ind;")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,33 @@
+revision = "0000000068"
+down_revision = "0000000067"
+
+def upgrade(migration):
+    # oig_employees_exclusion becomes the unified exclusion index of every list
+    # (LEIE, SAM, state Medicaid). Each import replaces only its own source's rows.
+    migration.add_column("oig_employees_exclusion", "source", "VARCHAR(32) NOT NULL DEFAULT 'leie'")
+    migration.add_index("oig_employees_exclusion", "oig_employees_exclusion_source_ind", "source")
+
+    # Checks are logged per source; content_hash detects changes of lists without a "Last Update" page
+    for table in ("oig_exclusions_check", "oig_exclusions_check_audit"):
+        migration.add_column(table, "source", "VARCHAR(32) NOT NULL DEFAULT 'leie'")
+        migration.add_column(table, "content_hash", "VARCHAR(64) DEFAULT NULL")
+
+    # The list a match was found on
+    for table in ("employee_exclusion_match", "employee_exclusion_match_audit"):
+        migration.add_column(table, "source", "VARCHAR(32) NOT NULL DEFAULT 'leie'")
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    for table in ("employee_exclusion_match", "employee_exclusion_match_audit"):
+        migration.drop_column(table, "source")
+
+    for table in ("oig_exclusions_check", "oig_exclusions_check_audit"):
+        migration.drop_column(table, "content_hash")
+        migration.drop_column(table, "source")
+
+    migration.remove_index("oig_employees_exclusion", "oig_employees_exclusion_source_ind")
+    migration.execute("DELETE FROM oig_employees_exclusion WHERE source <> 'leie';")
+    migration.drop_column("oig_employees_exclusion", "source")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,20 @@
+revision = "0000000069"
+down_revision = "0000000068"
+
+def upgrade(migration):
+    # HTTP validators of the list file seen by each check, so the next check can ask
+    # the server whether the file changed with a HEAD or conditional GET request
+    for table in ("oig_exclusions_check", "oig_exclusions_check_audit"):
+        migration.add_column(table, "etag", "VARCHAR(255) DEFAULT NULL")
+        migration.add_column(table, "last_modified", "VARCHAR(64) DEFAULT NULL")
+        migration.add_column(table, "content_length", "BIGINT DEFAULT NULL")
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    for table in ("oig_exclusions_check", "oig_exclusions_check_audit"):
+        migration.drop_column(table, "etag")
+        migration.drop_column(table, "last_modified")
+        migration.drop_column(table, "content_length")
+
+    migration.update_version_table(version=down_revision)
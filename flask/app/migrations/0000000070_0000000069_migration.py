@@ -0,0 +1,62 @@
+revision = "0000000070"
+down_revision = "0000000069"
+
+SLOT_SERIES_COLUMNS = """
+            "entity_id" varchar(32) NOT NULL,
+            "version" varchar(32) NOT NULL,
+            "previous_version" varchar(32) DEFAULT '00000000000000000000000000000000',
+            "active" boolean DEFAULT true,
+            "changed_by_id" varchar(32) DEFAULT NULL,
+            "changed_on" timestamp DEFAULT CURRENT_TIMESTAMP,
+
+            "patient_id" varchar(32) DEFAULT NULL,
+            "employee_id" varchar(32) DEFAULT NULL,
+            "days_of_week" integer[] NOT NULL,
+            "shifts" jsonb NOT NULL,
+            "interval_weeks" integer NOT NULL DEFAULT 1,
+            "start_date" date NOT NULL,
+            "end_date" date DEFAULT NULL,
+"""
+
+def upgrade(migration):
+    # Recurring slots are stored once per series as a rule and expanded on read
+    migration.create_table(
+        "slot_series",
+        SLOT_SERIES_COLUMNS + """
+            PRIMARY KEY ("entity_id")
+        """
+    )
+    migration.create_table(
+        "slot_series_audit",
+        SLOT_SERIES_COLUMNS + """
+            PRIMARY KEY ("entity_id", "version")
+        """
+    )
+    migration.add_index("slot_series", "slot_series_patient_id_ind", "patient_id")
+    migration.add_index("slot_series", "slot_series_employee_id_ind", "employee_id")
+
+    # Slot rows that override (edit, cancel or book) one occurrence of a series
+    for table_name in ["patient_care_slot", "availability_slot"]:
+        for suffix in ["", "_audit"]:
+            migration.add_column(table_name + suffix, "recurrence_date", "date DEFAULT NULL")
+            migration.add_column(table_name + suffix, "recurrence_start_time", "time DEFAULT NULL")
+
+        migration.execute(f"""
+            CREATE INDEX {table_name}_series_recurrence_ind
+            ON {table_name} (series_id, recurrence_date, recurrence_start_time)
+            WHERE recurrence_date IS NOT NULL
+        """)
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    for table_name in ["patient_care_slot", "availability_slot"]:
+        migration.execute(f"DROP INDEX IF EXISTS {table_name}_series_recurrence_ind")
+        for suffix in ["", "_audit"]:
+            migration.drop_column(table_name + suffix, "recurrence_start_time")
+            migration.drop_column(table_name + suffix, "recurrence_date")
+
+    migration.drop_table(table_name="slot_series_audit")
+    migration.drop_table(table_name="slot_series")
+
+    migration.update_version_table(version=down_revision)
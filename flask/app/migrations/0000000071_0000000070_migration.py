@@ -0,0 +1,166 @@
+revision = "0000000071"
+down_revision = "0000000070"
+
+# A slot ends at or before its start time only when it runs overnight into its end date
+SLOT_RANGE_EXPRESSION = """
+    CASE WHEN start_date IS NOT NULL AND start_time IS NOT NULL AND end_time IS NOT NULL THEN
+        tsrange(
+            start_date + start_time,
+            COALESCE(end_date, start_date) + end_time
+                + CASE WHEN COALESCE(end_date, start_date) + end_time <= start_date + start_time
+                       THEN interval '1 day' ELSE interval '0' END,
+            '[)'
+        )
+    END
+"""
+
+# Active visits must end after they start (care_visit_scheduled_range_valid), so that
+# only inactive and cancelled visits can be left without a range
+VISIT_RANGE_EXPRESSION = """
+    CASE WHEN scheduled_end_time > scheduled_start_time THEN
+        tsrange(scheduled_start_time, scheduled_end_time, '[)')
+    END
+"""
+
+OVERLAPPING_VISITS_QUERY = """
+    SELECT DISTINCT later.entity_id, later.employee_id, later.patient_id,
+        later.scheduled_start_time, later.scheduled_end_time
+    FROM care_visit earlier
+    JOIN care_visit later
+        ON later.scheduled_range && earlier.scheduled_range
+        AND (later.scheduled_start_time, later.entity_id) > (earlier.scheduled_start_time, earlier.entity_id)
+        AND (
+            (later.employee_id = earlier.employee_id AND later.employee_id <> '')
+            OR (later.patient_id = earlier.patient_id AND later.patient_id <> '')
+        )
+    WHERE earlier.active = true AND earlier.status <> 'cancelled'
+      AND later.active = true AND later.status <> 'cancelled'
+    ORDER BY later.scheduled_start_time
+"""
+
+def roll_over_overnight_visits(migration):
+    """
+    Visits of overnight slots were saved with the end time on the visit date, before their
+    start; they end on the next day
+    """
+    migration.execute("""
+        UPDATE care_visit
+        SET scheduled_end_time = scheduled_end_time + interval '1 day'
+        WHERE scheduled_end_time <= scheduled_start_time
+          AND scheduled_end_time + interval '1 day' > scheduled_start_time
+    """)
+
+def cancel_overlapping_visits(migration):
+    """Cancel, as a new version of each, every visit that overlaps one starting before it"""
+    visits = migration.execute(OVERLAPPING_VISITS_QUERY) or []
+    if not visits:
+        return
+
+    print(f"Cancelling {len(visits)} care visits that overlap an earlier visit of their employee or patient:")
+    for visit in visits:
+        print(
+            f"  {visit['entity_id']} (employee {visit['employee_id']}, patient {visit['patient_id']}, "
+            f"{visit['scheduled_start_time']} to {visit['scheduled_end_time']})"
+        )
+
+    cancel_visits(migration, tuple(visit['entity_id'] for visit in visits))
+
+def cancel_visits(migration, entity_ids: tuple):
+    """Cancel visits as a new version of each, copying the current ones to the audit table"""
+    migration.execute(
+        "INSERT INTO care_visit_audit (SELECT * FROM care_visit WHERE entity_id IN %s)",
+        args=(entity_ids,)
+    )
+    migration.execute("""
+        UPDATE care_visit
+        SET status = 'cancelled',
+            previous_version = version,
+            version = replace(gen_random_uuid()::text, '-', ''),
+            changed_on = now() AT TIME ZONE 'utc'
+        WHERE entity_id IN %s
+    """, args=(entity_ids,))
+
+def cancel_invalid_visits(migration):
+    """Cancel the active visits that still do not end after they start"""
+    visits = migration.execute("""
+        SELECT entity_id, scheduled_start_time, scheduled_end_time
+        FROM care_visit
+        WHERE active = true AND status <> 'cancelled' AND scheduled_end_time <= scheduled_start_time
+    """) or []
+    if not visits:
+        return
+
+    print(f"Cancelling {len(visits)} care visits that do not end after they start:")
+    for visit in visits:
+        print(f"  {visit['entity_id']} ({visit['scheduled_start_time']} to {visit['scheduled_end_time']})")
+    cancel_visits(migration, tuple(visit['entity_id'] for visit in visits))
+
+def upgrade(migration):
+    # Needed to combine equality on varchar columns with range overlap in one GiST index
+    migration.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    roll_over_overnight_visits(migration)
+
+    # Generated ranges on the live tables. The audit tables get plain columns, since rows
+    # are copied into them with INSERT ... SELECT *.
+    migration.execute(f"""
+        ALTER TABLE care_visit
+        ADD COLUMN scheduled_range tsrange GENERATED ALWAYS AS ({VISIT_RANGE_EXPRESSION}) STORED
+    """)
+    migration.add_column("care_visit_audit", "scheduled_range", "tsrange")
+
+    for table_name in ["availability_slot", "patient_care_slot"]:
+        migration.execute(f"""
+            ALTER TABLE {table_name}
+            ADD COLUMN slot_range tsrange GENERATED ALWAYS AS ({SLOT_RANGE_EXPRESSION}) STORED
+        """)
+        migration.add_column(f"{table_name}_audit", "slot_range", "tsrange")
+        migration.execute(f"""
+            CREATE INDEX {table_name}_slot_range_ind ON {table_name} USING gist (slot_range)
+            WHERE active = true
+        """)
+
+    migration.execute("""
+        CREATE INDEX care_visit_scheduled_range_ind ON care_visit USING gist (scheduled_range)
+        WHERE active = true
+    """)
+
+    # Visits saved before these constraints may overlap: of each overlapping pair of active
+    # visits of an employee or a patient, the one that starts later is cancelled
+    cancel_overlapping_visits(migration)
+    cancel_invalid_visits(migration)
+
+    # No employee or patient can have two overlapping active visits
+    migration.execute("""
+        ALTER TABLE care_visit ADD CONSTRAINT care_visit_employee_no_overlap
+        EXCLUDE USING gist (employee_id WITH =, scheduled_range WITH &&)
+        WHERE (active = true AND status <> 'cancelled' AND employee_id <> '')
+    """)
+    migration.execute("""
+        ALTER TABLE care_visit ADD CONSTRAINT care_visit_patient_no_overlap
+        EXCLUDE USING gist (patient_id WITH =, scheduled_range WITH &&)
+        WHERE (active = true AND status <> 'cancelled' AND patient_id <> '')
+    """)
+
+    # A visit without a valid range would otherwise be exempt from both constraints
+    migration.execute("""
+        ALTER TABLE care_visit ADD CONSTRAINT care_visit_scheduled_range_valid
+        CHECK (active = false OR status = 'cancelled' OR scheduled_end_time > scheduled_start_time)
+    """)
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.execute("ALTER TABLE care_visit DROP CONSTRAINT IF EXISTS care_visit_scheduled_range_valid")
+    migration.execute("ALTER TABLE care_visit DROP CONSTRAINT IF EXISTS care_visit_patient_no_overlap")
+    migration.execute("ALTER TABLE care_visit DROP CONSTRAINT IF EXISTS care_visit_employee_no_overlap")
+    migration.execute("DROP INDEX IF EXISTS care_visit_scheduled_range_ind")
+    migration.drop_column("care_visit", "scheduled_range")
+    migration.drop_column("care_visit_audit", "scheduled_range")
+
+    for table_name in ["availability_slot", "patient_care_slot"]:
+        migration.execute(f"DROP INDEX IF EXISTS {table_name}_slot_range_ind")
+        migration.drop_column(table_name, "slot_range")
+        migration.drop_column(f"{table_name}_audit", "slot_range")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,15 @@
+revision = "0000000072"
+down_revision = "0000000071"
+
+def upgrade(migration):
+    # Weekly and monthly slot views read an employee's or a patient's slots by date range
+    migration.add_index("availability_slot", "availability_slot_employee_start_date_ind", "employee_id, start_date")
+    migration.add_index("patient_care_slot", "patient_care_slot_patient_start_date_ind", "patient_id, start_date")
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.remove_index("availability_slot", "availability_slot_employee_start_date_ind")
+    migration.remove_index("patient_care_slot", "patient_care_slot_patient_start_date_ind")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,15 @@
+revision = "0000000073"
+down_revision = "0000000072"
+
+def upgrade(migration):
+    # The organization schedule pages look up the visits booked on each slot of the page
+    migration.add_index("care_visit", "care_visit_availability_slot_id_ind", "availability_slot_id")
+    migration.add_index("care_visit", "care_visit_patient_care_slot_id_ind", "patient_care_slot_id")
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.remove_index("care_visit", "care_visit_availability_slot_id_ind")
+    migration.remove_index("care_visit", "care_visit_patient_care_slot_id_ind")
+
+    migration.update_version_table(version=down_revision)
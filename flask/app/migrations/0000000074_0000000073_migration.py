@@ -0,0 +1,29 @@
+revision = "0000000074"
+down_revision = "0000000073"
+
+def upgrade(migration):
+    # The missed visit sweeper only ever scans active visits that are still scheduled,
+    # by the time they ended
+    migration.execute("""
+        CREATE INDEX care_visit_status_scheduled_end_ind
+        ON care_visit (status, scheduled_end_time)
+        WHERE active = true;
+    """)
+
+    # How far each incremental background job has processed; its row is locked while it runs
+    migration.create_table(
+        "job_watermark",
+        """
+            "job_name" VARCHAR(64) PRIMARY KEY,
+            "watermark" TIMESTAMP DEFAULT NULL,
+            "updated_on" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        """
+    )
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.drop_table(table_name="job_watermark")
+    migration.execute("DROP INDEX IF EXISTS care_visit_status_scheduled_end_ind;")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,21 @@
+revision = "0000000075"
+down_revision = "0000000074"
+
+def upgrade(migration):
+    # Weekly quota checks sum the durations of a patient's active slots of a week from the
+    # index alone; it replaces the (patient_id, start_date) index of the slot views
+    migration.execute("""
+        CREATE INDEX patient_care_slot_patient_week_ind
+        ON patient_care_slot (patient_id, start_date)
+        INCLUDE (start_time, end_time, entity_id)
+        WHERE active = true;
+    """)
+    migration.remove_index("patient_care_slot", "patient_care_slot_patient_start_date_ind")
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    migration.add_index("patient_care_slot", "patient_care_slot_patient_start_date_ind", "patient_id, start_date")
+    migration.execute("DROP INDEX IF EXISTS patient_care_slot_patient_week_ind;")
+
+    migration.update_version_table(version=down_revision)
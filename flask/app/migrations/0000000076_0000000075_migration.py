@@ -0,0 +1,49 @@
+revision = "0000000076"
+down_revision = "0000000075"
+
+def upgrade(migration):
+    # An occurrence of a slot series has at most one overriding slot row, so that stores of the
+    # same occurrence by concurrent requests cannot both be kept
+    for table_name, visit_column in [("patient_care_slot", "patient_care_slot_id"),
+                                     ("availability_slot", "availability_slot_id")]:
+        # Duplicates stored before: the row booked by an active visit is kept, or else the
+        # latest active row, and the others become plain inactive slots
+        migration.execute(f"""
+            WITH ranked AS (
+                SELECT s.entity_id, row_number() OVER (
+                    PARTITION BY s.series_id, s.recurrence_date, s.recurrence_start_time
+                    ORDER BY
+                        EXISTS (
+                            SELECT 1 FROM care_visit cv WHERE cv.{visit_column} = s.entity_id AND cv.active = true
+                        ) DESC,
+                        s.active DESC,
+                        s.changed_on DESC
+                ) AS position
+                FROM {table_name} s
+                WHERE s.recurrence_date IS NOT NULL
+            )
+            UPDATE {table_name} s
+            SET active = false, recurrence_date = NULL, recurrence_start_time = NULL
+            FROM ranked
+            WHERE s.entity_id = ranked.entity_id AND ranked.position > 1
+        """)
+
+        migration.execute(f"DROP INDEX IF EXISTS {table_name}_series_recurrence_ind")
+        migration.execute(f"""
+            CREATE UNIQUE INDEX {table_name}_series_recurrence_ind
+            ON {table_name} (series_id, recurrence_date, recurrence_start_time)
+            WHERE recurrence_date IS NOT NULL
+        """)
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    for table_name in ["patient_care_slot", "availability_slot"]:
+        migration.execute(f"DROP INDEX IF EXISTS {table_name}_series_recurrence_ind")
+        migration.execute(f"""
+            CREATE INDEX {table_name}_series_recurrence_ind
+            ON {table_name} (series_id, recurrence_date, recurrence_start_time)
+            WHERE recurrence_date IS NOT NULL
+        """)
+
+    migration.update_version_table(version=down_revision)
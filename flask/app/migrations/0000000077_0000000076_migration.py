@@ -0,0 +1,21 @@
+revision = "0000000077"
+down_revision = "0000000076"
+
+def upgrade(migration):
+    # One rematch sweep follows all the lists imported in a run; every imported check of
+    # the run points to the check that carries the sweep's progress
+    for table in ("oig_exclusions_check", "oig_exclusions_check_audit"):
+        migration.add_column(table, "match_sweep_check_id", "VARCHAR(32) DEFAULT NULL")
+
+    migration.execute("""
+        UPDATE oig_exclusions_check SET match_sweep_check_id = entity_id
+        WHERE match_sweep_status IS NOT NULL
+    """)
+
+    migration.update_version_table(version=revision)
+
+def downgrade(migration):
+    for table in ("oig_exclusions_check", "oig_exclusions_check_audit"):
+        migration.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS match_sweep_check_id;")
+
+    migration.update_version_table(version=down_revision)
@@ -32,8 +32,22 @@ class AvailabilitySlotResource(Resource):
         availability_slot_service = AvailabilitySlotService(config)
 
         week_start_date = request.args.get('week_start_date')
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
 
-        if week_start_date:
+        if start_date and end_date:
+            try:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            except ValueError:
+                return get_failure_response("Invalid date format. Use YYYY-MM-DD", status_code=400)
+            if not 0 <= (end_date - start_date).days < config.SLOT_VIEW_MAX_RANGE_DAYS:
+                return get_failure_response(
+                    f"end_date must be on or after start_date and within {config.SLOT_VIEW_MAX_RANGE_DAYS} days of it",
+                    status_code=400
+                )
+            availability_slots = availability_slot_service.get_availability_slots_in_range(employee_id, start_date, end_date)
+        elif week_start_date:
             try:
                 week_start_date = datetime.strptime(week_start_date, '%Y-%m-%d').date()
                 availability_slots = availability_slot_service.get_availability_slots_by_week(employee_id, week_start_date)
@@ -93,9 +107,42 @@ class MultipleAvailabilitySlotResource(Resource):
     @login_required()
     @organization_required(with_roles=[PersonOrganizationRoleEnum.ADMIN])
     def get(self, organization: Organization):
+        """
+        Availability slots of the organization's employees. With start_date and end_date, only
+        the slots starting in that window, a page of `limit` at a time (pass `next_cursor` back as
+        `cursor`), optionally with format=compact.
+        """
         availability_slot_service = AvailabilitySlotService(config)
-        availability_slots = availability_slot_service.get_availability_slots_for_organization(organization.entity_id)
-        return get_success_response(data=availability_slots)
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        if not start_date and not end_date:
+            availability_slots = availability_slot_service.get_availability_slots_for_organization(organization.entity_id)
+            return get_success_response(data=availability_slots)
+
+        # Windowed, keyset-paginated schedule of the organization's employees
+        try:
+            start_date = datetime.strptime(start_date or '', '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date or '', '%Y-%m-%d').date()
+        except ValueError:
+            return get_failure_response("start_date and end_date must both be given as YYYY-MM-DD", status_code=400)
+        if not 0 <= (end_date - start_date).days < config.SLOT_VIEW_MAX_RANGE_DAYS:
+            return get_failure_response(
+                f"end_date must be on or after start_date and within {config.SLOT_VIEW_MAX_RANGE_DAYS} days of it",
+                status_code=400
+            )
+        limit = request.args.get('limit', default=config.SCHEDULE_DEFAULT_PAGE_SIZE, type=int)
+        if not 0 < limit <= config.SCHEDULE_MAX_PAGE_SIZE:
+            return get_failure_response(f"limit must be between 1 and {config.SCHEDULE_MAX_PAGE_SIZE}", status_code=400)
+        compact = request.args.get('format') == 'compact'
+
+        try:
+            page = availability_slot_service.get_organization_schedule_page(
+                [organization.entity_id], start_date, end_date, limit,
+                cursor=request.args.get('cursor'), compact=compact
+            )
+        except InputValidationError as e:
+            return get_failure_response(str(e), status_code=400)
+        return get_success_response(**page)
 
 
 
@@ -20,7 +20,8 @@ from common.services import (
     PersonService,
     EmailService,
     EmployeeService,
-    PatientService
+    PatientService,
+    AutoSchedulerService
 )
 
 from common.models import Organization
@@ -29,7 +30,8 @@ from app.helpers.decorators import (login_required,
                                     organization_required,
                                     has_role
                                     )
-from common.helpers.exceptions import APIException
+from common.helpers.exceptions import APIException, InputValidationError
+from common.utils.slot import parse_date_field
 
 # Create the care visits blueprint
 care_visit_api = Namespace('care_visit', description="Care Visit-related APIs")
@@ -133,7 +135,7 @@ class EmployeeCareVisits(Resource):
             
 
             # Schedule multiple visits
-            scheduled_visits = care_visit_service.schedule_multiple_care_visits(
+            scheduled_visits, conflicts = care_visit_service.schedule_multiple_care_visits(
                 visits_data=visits_data,
                 scheduled_by_id=person.entity_id,
                 organization_id=organization.entity_id
@@ -144,10 +146,11 @@ class EmployeeCareVisits(Resource):
 
             return get_success_response(
                 care_visits=care_visits_data,
-                count=len(care_visits_data)
+                count=len(care_visits_data),
+                conflicts=conflicts
             )
 
-        except ValueError as e:
+        except (ValueError, InputValidationError) as e:
             return get_failure_response(str(e), status_code=400)
         except Exception as e:
             return get_failure_response(f"Error scheduling care visits: {str(e)}", status_code=500)
@@ -183,7 +186,7 @@ class PatientCareVisits(Resource):
             care_visit_service = CareVisitService(config)
 
             # Schedule multiple visits
-            scheduled_visits = care_visit_service.schedule_multiple_care_visits(
+            scheduled_visits, conflicts = care_visit_service.schedule_multiple_care_visits(
                 visits_data=visits_data,
                 scheduled_by_id=person.entity_id,
                 organization_id=organization.entity_id
@@ -194,10 +197,11 @@ class PatientCareVisits(Resource):
 
             return get_success_response(
                 care_visits=care_visits_data,
-                count=len(care_visits_data)
+                count=len(care_visits_data),
+                conflicts=conflicts
             )
 
-        except ValueError as e:
+        except (ValueError, InputValidationError) as e:
             return get_failure_response(str(e), status_code=400)
         except Exception as e:
             return get_failure_response(f"Error scheduling care visits: {str(e)}", status_code=500)
@@ -212,17 +216,13 @@ class CareVisit(Resource):
         care_visit_service = CareVisitService(config)
 
         # Get the care visit by ID
-        care_visit_repo = care_visit_service.care_visit_repo
-        care_visit = care_visit_repo.get_one({'entity_id': care_visit_id})
+        care_visit = care_visit_service.get_care_visit_by_id(care_visit_id)
 
         if not care_visit:
             return get_failure_response("Care visit not found", status_code=404)
 
-            # Set status to cancelled
-        care_visit.status = CareVisitStatusEnum.CANCELLED
-
-        # Save the cancelled care visit
-        care_visit_repo.delete(care_visit)
+        # Set status to cancelled and save the cancelled care visit
+        care_visit_service.cancel_care_visit(care_visit)
 
         return get_success_response(message="Care visit cancelled successfully")
 
@@ -379,7 +379,7 @@ class AssignEmployeeToCareSlot(Resource):
                 data=care_visit.as_dict()
             )
             
-        except ValueError as e:
+        except (ValueError, InputValidationError) as e:
             return get_failure_response(str(e), status_code=400)
         except Exception as e:
             return get_failure_response(f"Error assigning employee: {str(e)}", status_code=500)
@@ -422,12 +422,61 @@ class AssignEmployeeToRecurringPattern(Resource):
                 count=len(created_visits)
             )
             
-        except ValueError as e:
+        except (ValueError, InputValidationError) as e:
             return get_failure_response(str(e), status_code=400)
         except Exception as e:
             return get_failure_response(f"Error assigning employee to recurring pattern: {str(e)}", status_code=500)
 
 
+@care_visit_api.route('/auto-schedule')
+class AutoSchedule(Resource):
+
+    @login_required()
+    @organization_required(with_roles=[PersonOrganizationRoleEnum.ADMIN])
+    def get(self, person: Person, organization: Organization):
+        """Propose employees for the open patient care slots between start_date and end_date"""
+        try:
+            start_date = parse_date_field(request.args.get('start_date'), 'start_date')
+            end_date = parse_date_field(request.args.get('end_date'), 'end_date')
+            if not start_date or not end_date:
+                return get_failure_response("start_date and end_date are required", status_code=400)
+
+            proposal = AutoSchedulerService(config).propose_schedule(organization.entity_id, start_date, end_date)
+
+            return get_success_response(
+                visits=proposal['visits'],
+                unassigned=proposal['unassigned'],
+                count=len(proposal['visits'])
+            )
+
+        except InputValidationError as e:
+            return get_failure_response(str(e), status_code=400)
+
+    @login_required()
+    @organization_required(with_roles=[PersonOrganizationRoleEnum.ADMIN])
+    def post(self, person: Person, organization: Organization):
+        """Commit the proposed visits, or the ones the coordinator kept, in one bulk write"""
+        try:
+            request_data = request.get_json(force=True)
+            visits_data = _process_visit_payload(request_data.get('visits') if isinstance(request_data, dict) else request_data)
+
+            care_visits = AutoSchedulerService(config).commit_schedule(
+                visits_data=visits_data,
+                scheduled_by_id=person.entity_id,
+                organization_id=organization.entity_id
+            )
+
+            return get_success_response(
+                care_visits=[care_visit.as_dict() for care_visit in care_visits],
+                count=len(care_visits)
+            )
+
+        except (ValueError, InputValidationError) as e:
+            return get_failure_response(str(e), status_code=400)
+        except Exception as e:
+            return get_failure_response(f"Error committing schedule: {str(e)}", status_code=500)
+
+
 @care_visit_api.route('/employee/process_missed_visits')
 class ProcessMissedVisits(Resource):
 
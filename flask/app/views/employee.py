@@ -118,14 +118,27 @@ class EmployeeListMatches(Resource):
     @organization_required(with_roles=[PersonOrganizationRoleEnum.ADMIN])
     def get(self, person, organization):
         """
-        Get a list of employees who have matches in the employee_exclusion_match table.
+        Get a list of employees and physicians who have exclusion matches.
+        Supports optional `page` and `page_size` query parameters.
         """
+        page = request.args.get('page', type=int)
+        page_size = request.args.get('page_size', type=int)
+        if page_size is not None and not 0 < page_size <= config.MATCHES_MAX_PAGE_SIZE:
+            return get_failure_response(
+                f"page_size must be between 1 and {config.MATCHES_MAX_PAGE_SIZE}", status_code=400
+            )
+
         employee_service = EmployeeService(config)
-        matched_employees = employee_service.get_employees_with_matches(organization.entity_id)
+        matched_employees, total_count = employee_service.get_employees_with_matches(
+            organization.entity_id, page=page, page_size=page_size
+        )
 
         return get_success_response(
             message="Matched employees retrieved successfully",
-            data=matched_employees
+            data=matched_employees,
+            total_count=total_count,
+            page=page or 1,
+            page_size=page_size
         )
 
 @employee_api.route('/admin')
@@ -253,9 +266,8 @@ class EmployeeResource(Resource):
             person_id=person.entity_id,
             employee_type=parsed_body['employee_type']
         )
-        employee = employee_service.save_employee(employee)
-        
-        employee_service.trigger_match_for_employee(employee.entity_id)
+        employee = employee_service.save_employee(employee, trigger_match=True)
+
         return get_success_response(
             message="Employee created successfully",
             data=employee.as_dict()
@@ -298,6 +310,8 @@ class EmployeeResource(Resource):
         employee = employee_service.get_employee_by_id(entity_id, organization.entity_id)
         if not employee:
             return get_failure_response("Employee not found", status_code=404)
+
+        previous_match_fields = employee_service.get_match_fields(employee)
         
         employee.first_name = parsed_body['first_name']
         employee.last_name = parsed_body['last_name']
@@ -326,9 +340,9 @@ class EmployeeResource(Resource):
             person = person_service.save_person(person)
             employee.person_id = person.entity_id
 
-        employee = employee_service.save_employee(employee)
-        
-        employee_service.trigger_match_for_employee(employee.entity_id)
+        # Rematch only if the name or date of birth changed
+        employee = employee_service.save_employee(employee, previous_match_fields=previous_match_fields)
+
         return get_success_response(
             message="Employee updated successfully",
             data=employee.as_dict()
@@ -468,6 +482,7 @@ class EmployeeResource(Resource):
         person_id = parsed_body.get("person_id",None)
         
         validate_required_fields(parsed_body)
+        existing_employee = employee_service.get_employee_by_id(entity_id, organization.entity_id) if entity_id else None
         employees = employee_service.get_employees_by_organization_id(organization.entity_id)
         list_of_employee_ids = [emp.employee_id for emp in employees if getattr(emp, 'employee_id', None) is not None]
         
@@ -499,7 +514,13 @@ class EmployeeResource(Resource):
             person_id=person_id,
             employee_type=parsed_body['employee_type']
         )
-        employee = employee_service.save_employee(employee)
+        if existing_employee:
+            # Rematch only if the name or date of birth changed
+            employee = employee_service.save_employee(
+                employee, previous_match_fields=employee_service.get_match_fields(existing_employee)
+            )
+        else:
+            employee = employee_service.save_employee(employee, trigger_match=True)
         
         return get_success_response(
             message="Employee created successfully",
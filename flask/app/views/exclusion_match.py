@@ -4,13 +4,11 @@ from flask import request
 from flask_restx import Namespace, Resource
 
 from common.app_config import config
-from common.services.employee import EmployeeService
-from common.services.current_employees_file import CurrentEmployeesFileService
 from common.services.employee_exclusion_match import EmployeeExclusionMatchService
+from common.services.exclusion_index import ExclusionLookupService
 from common.services.oig_employees_exclusion import OigEmployeesExclusionService
 from common.services.s3_client import S3ClientService
 from common.models.person_organization_role import PersonOrganizationRoleEnum
-from common.models.current_employees_file import CurrentEmployeesFileStatusEnum
 from app.helpers.response import get_success_response, get_failure_response, parse_request_body
 from app.helpers.decorators import login_required, organization_required
 
@@ -27,22 +25,43 @@ class EmployeeExclusionMatchStatus(Resource):
         Upload a CSV or XLSX file with employee data.
         The file will be saved to S3 with current datetime and copied as latest.csv.
         """
-        employee_service = EmployeeService(config)
-        current_employee_count = employee_service.get_employees_count(organization_id=organization.entity_id)
-
         employee_exclusion_match_service = EmployeeExclusionMatchService(config)
-        matches_count = employee_exclusion_match_service.get_all_matches_count(organization.entity_id)
+        counters = employee_exclusion_match_service.get_dashboard_counters(organization.entity_id)
 
-        current_employees_file_service = CurrentEmployeesFileService(config)
-        files_count = current_employees_file_service.get_files_count(
-            organization.entity_id, status=CurrentEmployeesFileStatusEnum.DONE
+        return get_success_response(
+            current_employee_count=counters.current_employee_count,
+            matches_count=counters.matches_count,
+            files_count=counters.files_count,
+            message="Exclusion match data retrieved successfully"
         )
 
+
+@exclusion_match_api.route('/lookup')
+class ExclusionLookup(Resource):
+
+    @login_required()
+    @organization_required(with_roles=[PersonOrganizationRoleEnum.ADMIN])
+    def post(self, person, organization):
+        """
+        Check one or more candidates against the exclusion list without creating records.
+
+        The body is either a single candidate or {"candidates": [...]}, where a candidate has
+        first_name, last_name and optionally date_of_birth and npi.
+        """
+        body = request.get_json(force=True, silent=True)
+        if not isinstance(body, dict):
+            return get_failure_response("Request body must be a JSON object.", status_code=400)
+
+        candidates = body['candidates'] if 'candidates' in body else [body]
+        if not isinstance(candidates, list) or not candidates:
+            return get_failure_response("'candidates' must be a non-empty list.", status_code=400)
+
+        exclusion_lookup_service = ExclusionLookupService(config)
+        results = exclusion_lookup_service.lookup(candidates)
+
         return get_success_response(
-            current_employee_count=current_employee_count,
-            matches_count=matches_count,
-            files_count=files_count,
-            message="Exclusion match data retrieved successfully"
+            data=results,
+            message="Exclusion lookup completed successfully"
         )
 
 
@@ -53,14 +72,47 @@ class EmployeeExclusionMatch(Resource):
     @organization_required(with_roles=[PersonOrganizationRoleEnum.ADMIN])
     def get(self, person, organization):
         """
-        Get all exclusion match objects for the organization.
+        Get the exclusion match objects for the organization, ordered by name.
+
+        Optional query parameters:
+            status, match_type, verification_result, entity_type: exact-value filters
+            name: case-insensitive first or last name prefix
+            limit: page size; all matching rows are returned if omitted
+            cursor: `next_cursor` of the previous page
+            count_only: if true, only `total_count` is returned
         """
-        
+        filters = {
+            key: request.args.get(key) for key in ('status', 'match_type', 'verification_result', 'entity_type')
+            if request.args.get(key)
+        }
+        name_prefix = request.args.get('name')
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        count_only = request.args.get('count_only', '').lower() in ('1', 'true')
+
+        if limit is not None and not 0 < limit <= config.MATCHES_MAX_PAGE_SIZE:
+            return get_failure_response(
+                f"limit must be between 1 and {config.MATCHES_MAX_PAGE_SIZE}", status_code=400
+            )
+
         employee_exclusion_match_service = EmployeeExclusionMatchService(config)
-        matches = employee_exclusion_match_service.get_all_matches(organization.entity_id)
+
+        if count_only:
+            total_count = employee_exclusion_match_service.count_matches(
+                organization.entity_id, filters=filters, name_prefix=name_prefix
+            )
+            return get_success_response(
+                total_count=total_count,
+                message="Exclusion match count retrieved successfully"
+            )
+
+        matches, next_cursor = employee_exclusion_match_service.get_matches_page(
+            organization.entity_id, filters=filters, name_prefix=name_prefix, limit=limit, cursor=cursor
+        )
 
         return get_success_response(
             data=matches,
+            next_cursor=next_cursor,
             message="Exclusion match data retrieved successfully"
         )
 
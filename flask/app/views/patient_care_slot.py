@@ -19,9 +19,42 @@ class MultipleAvailabilitySlotResource(Resource):
     @login_required()
     @organization_required(with_roles=[PersonOrganizationRoleEnum.ADMIN])
     def get(self, organization: Organization):
+        """
+        Care slots of the organization's patients. With start_date and end_date, only the slots
+        starting in that window, a page of `limit` at a time (pass `next_cursor` back as `cursor`),
+        optionally with format=compact.
+        """
         patient_care_slot_service = PatientCareSlotService(config)
-        patient_care_slots = patient_care_slot_service.get_patient_care_slots_for_organization(organization.entity_id)
-        return get_success_response(data=patient_care_slots)
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        if not start_date and not end_date:
+            patient_care_slots = patient_care_slot_service.get_patient_care_slots_for_organization(organization.entity_id)
+            return get_success_response(data=patient_care_slots)
+
+        # Windowed, keyset-paginated schedule of the organization's patients
+        try:
+            start_date = datetime.strptime(start_date or '', '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date or '', '%Y-%m-%d').date()
+        except ValueError:
+            return get_failure_response("start_date and end_date must both be given as YYYY-MM-DD", status_code=400)
+        if not 0 <= (end_date - start_date).days < config.SLOT_VIEW_MAX_RANGE_DAYS:
+            return get_failure_response(
+                f"end_date must be on or after start_date and within {config.SLOT_VIEW_MAX_RANGE_DAYS} days of it",
+                status_code=400
+            )
+        limit = request.args.get('limit', default=config.SCHEDULE_DEFAULT_PAGE_SIZE, type=int)
+        if not 0 < limit <= config.SCHEDULE_MAX_PAGE_SIZE:
+            return get_failure_response(f"limit must be between 1 and {config.SCHEDULE_MAX_PAGE_SIZE}", status_code=400)
+        compact = request.args.get('format') == 'compact'
+
+        try:
+            page = patient_care_slot_service.get_organization_schedule_page(
+                organization.entity_id, start_date, end_date, limit,
+                cursor=request.args.get('cursor'), compact=compact
+            )
+        except InputValidationError as e:
+            return get_failure_response(str(e), status_code=400)
+        return get_success_response(**page)
 
 
 @patient_care_slot_api.route('/<string:patient_id>')
@@ -40,9 +73,23 @@ class PatientCareSlotResource(Resource):
             return get_failure_response("Patient not found in this organization", status_code=404)
         
         week_start_date = request.args.get('week_start_date')
-         
-        
-        if week_start_date:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+
+        if start_date and end_date:
+            try:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            except ValueError:
+                return get_failure_response("Invalid date format. Use YYYY-MM-DD", status_code=400)
+            if not 0 <= (end_date - start_date).days < config.SLOT_VIEW_MAX_RANGE_DAYS:
+                return get_failure_response(
+                    f"end_date must be on or after start_date and within {config.SLOT_VIEW_MAX_RANGE_DAYS} days of it",
+                    status_code=400
+                )
+            patient_care_slots = patient_care_slot_service.get_patient_care_slots_in_range(patient_id, start_date, end_date)
+
+        elif week_start_date:
             
             week_start_date = datetime.strptime(week_start_date, '%Y-%m-%d').date()
             patient_care_slots = patient_care_slot_service.get_patient_care_slots_by_week(patient_id, week_start_date)
@@ -144,32 +191,21 @@ class CreatePatientSlots(Resource):
   
             care_visits = [] 
             if assigned_employee_id and created_slots:
-                from common.services import CareVisitService,AvailabilitySlotService
-                from datetime import datetime, timedelta
-                
+                from common.services import CareVisitService
                 
                 care_visit_service = CareVisitService(config)
-                availability_slot_service = AvailabilitySlotService(config)
-                
-                
-                created_availability_slots = availability_slot_service.expand_and_save_slots(request_data, assigned_employee_id)
-                
-                for slot, avail_slot in zip(created_slots, created_availability_slots):
-                    visit_data = {
-                        'patient_id': patient_id,
-                        'employee_id': assigned_employee_id,
-                        'visit_date': slot.start_date.strftime('%Y-%m-%d'),
-                        'scheduled_start_time': slot.start_time.strftime('%H:%M'),
-                        'scheduled_end_time': slot.end_time.strftime('%H:%M'),
-                        'patient_care_slot_id': slot.entity_id,
-                        'availability_slot_id': avail_slot.entity_id,
-                        'scheduled_by_id': person.entity_id,
-                        'organization_id': organization.entity_id
-                    }
-                
-                    care_visit = care_visit_service.create_care_visit_from_assignment(visit_data)
-             
-                    care_visits.append(care_visit.as_dict())
+
+                # Booking every occurrence stores the patient's slots, a matching availability
+                # slot for the employee and a care visit for each of them
+                created_visits = care_visit_service.assign_employee_to_recurring_pattern({
+                    'patient_id': patient_id,
+                    'employee_id': assigned_employee_id,
+                    'series_id': created_slots[0].series_id,
+                    'patient_slot_id': created_slots[0].entity_id,
+                    'scheduled_by_id': person.entity_id,
+                    'organization_id': organization.entity_id
+                })
+                care_visits = [care_visit.as_dict() for care_visit in created_visits]
              
             message = f'Successfully created {len(created_slots)} care slots'
 
@@ -192,4 +228,37 @@ class CreatePatientSlots(Resource):
             
             
             
-            
\ No newline at end of file
+            
+
+@patient_care_slot_api.route('/quota/<string:patient_id>')
+class PatientWeeklyQuotaResource(Resource):
+    @login_required()
+    @organization_required(with_roles=[PersonOrganizationRoleEnum.ADMIN])
+    def get(self, person, organization, patient_id: str):
+        """
+        Scheduled and remaining hours of the patient's weekly quota for the week of
+        week_start_date, or for each week of start_date through end_date
+        """
+        patient_service = PatientService(config)
+        patient = patient_service.get_patient_by_id(patient_id, organization.entity_id)
+        if not patient:
+            return get_failure_response("Patient not found in this organization", status_code=404)
+
+        try:
+            start_date = request.args.get('start_date') or request.args.get('week_start_date')
+            end_date = request.args.get('end_date') or start_date
+            start_date = datetime.strptime(start_date or '', '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date or '', '%Y-%m-%d').date()
+        except ValueError:
+            return get_failure_response(
+                "week_start_date, or start_date and end_date, must be given as YYYY-MM-DD", status_code=400
+            )
+        if not 0 <= (end_date - start_date).days < config.SLOT_VIEW_MAX_RANGE_DAYS:
+            return get_failure_response(
+                f"end_date must be on or after start_date and within {config.SLOT_VIEW_MAX_RANGE_DAYS} days of it",
+                status_code=400
+            )
+
+        patient_care_slot_service = PatientCareSlotService(config)
+        weeks = patient_care_slot_service.get_weekly_quota_usage(patient_id, patient.weekly_quota, start_date, end_date)
+        return get_success_response(data=weeks)
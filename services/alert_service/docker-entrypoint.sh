@@ -1,4 +1,4 @@
 #!/bin/bash
 
 python3 src/version.py
-python3 src/process.py
+cd src && python3 -m common.tasks.consumer
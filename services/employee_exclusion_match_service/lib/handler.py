@@ -1,9 +1,12 @@
+from collections import defaultdict
+
 from common.app_logger import logger
 from common.app_config import config
 from common.repositories.factory import RepositoryFactory, RepoType
 from common.services.s3_client import S3ClientService
 from common.models.current_employees_file import CurrentEmployeesFileStatusEnum
 from common.services.current_employees_file import CurrentEmployeesFileService
+from common.services.oig_exclusions_check import OigExclusionsCheckService
 from common.tasks.send_message import send_message
 
 def message_handler(message):
@@ -33,12 +36,20 @@ def message_handler(message):
         repository_factory = RepositoryFactory(config)
         employee_exclusion_match_repo = repository_factory.get_repository(repo_type=RepoType.EMPLOYEE_EXCLUSION_MATCH)
 
-        # Find exclusion matches
-        matches = employee_exclusion_match_repo.find_exclusion_matches(organization_id=organization_id)
-        logger.info("Found %d exclusion matches", len(matches))
+        if 'employee_ids' in message or 'physician_ids' in message:
+            # Only the entities the import added or whose name or date of birth changed
+            matches = rematch_entities(
+                employee_exclusion_match_repo,
+                message.get('employee_ids') or [],
+                message.get('physician_ids') or []
+            )
+        else:
+            # Find exclusion matches
+            matches = employee_exclusion_match_repo.find_exclusion_matches(organization_id=organization_id)
+            logger.info("Found %d exclusion matches", len(matches))
 
-        # Update the matches in the database
-        matches = employee_exclusion_match_repo.upsert_matches(matches)
+            # Update the matches in the database
+            matches = employee_exclusion_match_repo.upsert_matches(matches)
         logger.info("Successfully updated employee exclusion matches")
 
         # Send matches to OIG verifier service if matches found
@@ -50,39 +61,127 @@ def message_handler(message):
             employees_file_service.update_status(employees_file, CurrentEmployeesFileStatusEnum.DONE)
             logger.info("Updated employees file status to done: %s", employees_file.entity_id)
 
-    elif message['source'] == 'employee_creation':
-        logger.info("Received employee creation message: %s", message)
-        employee_id = message.get('employee_id')
+    elif message['source'] in ('employee_creation', 'entity_update'):
+        logger.info("Received entity match message: %s", message)
+        entity_match_batch_handler([message])
 
-        logger.info("Running employee exclusion match service for employee: %s", employee_id)
-        
-        # Get the repository
-        repository_factory = RepositoryFactory(config)
-        employee_exclusion_match_repo = repository_factory.get_repository(repo_type=RepoType.EMPLOYEE_EXCLUSION_MATCH)
+    elif message['source'] == 'oig_update_handler':
+        logger.info("Received OIG update sweep message: %s", message)
+        oig_sweep_handler(message)
+
+
+def oig_sweep_handler(message):
+    """
+    Rematch one organization after an OIG LEIE import, as one work item of the sweep.
+    Only matches that have not been verified yet are sent to the verifier, in small
+    batches so that a large roster does not flood it.
+    """
+    organization_id = message.get('organization_id')
+    check_id = message.get('check_id')
+    if not organization_id:
+        logger.warning("OIG update sweep message has no organization, skipping: %s", message)
+        return
+
+    oig_checks_service = OigExclusionsCheckService(config)
+    repository_factory = RepositoryFactory(config)
+    employee_exclusion_match_repo = repository_factory.get_repository(repo_type=RepoType.EMPLOYEE_EXCLUSION_MATCH)
 
-        # Find exclusion matches
-        matches = employee_exclusion_match_repo.find_exclusion_matches_for_employee(employee_id=employee_id)
-        logger.info("Found %d exclusion matches for employee: %s", len(matches), employee_id)
+    try:
+        matches = employee_exclusion_match_repo.find_exclusion_matches(organization_id=organization_id)
+        logger.info("Found %d exclusion matches for organization: %s", len(matches), organization_id)
 
-        # Update the matches in the database
         matches = employee_exclusion_match_repo.upsert_matches(matches)
-        logger.info("Successfully updated employee exclusion matches for employee: %s", employee_id)
 
-        # Send matches to OIG verifier service if matches found
-        if matches:
-            trigger_oig_verifier(matches)
+        unverified_matches = [match for match in matches if not match.verification_result]
+        trigger_oig_verifier(unverified_matches, batch_size=config.OIG_SWEEP_VERIFY_BATCH_SIZE)
+    except Exception:
+        if check_id:
+            oig_checks_service.complete_match_sweep_item(check_id, organization_id, failed=True)
+        raise
+
+    if check_id:
+        oig_checks_service.complete_match_sweep_item(check_id, organization_id, match_count=len(matches))
+
 
+def entity_match_batch_handler(messages):
+    """
+    Rematch a batch of created or edited employees and physicians against the OIG
+    exclusion list with set-based queries, retire their matches that no longer apply,
+    then send one verify_matches message per organization.
+    """
+    employee_ids = []
+    physician_ids = []
+    for message in messages:
+        if message.get('source') == 'employee_creation' and message.get('employee_id'):
+            employee_ids.append(message['employee_id'])
+        elif message.get('source') == 'entity_update' and message.get('entity_id'):
+            if message.get('entity_type') == 'physician':
+                physician_ids.append(message['entity_id'])
+            else:
+                employee_ids.append(message['entity_id'])
+
+    employee_ids = list(dict.fromkeys(employee_ids))
+    physician_ids = list(dict.fromkeys(physician_ids))
+    if not employee_ids and not physician_ids:
+        return
+
+    logger.info("Running employee exclusion match service for %d employees and %d physicians",
+                len(employee_ids), len(physician_ids))
+
+    # Get the repository
+    repository_factory = RepositoryFactory(config)
+    employee_exclusion_match_repo = repository_factory.get_repository(repo_type=RepoType.EMPLOYEE_EXCLUSION_MATCH)
+
+    matches = rematch_entities(employee_exclusion_match_repo, employee_ids, physician_ids)
+
+    # Send matches to OIG verifier service, one message per organization
+    matches_by_organization = defaultdict(list)
+    for match in matches:
+        matches_by_organization[match.organization_id].append(match)
+
+    for organization_matches in matches_by_organization.values():
+        trigger_oig_verifier(organization_matches)
 
-def trigger_oig_verifier(matches):
+
+def rematch_entities(employee_exclusion_match_repo, employee_ids, physician_ids):
+    """
+    Match the given employees and physicians, upsert their current matches and retire
+    the ones that no longer apply (e.g. after a name or date of birth change).
+
+    Returns:
+        List of the entities' current EmployeeExclusionMatch records
+    """
+    matches = employee_exclusion_match_repo.find_exclusion_matches_for_employees(employee_ids=employee_ids)
+    matches += employee_exclusion_match_repo.find_exclusion_matches_for_physicians(physician_ids=physician_ids)
+    logger.info("Found %d exclusion matches for %d employees and %d physicians",
+                len(matches), len(employee_ids), len(physician_ids))
+
+    # Update the matches in the database
+    matches = employee_exclusion_match_repo.upsert_matches(matches)
+
+    employee_exclusion_match_repo.retire_stale_matches('employee', employee_ids, matches)
+    employee_exclusion_match_repo.retire_stale_matches('physician', physician_ids, matches)
+    return matches
+
+
+def trigger_oig_verifier(matches, batch_size=None):
     logger.info("------------Triggering OIG verifier service for matches: %s", matches)
     """
     Send matches to the OIG verifier service for processing
     
     Args:
         matches: List of EmployeeExclusionMatch objects
+        batch_size: Optional maximum number of matches per verify_matches message
     """
+    # The OIG website can only verify LEIE matches; SAM and state list matches are reviewed manually
+    matches = [match for match in matches if match.source == 'leie']
     if not matches:
         return
+
+    if batch_size and len(matches) > batch_size:
+        for start in range(0, len(matches), batch_size):
+            trigger_oig_verifier(matches[start:start + batch_size])
+        return
     
     logger.info("Sending %d matches to OIG verifier service", len(matches))
     
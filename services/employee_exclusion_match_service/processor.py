@@ -1,7 +1,7 @@
 from common.app_logger import create_logger, set_rollbar_exception_catch
 from common.app_config import config
 from rococo.messaging import BaseServiceProcessor
-from lib.handler import message_handler
+from lib.handler import message_handler, entity_match_batch_handler
 
 # This is an example implementation of a BaseServiceProcessor class.
 # This should be done in the child image
@@ -16,6 +16,32 @@ class EmployeeExclusionMatchProcessor(BaseServiceProcessor):
         set_rollbar_exception_catch()
         # Initialize any other resources needed for the processor
 
+    @staticmethod
+    def get_organization_id(message):
+        """Organization used for per-tenant concurrency limits in the consumer runtime"""
+        if message.get('organization_id'):
+            return message['organization_id']
+        if message.get('key'):
+            # employees-list/<organization_id>/<file_id>
+            parts = message['key'].rsplit('/', 2)
+            return parts[1] if len(parts) == 3 else None
+        return None
+
+    @staticmethod
+    def get_batch_key(message):
+        """Single-entity match requests are micro-batched by the consumer runtime"""
+        if message.get('source') in ('employee_creation', 'entity_update'):
+            return 'entity_match'
+        return None
+
+    def process_batch(self, messages):
+        self.logger.info("Received batch of %d entity match messages", len(messages))
+        try:
+            entity_match_batch_handler(messages)
+        except Exception as e:
+            self.logger.error(f"Error running employee exclusion match service: {str(e)}")
+            self.logger.exception(e)
+
     def process(self, message):
         self.logger.info("Received message: %s to the employee exclusion match service!", message)
         # Do something with the message
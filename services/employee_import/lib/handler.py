@@ -1,5 +1,6 @@
 from common.app_logger import create_logger
 from .employee_handler import EmployeeHandler
+from common.repositories.factory import RepositoryFactory, RepoType
 from common.tasks.send_message import send_message
 from common.app_config import config
 
@@ -12,6 +13,7 @@ class ListImportHandler:
     def __init__(self, config):
         self.config = config
         self.employee_handler = EmployeeHandler(config)
+        self.employee_exclusion_match_repo = RepositoryFactory(config).get_repository(RepoType.EMPLOYEE_EXCLUSION_MATCH, message_queue_name="")
         self.employees_prefix = f"{config.AWS_S3_KEY_PREFIX}employees-list/"
         self.physicians_prefix = f"{config.AWS_S3_KEY_PREFIX}physicians-list/"
         
@@ -27,24 +29,37 @@ class ListImportHandler:
             bool: True if successful, False otherwise
         """
         if key.startswith(self.employees_prefix):
-            logger.info(f"Processing employee list file: {bucket}/{key}")
-            import_success = self.employee_handler.process_employee_list(key, "employee")
-            if import_success:
-                self.trigger_match_service(key)
+            file_category = "employee"
         elif key.startswith(self.physicians_prefix):
-            logger.info(f"Processing physician list file: {bucket}/{key}")
-            import_success = self.employee_handler.process_employee_list(key, "physician")
-            if import_success:
-                self.trigger_match_service(key)
+            file_category = "physician"
         else:
             logger.info(f"Unknown prefix for list file: {key}")
+            return
 
+        logger.info(f"Processing {file_category} list file: {bucket}/{key}")
+        _, organization_id, _ = key.rsplit('/', 2)
 
-    def trigger_match_service(self, s3_key):
+        # Snapshot the matched fields so only added or edited entities are rematched
+        match_fields_before = self.employee_exclusion_match_repo.get_match_fingerprints(organization_id)
+        import_success = self.employee_handler.process_employee_list(key, file_category)
+        if import_success:
+            match_fields_after = self.employee_exclusion_match_repo.get_match_fingerprints(organization_id)
+            changed_entities = [
+                entity for entity, fields in match_fields_after.items()
+                if match_fields_before.get(entity) != fields
+            ]
+            self.trigger_match_service(key, changed_entities)
+
+
+    def trigger_match_service(self, s3_key, changed_entities):
         """
-        Trigger the matching process for employees and caregivers
+        Trigger the matching process for the employees and physicians added or edited by an import
+
+        Args:
+            s3_key (str): S3 object key of the imported file
+            changed_entities (list): (entity_type, entity_id) pairs whose name or date of birth changed
         """
-        logger.info("Triggering matching process for employees and caregivers")
+        logger.info("Triggering matching process for %d changed employees and physicians", len(changed_entities))
         logger.info("Sending message to queue: %s",
             self.config.PREFIXED_EMPLOYEE_EXCLUSION_MATCH_PROCESSOR_QUEUE_NAME
         )
@@ -53,7 +68,9 @@ class ListImportHandler:
             data={
                 'action': 'match_exclusions',
                 'source': 'csv_import_handler',
-                'key': s3_key
+                'key': s3_key,
+                'employee_ids': [entity_id for entity_type, entity_id in changed_entities if entity_type == 'employee'],
+                'physician_ids': [entity_id for entity_type, entity_id in changed_entities if entity_type == 'physician']
             }
         )
         logger.info("Matching process triggered in exclusion match service")
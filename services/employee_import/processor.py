@@ -2,6 +2,7 @@ import json
 from rococo.messaging import BaseServiceProcessor
 from common.app_config import config
 from common.app_logger import create_logger, set_rollbar_exception_catch
+from common.services.s3_event_ledger import S3EventLedgerService
 from lib.handler import ListImportHandler
 
 class EmployeeImportProcessor(BaseServiceProcessor):
@@ -18,12 +19,26 @@ class EmployeeImportProcessor(BaseServiceProcessor):
         setup_employee_import_queue()
         
         self.import_handler = ListImportHandler(config)
+        self.event_ledger = S3EventLedgerService(config, processor='employee_import')
         
         self.logger.info("Employee and physician import processor initialized")
 
         self.employees_prefix = f"{config.AWS_S3_KEY_PREFIX}employees-list/"
         self.physicians_prefix = f"{config.AWS_S3_KEY_PREFIX}physicians-list/"
         
+    @staticmethod
+    def get_organization_id(message):
+        """Organization used for per-tenant concurrency limits in the consumer runtime"""
+        if not isinstance(message, dict):
+            return None
+        for record in message.get('Records', []):
+            key = record.get('s3', {}).get('object', {}).get('key')
+            if key:
+                # <prefix>employees-list/<organization_id>/<file_id>
+                parts = key.rsplit('/', 2)
+                return parts[1] if len(parts) == 3 else None
+        return None
+
     def process(self, message):
         """Main processor method that handles incoming messages"""
         try:
@@ -57,10 +72,19 @@ class EmployeeImportProcessor(BaseServiceProcessor):
                     self.logger.info(f"Skipping file not under recognized prefix: {key}")
                     continue
                 
+                # Skip redeliveries of an event that was already imported
+                event = self.event_ledger.claim_record(record)
+                if event is None:
+                    continue
+
                 self.logger.info(f"Processing CSV from S3: {bucket_name}/{key}")
                 
                 # Process the CSV or XLSX file
-                self.import_handler.process_list_file(bucket_name, key)  
+                try:
+                    self.import_handler.process_list_file(bucket_name, key)
+                except Exception:
+                    self.event_ledger.release(event)
+                    raise
         except Exception as e:
             self.logger.error(f"Error processing employee import message: {str(e)}")
             self.logger.exception(e)
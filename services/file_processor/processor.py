@@ -6,6 +6,7 @@ from rococo.messaging import BaseServiceProcessor
 
 from common.app_logger import create_logger, set_rollbar_exception_catch
 from common.app_config import config
+from common.services.s3_event_ledger import S3EventLedgerService
 
 from lib.file_handler import handle_incoming_file
 from lib.response_handler import process_textract_message
@@ -31,6 +32,8 @@ class FileProcessor(BaseServiceProcessor):  # pylint: disable=R0903
             s3_prefix_filter=os.path.join(config.AWS_S3_KEY_PREFIX, 'incoming/')
         )
 
+        self.event_ledger = S3EventLedgerService(config, processor='file_processor')
+
     def process(self, message):
         """Main processor loop"""
         try:
@@ -46,7 +49,17 @@ class FileProcessor(BaseServiceProcessor):  # pylint: disable=R0903
                     if record["eventName"].startswith("ObjectCreated:"):
                         key = record['s3']['object']['key']
                         self.logger.info("Received S3 event for key: %s", key)
-                        handle_incoming_file({"s3_key": key})
+
+                        # Skip redeliveries so the same upload does not start a second Textract job
+                        event = self.event_ledger.claim_record(record)
+                        if event is None:
+                            continue
+
+                        try:
+                            handle_incoming_file({"s3_key": key})
+                        except Exception:
+                            self.event_ledger.release(event)
+                            raise
             elif "Message" in message:
                 # Received when Textract sends a response
                 self.logger.info("Received textract response: ")
@@ -0,0 +1,12 @@
+from common.app_logger import logger
+from common.app_config import config
+from common.services.care_visit import CareVisitService
+
+
+def task_handler():
+    """
+    Mark the scheduled care visits that ended since the last run as missed
+    """
+    counts = CareVisitService(config).sweep_missed_visits()
+    if counts:
+        logger.info("Marked %d visits as missed across %d organizations", sum(counts.values()), len(counts))
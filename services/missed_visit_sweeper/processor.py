@@ -0,0 +1,17 @@
+from common.app_logger import create_logger, set_rollbar_exception_catch
+from lib.handler import task_handler
+
+class MissedVisitSweeperProcessor:
+    """
+    Service processor that marks overdue scheduled care visits as missed
+    """
+    def __init__(self):
+        set_rollbar_exception_catch()
+        self.logger = create_logger()
+
+    def process(self):
+        try:
+            task_handler()
+        except Exception as e:
+            self.logger.error(f"Error in missed visit sweeper processor: {str(e)}")
+            self.logger.exception(e)
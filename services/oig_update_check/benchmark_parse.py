@@ -0,0 +1,74 @@
+"""
+Compare the row-at-a-time and the columnar LEIE parse paths.
+
+Run from this directory, with the same environment as the service:
+
+    python3 benchmark_parse.py [path/to/UPDATED.csv] [--rows 80000]
+
+Without a file, a synthetic LEIE-shaped CSV with --rows rows is generated.
+"""
+import io
+import csv
+import sys
+import time
+import random
+import argparse
+
+from lib.sources import LeieSource
+from lib.columnar import iter_copy_batches, row_count
+
+
+def generate_leie_csv(rows: int) -> bytes:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(list(LeieSource.COLUMNS))
+    for number in range(rows):
+        writer.writerow([
+            f"LAST{number % 5000}", f"FIRST{number % 3000}", random.choice(['', 'A', 'B']), '',
+            'NURSING PROFESSION', 'NURSE/NURSES AIDE', '', random.choice(['0000000000', f"{1000000000 + number}"]),
+            f"19{random.randint(40, 99)}{random.randint(1, 12):02d}{random.randint(1, 28):02d}",
+            f"{number} MAIN ST", 'SPRINGFIELD', 'IL', '62701', '1128a1',
+            f"20{random.randint(0, 24):02d}{random.randint(1, 12):02d}{random.randint(1, 28):02d}",
+            '00000000', '00000000', '',
+        ])
+    return output.getvalue().encode()
+
+
+def measure(label: str, function, rows: int, repeat: int):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best:8.3f}s  {rows / best:>12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', nargs='?', help="LEIE CSV file; a synthetic one is generated if omitted")
+    parser.add_argument('--rows', type=int, default=80000, help="Rows of the synthetic file")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per path; the best one is reported")
+    args = parser.parse_args()
+
+    if args.path:
+        with open(args.path, 'rb') as leie_file:
+            content = leie_file.read()
+    else:
+        content = generate_leie_csv(args.rows)
+
+    source = LeieSource(url='', webpage_url='')
+    rows = row_count(source.parse_columns(content))
+    print(f"{rows:,} rows, {len(content) / 1_000_000:.1f} MB")
+
+    measure("row path (DictReader + dataclass)", lambda: source.parse(content), rows, args.repeat)
+    measure("columnar path", lambda: source.parse_columns(content), rows, args.repeat)
+    measure(
+        "columnar path + COPY batches",
+        lambda: [batch.getvalue() for batch in iter_copy_batches(source.parse_columns(content))],
+        rows, args.repeat
+    )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
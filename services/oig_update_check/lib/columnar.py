@@ -0,0 +1,87 @@
+"""
+Column-at-a-time parsing of exclusion list files into COPY-ready batches.
+
+Instead of a dict and a dataclass per row, the CSV is read as tuples, transposed into
+one tuple per column, and each column is trimmed, nulled and (for dates) parsed in a
+single pass. Repeated values such as dates are parsed once per distinct value.
+"""
+import io
+import csv
+from datetime import date, datetime
+from typing import Dict, List, Iterator, Optional, Sequence, Tuple
+
+# Escapes of the PostgreSQL COPY text format
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+COPY_NULL = '\\N'
+
+
+def read_columns(content: bytes, delimiter: str = ',') -> Tuple[List[str], List[Tuple[str, ...]]]:
+    """Read a delimited file into its header and one tuple of raw values per column"""
+    text = content.decode('utf-8-sig', errors='replace')
+    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+    header = [name.strip() for name in next(reader, [])]
+    rows = [row for row in reader if row]
+    if not rows:
+        return header, [() for _ in header]
+
+    # Pad short rows so that every column has a value for every row
+    width = len(header)
+    rows = [row if len(row) == width else (row + [''] * width)[:width] for row in rows]
+    return header, list(zip(*rows))
+
+
+def clean_column(values: Sequence[str]) -> List[Optional[str]]:
+    """Trim every value, turning empty ones into None"""
+    return [value.strip() or None for value in values]
+
+
+def _parse_date_value(value: str) -> Optional[date]:
+    value = value.strip()
+    if not value:
+        return None
+    if len(value) == 8 and value.isdigit():
+        # LEIE dates are YYYYMMDD, with 00000000 for "none"
+        try:
+            return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+        except ValueError:
+            return None
+    for fmt in ('%m/%d/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_date_column(values: Sequence[str]) -> List[Optional[date]]:
+    """Parse a column of dates, once per distinct value"""
+    parsed = {value: _parse_date_value(value) for value in set(values)}
+    return [parsed[value] for value in values]
+
+
+def constant_column(value, length: int) -> List:
+    return [value] * length
+
+
+def to_copy_column(values: Sequence) -> List[str]:
+    """Format a column for the COPY text format"""
+    if values and isinstance(next((value for value in values if value is not None), None), date):
+        return [value.isoformat() if value is not None else COPY_NULL for value in values]
+    return [str(value).translate(_COPY_ESCAPES) if value is not None else COPY_NULL for value in values]
+
+
+def iter_copy_batches(columns: Dict[str, Sequence], batch_size: int = 10000) -> Iterator[io.StringIO]:
+    """
+    Yield file-like COPY text batches of at most `batch_size` rows, with the columns
+    in the order of `columns`, for `cursor.copy_expert("COPY table (...) FROM STDIN")`.
+    """
+    formatted = [to_copy_column(values) for values in columns.values()]
+    row_count = len(formatted[0]) if formatted else 0
+
+    for start in range(0, row_count, batch_size):
+        lines = ['\t'.join(row) for row in zip(*(values[start:start + batch_size] for values in formatted))]
+        yield io.StringIO('\n'.join(lines) + '\n')
+
+
+def row_count(columns: Dict[str, Sequence]) -> int:
+    return len(next(iter(columns.values()), ()))
@@ -1,164 +1,164 @@
-import requests
-import csv
-import io
-from datetime import datetime, date
-from bs4 import BeautifulSoup
-from typing import Optional, List, Dict
+import hashlib
+from datetime import date
+from typing import Optional
 
 from common.app_logger import get_logger
 from common.app_config import config
+from common.models.oig_exclusions_check import OigExclusionsCheck
 from common.services.oig_employees_exclusion import OigEmployeesExclusionService
 from common.services.oig_exclusions_check import OigExclusionsCheckService
 from common.tasks.send_message import send_message
+from lib.sources import ExclusionSource, get_exclusion_sources
+from lib.columnar import iter_copy_batches, row_count
 
 logger = get_logger(__name__)
 
 
 class OigUpdateHandler:
-    def __init__(self):
+    def __init__(self, sources=None):
         self.config = config
         self.oig_exclusions_service = OigEmployeesExclusionService(config)
         self.oig_checks_service = OigExclusionsCheckService(config)
+        self.sources = sources if sources is not None else get_exclusion_sources(config)
 
-    def get_last_update_from_webpage(self) -> Optional[date]:
-        """
-        Scrape the OIG webpage to get the 'Last Update' date from the specific HTML structure
+    def process_update_check(self):
         """
-        try:
-            response = requests.get(self.config.OIG_WEBPAGE_URL, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            alert_body = soup.find('div', class_='usa-alert-body')
-            if alert_body:
-                # Look for h3 with class usa-alert-heading
-                heading = alert_body.find('h3', class_='usa-alert-heading')
-                if heading:
-                    date_text = heading.get_text().strip()
-                    try:
-                        # Parse date in MM-DD-YYYY format
-                        return datetime.strptime(date_text, '%m-%d-%Y').date()
-                    except ValueError:
-                        logger.warning(f"Could not parse date from heading: {date_text}")
-            
-            # Fallback to regex patterns if the specific structure isn't found
-            text = soup.get_text()
-            import re
-            patterns = [
-                r'(\d{1,2}-\d{1,2}-\d{4})',  # MM-DD-YYYY format
-                r'Last Update[:\s]+(\d{1,2}/\d{1,2}/\d{4})',
-                r'Updated[:\s]+(\d{1,2}/\d{1,2}/\d{4})',
-                r'Last Modified[:\s]+(\d{1,2}/\d{1,2}/\d{4})'
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    date_str = match.group(1)
-                    try:
-                        # Try MM-DD-YYYY format first
-                        if '-' in date_str:
-                            return datetime.strptime(date_str, '%m-%d-%Y').date()
-                        else:
-                            return datetime.strptime(date_str, '%m/%d/%Y').date()
-                    except ValueError:
-                        continue
-            
-            logger.warning("Could not find 'Last Update' date on OIG webpage")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error fetching last update date from webpage: {str(e)}")
-            logger.exception(e)
-            return None
+        Main method to process the exclusion list update check.
 
-    def download_csv_data(self) -> Optional[List[Dict[str, str]]]:
-        """
-        Download the CSV data from OIG website
+        Every configured source is checked and imported if it changed. All sources share
+        one index table, so a single rematch sweep covers every list that was imported; its
+        progress is kept on the last imported check, which the others link to.
         """
-        try:
-            logger.info("Downloading OIG LEIE CSV data...")
-            response = requests.get(self.config.OIG_CSV_DOWNLOAD_URL, timeout=300)  # 5 minute timeout
-            response.raise_for_status()
-            
-            # Read CSV data using csv module
-            csv_data = io.StringIO(response.text)
-            reader = csv.DictReader(csv_data)
-            rows = list(reader)
-            
-            logger.info(f"Successfully downloaded CSV with {len(rows)} records")
-            return rows
-            
-        except Exception as e:
-            logger.error(f"Error downloading CSV data: {str(e)}")
-            logger.exception(e)
-            return None
+        imported_checks = []
+        for source in self.sources:
+            check_record = self.process_source(source)
+            if check_record is not None:
+                imported_checks.append(check_record)
 
-    def process_update_check(self):
+        if imported_checks:
+            self.trigger_match_service(imported_checks)
+
+    def process_source(self, source: ExclusionSource) -> Optional[OigExclusionsCheck]:
         """
-        Main method to process the OIG update check
+        Check one exclusion list for an update and import it if one is available.
+        Returns the 'imported' check record, or None if nothing was imported.
+
+        The check is a HEAD or conditional GET request against the list file, compared with
+        the validators stored by the last check. The OIG webpage scrape (LEIE) or the file
+        hash (other lists) is only the fallback when the validators cannot tell.
         """
+        last_update = None
         try:
-            # Get last update date from webpage
-            webpage_last_update = self.get_last_update_from_webpage()
-            
-            if webpage_last_update is None:
-                self.oig_checks_service.log_check_result('check_failed')
-                return
-            
-            # Get last successful import date
-            last_import_date = self.oig_checks_service.get_last_successful_import_date()
-            
-            # Check if update is needed
-            if last_import_date and webpage_last_update <= last_import_date:
-                logger.info("No update needed - data is current")
-                self.oig_checks_service.log_check_result('no_update', webpage_last_update)
-                return
-            
-            # Download and import new data
-            logger.info("Update available - downloading new data...")
-            csv_data = self.download_csv_data()
-            
-            if csv_data is None or not csv_data:
-                self.oig_checks_service.log_check_result('import_failed', webpage_last_update)
-                return
-            
-            # Delete existing data and import new data
-            delete_success = self.oig_exclusions_service.delete_all_exclusions()
-            if not delete_success:
-                self.oig_checks_service.log_check_result('import_failed', webpage_last_update)
-                return
-            
-            import_success = self.oig_exclusions_service.bulk_import_exclusions(csv_data)
-            
+            previous_check = self.oig_checks_service.get_last_validated_check(source.name)
+            try:
+                changed, validators, content = source.check_for_change(previous_check)
+            except Exception as e:
+                logger.warning(f"Conditional check of the {source.name} list failed: {str(e)}")
+                changed, validators, content = None, {}, None
+
+            if changed is False:
+                logger.info(f"No {source.name} update needed - file validators are unchanged")
+                self.oig_checks_service.log_check_result(
+                    'no_update', previous_check.last_update_on_webpage, source=source.name,
+                    content_hash=previous_check.content_hash, validators=validators
+                )
+                return None
+
+            if changed is None and source.has_last_update:
+                # Get last update date from webpage
+                last_update = source.get_last_update()
+
+                if last_update is None:
+                    self.oig_checks_service.log_check_result('check_failed', source=source.name)
+                    return None
+
+                # Check if update is needed
+                last_import_date = self.oig_checks_service.get_last_successful_import_date(source.name)
+                if last_import_date and last_update <= last_import_date:
+                    logger.info(f"No {source.name} update needed - data is current")
+                    self.oig_checks_service.log_check_result(
+                        'no_update', last_update, source=source.name, validators=validators
+                    )
+                    return None
+
+            # Download and parse new data
+            if content is None:
+                logger.info(f"Downloading {source.name} exclusion list...")
+                try:
+                    content = source.fetch()
+                except Exception as e:
+                    logger.error(f"Error downloading {source.name} exclusion list: {str(e)}")
+                    logger.exception(e)
+                    self.oig_checks_service.log_check_result('import_failed', last_update, source=source.name)
+                    return None
+
+            content_hash = hashlib.sha256(content).hexdigest()
+            last_import = self.oig_checks_service.get_last_successful_import(source.name)
+            if last_import and last_import.content_hash == content_hash:
+                logger.info(f"No {source.name} update needed - file is unchanged")
+                self.oig_checks_service.log_check_result(
+                    'no_update', last_update or last_import.last_update_on_webpage, source=source.name,
+                    content_hash=content_hash, validators=validators
+                )
+                return None
+
+            columns = source.parse_columns(content)
+            if not row_count(columns):
+                self.oig_checks_service.log_check_result('import_failed', last_update, source=source.name)
+                return None
+
+            # Replace this source's records, leaving the other lists in place
+            try:
+                import_success = self.oig_exclusions_service.replace_source_exclusions(
+                    source.name, list(columns), iter_copy_batches(columns, self.config.OIG_IMPORT_COPY_BATCH_SIZE)
+                )
+            except Exception as e:
+                logger.error(f"Error loading {source.name} exclusion records: {str(e)}")
+                logger.exception(e)
+                import_success = False
+
             if import_success:
-                self.oig_checks_service.log_check_result('imported', webpage_last_update)
-                logger.info("OIG LEIE data successfully updated")
-            else:
-                self.oig_checks_service.log_check_result('import_failed', webpage_last_update)
-                logger.error("Failed to import OIG LEIE data")
-                
+                check_record = self.oig_checks_service.log_check_result(
+                    'imported', last_update or date.today(), source=source.name,
+                    content_hash=content_hash, validators=validators
+                )
+                logger.info(f"{source.name} exclusion data successfully updated")
+                return check_record
+
+            self.oig_checks_service.log_check_result('import_failed', last_update, source=source.name)
+            logger.error(f"Failed to import {source.name} exclusion data")
+            return None
+
         except Exception as e:
-            logger.error(f"Unexpected error during OIG update check: {str(e)}")
+            logger.error(f"Unexpected error during {source.name} update check: {str(e)}")
             logger.exception(e)
-            self.oig_checks_service.log_check_result('check_failed')
+            self.oig_checks_service.log_check_result('check_failed', source=source.name)
+            return None
 
-    def trigger_match_service(self):
+    def trigger_match_service(self, check_records):
         """
-        Trigger the matching process for employees and caregivers
+        Rematch every organization's employees and physicians against the new lists.
+
+        The sweep is fanned out into one message per organization so the match service
+        workers process organizations in parallel; progress is tracked on the last check
+        record, which every check record of the run links to.
         """
-        logger.info("Triggering matching process for employees and caregivers")
-        logger.info("Sending message to queue: %s",
+        organization_ids = self.oig_checks_service.start_match_sweep(check_records)
+        sweep_check_id = check_records[-1].entity_id
+        logger.info("Triggering matching process for %d organizations", len(organization_ids))
+        logger.info("Sending messages to queue: %s",
             self.config.PREFIXED_EMPLOYEE_EXCLUSION_MATCH_PROCESSOR_QUEUE_NAME
         )
-        send_message(
-            queue_name=self.config.PREFIXED_EMPLOYEE_EXCLUSION_MATCH_PROCESSOR_QUEUE_NAME,
-            data={
-                'action': 'match_exclusions',
-                'source': 'oig_update_handler'
-            }
-        )
+        for organization_id in organization_ids:
+            send_message(
+                queue_name=self.config.PREFIXED_EMPLOYEE_EXCLUSION_MATCH_PROCESSOR_QUEUE_NAME,
+                data={
+                    'action': 'match_exclusions',
+                    'source': 'oig_update_handler',
+                    'organization_id': organization_id,
+                    'check_id': sweep_check_id
+                }
+            )
         logger.info("Matching process triggered in exclusion match service")
 
 
@@ -0,0 +1,385 @@
+"""
+Exclusion list sources imported into the unified oig_employees_exclusion index.
+
+Each source knows how to load its list (from a URL, or from a local path so that
+it can be exercised with fixture files) and how to map the list's rows to
+OigEmployeesExclusion records tagged with the source's name.
+"""
+import io
+import re
+import csv
+import zipfile
+import requests
+from datetime import datetime, date
+from bs4 import BeautifulSoup
+from typing import Optional, List, Dict, Iterator, Any, Tuple
+
+from common.app_logger import get_logger
+from common.models.oig_employees_exclusion import OigEmployeesExclusion
+from common.helpers.csv_utils import clean_string, parse_date
+from lib.columnar import read_columns, clean_column, parse_date_column, constant_column
+
+logger = get_logger(__name__)
+
+
+def read_rows(content: bytes, file_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the rows of a 'csv', 'pipe' (pipe-delimited) or 'xlsx' file as dicts keyed by
+    the header row. A zip archive is read from its first member of the right type.
+    """
+    if content[:2] == b'PK' and file_format != 'xlsx':
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            names = [name for name in archive.namelist() if name.lower().endswith(('.csv', '.txt'))]
+            if not names:
+                raise ValueError("Zip archive does not contain a CSV or text file")
+            content = archive.read(names[0])
+
+    if file_format == 'xlsx':
+        # Only the services that import XLSX lists need openpyxl
+        from openpyxl import load_workbook
+        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+        for row in rows:
+            if any(cell is not None and str(cell).strip() for cell in row):
+                yield dict(zip(header, row))
+        return
+
+    delimiter = '|' if file_format == 'pipe' else ','
+    text = content.decode('utf-8-sig', errors='replace')
+    reader = csv.DictReader(io.StringIO(text), delimiter=delimiter)
+    for row in reader:
+        yield {key.strip() if key else key: value for key, value in row.items()}
+
+
+def get_validators(response: requests.Response) -> Dict[str, Any]:
+    """The ETag, Last-Modified and Content-Length of an HTTP response"""
+    content_length = response.headers.get('Content-Length')
+    return {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_length': int(content_length) if content_length and content_length.isdigit() else None,
+    }
+
+
+def compare_validators(previous, validators: Dict[str, Any]) -> Optional[bool]:
+    """
+    Whether the file changed since the `previous` check, judging by its validators.
+    Returns None if the validators of both sides do not allow telling.
+    """
+    if previous is None:
+        return None
+
+    if previous.etag and validators.get('etag'):
+        return previous.etag != validators['etag']
+
+    if previous.last_modified and validators.get('last_modified'):
+        if previous.last_modified != validators['last_modified']:
+            return True
+        # Same modification date but a different size still means a new file
+        if previous.content_length and validators.get('content_length'):
+            return previous.content_length != validators['content_length']
+        return False
+
+    return None
+
+
+def to_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return parse_date(clean_string(value))
+
+
+class ExclusionSource:
+    """
+    Base class of an exclusion list source.
+
+    Subclasses set `name` and `file_format` and implement `to_record`. Changes are
+    detected from the file's HTTP validators (`check_for_change`). When those cannot
+    tell, sources that publish a "last updated" date override `get_last_update`; for the
+    others the hash of the downloaded file is compared with the last import.
+    """
+    name: str = None
+    file_format: str = 'csv'
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def get_last_update(self) -> Optional[date]:
+        return None
+
+    @property
+    def has_last_update(self) -> bool:
+        return type(self).get_last_update is not ExclusionSource.get_last_update
+
+    @property
+    def is_remote(self) -> bool:
+        return self.url.startswith(('http://', 'https://'))
+
+    def check_for_change(self, previous) -> Tuple[Optional[bool], Dict[str, Any], Optional[bytes]]:
+        """
+        Ask the server whether the list changed since the `previous` check, which holds
+        the validators seen then, with a HEAD request, or with a conditional GET if the
+        server does not answer HEAD.
+
+        Returns (changed, validators, content). `changed` is None when it cannot be told,
+        e.g. for local files or without previous validators. `content` is the downloaded
+        list when the conditional GET already fetched it.
+        """
+        if not self.is_remote:
+            return None, {}, None
+
+        try:
+            response = requests.head(self.url, timeout=30, allow_redirects=True)
+            if response.status_code < 400:
+                validators = get_validators(response)
+                return compare_validators(previous, validators), validators, None
+            logger.info(f"HEAD {self.name} list returned {response.status_code}, using a conditional GET")
+        except requests.RequestException as e:
+            logger.warning(f"HEAD {self.name} list failed, using a conditional GET: {str(e)}")
+
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers['If-None-Match'] = previous.etag
+            if previous.last_modified:
+                headers['If-Modified-Since'] = previous.last_modified
+
+        response = requests.get(self.url, headers=headers, timeout=300)  # 5 minute timeout
+        if response.status_code == 304:
+            validators = {
+                'etag': previous.etag,
+                'last_modified': previous.last_modified,
+                'content_length': previous.content_length,
+            }
+            validators.update({key: value for key, value in get_validators(response).items() if value})
+            return False, validators, None
+
+        response.raise_for_status()
+        validators = get_validators(response)
+        return compare_validators(previous, validators), validators, response.content
+
+    def fetch(self) -> bytes:
+        """Download the list, or read it from a local path or file:// URL"""
+        if not self.is_remote:
+            with open(self.url[len('file://'):] if self.url.startswith('file://') else self.url, 'rb') as list_file:
+                return list_file.read()
+
+        response = requests.get(self.url, timeout=300)  # 5 minute timeout
+        response.raise_for_status()
+        return response.content
+
+    def parse(self, content: bytes) -> List[OigEmployeesExclusion]:
+        records = []
+        for row in read_rows(content, self.file_format):
+            record = self.to_record(row)
+            if record is not None:
+                records.append(record)
+        logger.info(f"Parsed {len(records)} {self.name} exclusion records")
+        return records
+
+    def parse_columns(self, content: bytes) -> Dict[str, list]:
+        """
+        Parse the list into one list of values per oig_employees_exclusion column, ready for
+        the COPY loader. Sources with a fixed layout override this with a columnar parse.
+        """
+        records = self.parse(content)
+        fields = [field for field in OigEmployeesExclusion.__dataclass_fields__ if field != 'id']
+        return {field: [getattr(record, field) for record in records] for field in fields}
+
+    def to_record(self, row: Dict[str, Any]) -> Optional[OigEmployeesExclusion]:
+        raise NotImplementedError
+
+
+class LeieSource(ExclusionSource):
+    """The OIG List of Excluded Individuals/Entities (UPDATED.csv)"""
+    name = 'leie'
+
+    # LEIE CSV header -> oig_employees_exclusion column
+    COLUMNS = {
+        'LASTNAME': 'last_name',
+        'FIRSTNAME': 'first_name',
+        'MIDNAME': 'middle_name',
+        'BUSNAME': 'business_name',
+        'GENERAL': 'general',
+        'SPECIALTY': 'specialty',
+        'UPIN': 'upin',
+        'NPI': 'npi',
+        'DOB': 'date_of_birth',
+        'ADDRESS': 'address',
+        'CITY': 'city',
+        'STATE': 'state',
+        'ZIP': 'zip_code',
+        'EXCLTYPE': 'exclusion_type',
+        'EXCLDATE': 'exclusion_date',
+        'REINDATE': 'reinstatement_date',
+        'WAIVERDATE': 'waiver_date',
+        'WVRSTATE': 'waiver_state',
+    }
+    DATE_COLUMNS = {'DOB', 'EXCLDATE', 'REINDATE', 'WAIVERDATE'}
+
+    def __init__(self, url: str, webpage_url: str):
+        super().__init__(url)
+        self.webpage_url = webpage_url
+
+    def get_last_update(self) -> Optional[date]:
+        """
+        Scrape the OIG webpage to get the 'Last Update' date from the specific HTML structure.
+        Only used when the CSV's HTTP validators cannot tell whether it changed.
+        """
+        try:
+            response = requests.get(self.webpage_url, timeout=30)
+            response.raise_for_status()
+
+            soup = BeautifulSoup(response.content, 'html.parser')
+
+            alert_body = soup.find('div', class_='usa-alert-body')
+            if alert_body:
+                # Look for h3 with class usa-alert-heading
+                heading = alert_body.find('h3', class_='usa-alert-heading')
+                if heading:
+                    date_text = heading.get_text().strip()
+                    try:
+                        # Parse date in MM-DD-YYYY format
+                        return datetime.strptime(date_text, '%m-%d-%Y').date()
+                    except ValueError:
+                        logger.warning(f"Could not parse date from heading: {date_text}")
+
+            # Fallback to regex patterns if the specific structure isn't found
+            text = soup.get_text()
+            patterns = [
+                r'(\d{1,2}-\d{1,2}-\d{4})',  # MM-DD-YYYY format
+                r'Last Update[:\s]+(\d{1,2}/\d{1,2}/\d{4})',
+                r'Updated[:\s]+(\d{1,2}/\d{1,2}/\d{4})',
+                r'Last Modified[:\s]+(\d{1,2}/\d{1,2}/\d{4})'
+            ]
+
+            for pattern in patterns:
+                match = re.search(pattern, text, re.IGNORECASE)
+                if match:
+                    date_str = match.group(1)
+                    try:
+                        # Try MM-DD-YYYY format first
+                        if '-' in date_str:
+                            return datetime.strptime(date_str, '%m-%d-%Y').date()
+                        else:
+                            return datetime.strptime(date_str, '%m/%d/%Y').date()
+                    except ValueError:
+                        continue
+
+            logger.warning("Could not find 'Last Update' date on OIG webpage")
+            return None
+
+        except Exception as e:
+            logger.error(f"Error fetching last update date from webpage: {str(e)}")
+            logger.exception(e)
+            return None
+
+    def parse_columns(self, content: bytes) -> Dict[str, list]:
+        """Columnar parse of the LEIE CSV, without a dict or dataclass per row"""
+        header, raw_columns = read_columns(content)
+        positions = {name: position for position, name in enumerate(header)}
+        count = len(raw_columns[0]) if raw_columns else 0
+
+        columns = {'source': constant_column(self.name, count)}
+        for csv_name, field in self.COLUMNS.items():
+            values = raw_columns[positions[csv_name]] if csv_name in positions else ('',) * count
+            columns[field] = parse_date_column(values) if csv_name in self.DATE_COLUMNS else clean_column(values)
+
+        logger.info(f"Parsed {count} {self.name} exclusion records")
+        return columns
+
+    def to_record(self, row: Dict[str, Any]) -> Optional[OigEmployeesExclusion]:
+        return OigEmployeesExclusion(
+            source=self.name,
+            last_name=clean_string(row.get('LASTNAME')),
+            first_name=clean_string(row.get('FIRSTNAME')),
+            middle_name=clean_string(row.get('MIDNAME')),
+            business_name=clean_string(row.get('BUSNAME')),
+            general=clean_string(row.get('GENERAL')),
+            specialty=clean_string(row.get('SPECIALTY')),
+            upin=clean_string(row.get('UPIN')),
+            npi=clean_string(row.get('NPI')),
+            date_of_birth=parse_date(row.get('DOB')),
+            address=clean_string(row.get('ADDRESS')),
+            city=clean_string(row.get('CITY')),
+            state=clean_string(row.get('STATE')),
+            zip_code=clean_string(row.get('ZIP')),
+            exclusion_type=clean_string(row.get('EXCLTYPE')),
+            exclusion_date=parse_date(row.get('EXCLDATE')),
+            reinstatement_date=parse_date(row.get('REINDATE')),
+            waiver_date=parse_date(row.get('WAIVERDATE')),
+            waiver_state=clean_string(row.get('WVRSTATE'))
+        )
+
+
+class SamSource(ExclusionSource):
+    """The SAM.gov public exclusions extract (CSV, usually zipped)"""
+    name = 'sam'
+
+    def to_record(self, row: Dict[str, Any]) -> Optional[OigEmployeesExclusion]:
+        is_individual = (clean_string(row.get('Classification')) or '').lower() == 'individual'
+        return OigEmployeesExclusion(
+            source=self.name,
+            last_name=clean_string(row.get('Last')),
+            first_name=clean_string(row.get('First')),
+            middle_name=clean_string(row.get('Middle')),
+            business_name=None if is_individual else clean_string(row.get('Name')),
+            general=clean_string(row.get('Exclusion Program')),
+            specialty=clean_string(row.get('Excluding Agency')),
+            npi=clean_string(row.get('NPI')),
+            address=clean_string(row.get('Address 1')),
+            city=clean_string(row.get('City')),
+            state=clean_string(row.get('State / Province')),
+            zip_code=clean_string(row.get('Zip Code')),
+            exclusion_type=clean_string(row.get('Exclusion Type')),
+            exclusion_date=to_date(row.get('Active Date')),
+            reinstatement_date=to_date(row.get('Termination Date')),
+        )
+
+
+class StateMedicaidSource(ExclusionSource):
+    """
+    A state Medicaid exclusion list. States publish different layouts, so the file
+    format and the mapping of OigEmployeesExclusion fields to the list's column
+    headers are configured per state.
+    """
+
+    def __init__(self, state: str, url: str, columns: Dict[str, str], format: str = 'csv'):
+        super().__init__(url)
+        self.state = state.upper()
+        self.name = f"medicaid_{state.lower()}"
+        self.file_format = format
+        self.columns = columns
+
+    def to_record(self, row: Dict[str, Any]) -> Optional[OigEmployeesExclusion]:
+        values = {}
+        for field, header in self.columns.items():
+            value = row.get(header)
+            if field in ('date_of_birth', 'exclusion_date', 'reinstatement_date', 'waiver_date'):
+                values[field] = to_date(value)
+            else:
+                values[field] = clean_string(value)
+
+        if not values.get('state'):
+            values['state'] = self.state
+
+        return OigEmployeesExclusion(source=self.name, **values)
+
+
+def get_exclusion_sources(config) -> List[ExclusionSource]:
+    """
+    The configured sources: the LEIE always, SAM.gov when SAM_EXCLUSIONS_DOWNLOAD_URL is set,
+    and one source per entry of STATE_MEDICAID_EXCLUSION_SOURCES.
+    """
+    sources = [LeieSource(config.OIG_CSV_DOWNLOAD_URL, config.OIG_WEBPAGE_URL)]
+
+    if config.SAM_EXCLUSIONS_DOWNLOAD_URL:
+        sources.append(SamSource(config.SAM_EXCLUSIONS_DOWNLOAD_URL))
+
+    for entry in config.STATE_MEDICAID_EXCLUSION_SOURCES:
+        sources.append(StateMedicaidSource(**entry))
+
+    return sources
@@ -5,7 +5,7 @@ from common.app_logger import logger
 from common.app_config import config
 from common.repositories.factory import RepositoryFactory, RepoType
 from common.services.employee_exclusion_match import EmployeeExclusionMatchService
-from common.services.pusher_client import PusherService
+from common.services.pusher_client import get_verification_update_batcher
 from common.models.employee_exclusion_match import EmployeeExclusionMatch
 from lib.oig_verification_script import OIGVerifier
 
@@ -49,6 +49,8 @@ def message_handler(message):
         except Exception as e:
             logger.error(f"Error marking match {match_data.get('entity_id')} as in_process: {str(e)}")
 
+    refresh_match_summaries(employee_exclusion_match_repo, matches_data)
+
     # Process each match
     for match_data in matches_data:
         try:
@@ -58,6 +60,17 @@ def message_handler(message):
             logger.exception(e)
 
 
+def refresh_match_summaries(employee_exclusion_match_repo, matches_data):
+    """Update the per-entity match summaries after verification results changed"""
+    try:
+        employee_exclusion_match_repo.refresh_match_summaries(
+            (match_data.get('matched_entity_type'), match_data.get('matched_entity_id')) for match_data in matches_data
+        )
+    except Exception as e:
+        logger.error(f"Error refreshing exclusion match summaries: {str(e)}")
+        logger.exception(e)
+
+
 def verify_match(match_data, employee_exclusion_match_repo, employee_exclusion_match_service, employee_repo):
     """
     Verify a single exclusion match using the OIG verification script
@@ -238,10 +251,10 @@ def update_match_verification_status(match, verification_result, employee_exclus
         
         # Save the updated match
         employee_exclusion_match_repo.save(match)
+        employee_exclusion_match_repo.refresh_match_summaries([(match.matched_entity_type, match.matched_entity_id)])
         
-        # Trigger real-time update via Pusher
+        # Queue real-time update; it is sent to Pusher in a per-organization batch
         try:
-            pusher_service = PusherService()
             match_update_data = {
                 'entity_id': match.entity_id,
                 'matched_entity_id': match.matched_entity_id,
@@ -249,9 +262,9 @@ def update_match_verification_status(match, verification_result, employee_exclus
                 's3_key': match.s3_key,
                 'updated_at': datetime.utcnow().isoformat()
             }
-            pusher_service.trigger_verification_update(match.organization_id, match_update_data)
+            get_verification_update_batcher().add(match.organization_id, match_update_data)
         except Exception as pusher_error:
-            logger.warning(f"Failed to send Pusher notification for match {match.entity_id}: {str(pusher_error)}")
+            logger.warning(f"Failed to queue Pusher notification for match {match.entity_id}: {str(pusher_error)}")
         
         logger.info(f"Updated match {match.entity_id} with verification result: {match.verification_result}")
         
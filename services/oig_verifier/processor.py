@@ -16,6 +16,12 @@ class OigVerifierProcessor(BaseServiceProcessor):
         set_rollbar_exception_catch()
         # Initialize any other resources needed for the processor
 
+    @staticmethod
+    def get_organization_id(message):
+        """Organization used for per-tenant concurrency limits in the consumer runtime"""
+        matches = message.get('matches') or []
+        return matches[0].get('organization_id') if matches else None
+
     def process(self, message):
         self.logger.info("Received message: %s to the OIG verifier service!", message)
         # Do something with the message
@@ -0,0 +1,4 @@
+#!/bin/bash
+
+python3 src/version.py
+python3 src/process.py
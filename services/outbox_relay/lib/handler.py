@@ -0,0 +1,25 @@
+import time
+
+from common.app_logger import logger
+from common.app_config import config
+from common.services.outbox import OutboxService
+
+CLEANUP_INTERVAL_SECONDS = 60 * 60
+
+_last_cleanup = 0.0
+
+
+def task_handler():
+    """
+    Relay all pending outbox messages to RabbitMQ and periodically prune old published rows
+    """
+    global _last_cleanup
+    outbox_service = OutboxService(config)
+
+    published = outbox_service.relay_pending()
+    if published:
+        logger.info("Relayed %d outbox messages to RabbitMQ", published)
+
+    if time.monotonic() - _last_cleanup >= CLEANUP_INTERVAL_SECONDS:
+        outbox_service.cleanup_published()
+        _last_cleanup = time.monotonic()
@@ -0,0 +1,4 @@
+from common.version import main
+
+if __name__ == "__main__":
+    main()
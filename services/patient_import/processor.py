@@ -2,6 +2,7 @@ import json
 from rococo.messaging import BaseServiceProcessor
 from common.app_config import config
 from common.app_logger import create_logger, set_rollbar_exception_catch
+from common.services.s3_event_ledger import S3EventLedgerService
 from lib.handler import PatientListImportHandler
 
 class PatientImportProcessor(BaseServiceProcessor):
@@ -18,6 +19,7 @@ class PatientImportProcessor(BaseServiceProcessor):
         setup_patient_import_queue()
         
         self.import_handler = PatientListImportHandler(config)
+        self.event_ledger = S3EventLedgerService(config, processor='patient_import')
         
         self.logger.info("Patient import processor initialized")
 
@@ -56,10 +58,19 @@ class PatientImportProcessor(BaseServiceProcessor):
                     self.logger.info(f"Skipping file not under patients-list/ prefix: {key}")
                     continue
                 
+                # Skip redeliveries of an event that was already imported
+                event = self.event_ledger.claim_record(record)
+                if event is None:
+                    continue
+
                 self.logger.info(f"Processing patient file from S3: {bucket_name}/{key}")
                 
                 # Process the CSV or XLSX file
-                self.import_handler.process_patient_file(bucket_name, key)
+                try:
+                    self.import_handler.process_patient_file(bucket_name, key)
+                except Exception:
+                    self.event_ledger.release(event)
+                    raise
 
         except Exception as e:
             self.logger.error(f"Error processing patient import message: {str(e)}")